@@ -0,0 +1,7 @@
+from .batch_runner import BatchRunner, BatchResult, find_scripts
+
+__all__ = [
+    BatchRunner.__name__,
+    BatchResult.__name__,
+    find_scripts.__name__,
+]
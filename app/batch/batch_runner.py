@@ -0,0 +1,108 @@
+import io
+import os
+import sys
+import time
+import traceback
+from argparse import Namespace
+from typing import Callable, Iterator, Optional
+
+from ..utils import exit_status
+
+
+SCRIPT_SUFFIX = ".lox"
+
+Entry = Callable[[Namespace], None]
+
+
+class BatchResult:
+    __slots__ = ["path", "status", "stdout", "stderr", "seconds"]
+
+    def __init__(self, path: str, status: int, stdout: str, stderr: str, seconds: float) -> None:
+        self.path = path
+        self.status = status
+        self.stdout = stdout
+        self.stderr = stderr
+        self.seconds = seconds
+
+
+def find_scripts(paths: list[str]) -> list[str]:
+    # directories stand for every script below them, in name order
+    scripts: list[str] = []
+    for path in paths:
+        if not os.path.isdir(path):
+            scripts.append(path)
+            continue
+        found = []
+        for directory, _, files in os.walk(path):
+            found.extend(os.path.join(directory, name) for name in files if name.endswith(SCRIPT_SUFFIX))
+        scripts.extend(sorted(found))
+    return scripts
+
+
+# set in every worker by `_start_worker`, before its first script
+_entry: Optional[Entry] = None
+_options: Optional[Namespace] = None
+
+
+def _start_worker(entry: Entry, options: Namespace) -> None:
+    global _entry, _options
+    _entry, _options = entry, options
+
+
+def _run_script(path: str) -> BatchResult:
+    assert _entry is not None and _options is not None
+    options = Namespace(**vars(_options))
+    options.file = path
+
+    saved = sys.stdout, sys.stderr
+    stdout = sys.stdout = io.StringIO()
+    stderr = sys.stderr = io.StringIO()
+    start = time.perf_counter()
+    try:
+        _entry(options)
+        status = 0
+    except SystemExit as e:
+        status = exit_status(e)
+    except KeyboardInterrupt:
+        raise
+    except BaseException:
+        traceback.print_exc()
+        status = 1
+    finally:
+        seconds = time.perf_counter() - start
+        sys.stdout, sys.stderr = saved
+    return BatchResult(path, status, stdout.getvalue(), stderr.getvalue(), seconds)
+
+
+# Runs `entry`, a command of the command line, on many scripts with the same options.
+# Every script runs in a worker process that is reused for the scripts after it, so
+# the interpreter is imported and started once per worker; the command builds its own
+# parser, scopes and engine for each script, and its output and exit status are
+# captured instead of reaching the terminal. Results come back in the order of
+# `scripts`, each as soon as it and every script before it are done.
+class BatchRunner:
+    def __init__(self, entry: Entry, options: Namespace, jobs: int) -> None:
+        self.entry = entry
+        self.options = options
+        self.jobs = max(1, jobs)
+
+    def run(self, scripts: list[str]) -> Iterator[BatchResult]:
+        if self.jobs == 1 or len(scripts) <= 1:
+            _start_worker(self.entry, self.options)
+            for path in scripts:
+                yield _run_script(path)
+            return
+
+        # workers are forked, so they start with everything the parent has imported and
+        # only the script paths and results cross between processes
+        import multiprocessing
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(
+            max_workers=min(self.jobs, len(scripts)),
+            mp_context=multiprocessing.get_context("fork"),
+            initializer=_start_worker,
+            initargs=(self.entry, self.options),
+        ) as executor:
+            futures = [executor.submit(_run_script, path) for path in scripts]
+            for future in futures:
+                yield future.result()
@@ -0,0 +1,7 @@
+from .program_codec import ProgramCodec
+from .program_cache import ProgramCache, DEFAULT_CACHE_DIRECTORY
+
+__all__ = [
+    ProgramCodec.__name__,
+    ProgramCache.__name__,
+]
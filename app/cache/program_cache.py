@@ -0,0 +1,82 @@
+import hashlib
+import marshal
+import os
+import struct
+from importlib.util import MAGIC_NUMBER
+from typing import Any, Optional
+
+from ..engines import Engine
+from ..engines.engine import Program
+from .program_codec import ProgramCodec
+
+
+DEFAULT_CACHE_DIRECTORY = "__loxcache__"
+
+
+# Layout: b"LOXC", the format version (u16, little endian), CPython's bytecode magic number,
+# the SHA-256 of the script's bytes and the NUL-terminated variant (engine and
+# optimization level), then a marshalled `(kind, payload)` pair. A file is only used when
+# all of the header matches, which is one comparison against the header this run expects.
+# Parse errors never reach the cache: only programs that parsed are stored.
+class ProgramCache:
+    MAGIC = b"LOXC"
+    VERSION = 3
+
+    # payload kinds: an engine's own compiled form, or the encoded program to compile again
+    COMPILED = 0
+    PROGRAM = 1
+
+    def __init__(self, script: str, variant: str, directory: Optional[str] = None) -> None:
+        with open(script, "rb") as fd:
+            digest = hashlib.sha256(fd.read()).digest()
+        if directory is None:
+            directory = os.path.join(os.path.dirname(script), DEFAULT_CACHE_DIRECTORY)
+        self.path = os.path.join(directory, f"{os.path.basename(script)}.{variant}.loxc")
+        self.header = b"".join((
+            self.MAGIC,
+            struct.pack("<H", self.VERSION),
+            MAGIC_NUMBER,
+            digest,
+            variant.encode() + b"\0",
+        ))
+
+    def load(self, engine: Engine) -> Optional[Any]:
+        try:
+            with open(self.path, "rb") as fd:
+                data = fd.read()
+        except OSError:
+            return None
+        if not data.startswith(self.header):
+            return None
+
+        try:
+            kind, payload = marshal.loads(memoryview(data)[len(self.header):])
+            if kind == self.COMPILED:
+                return engine.load(payload)
+            program = ProgramCodec().decode(payload, engine.output)
+        except (EOFError, ValueError, TypeError, IndexError):
+            # a damaged entry is a miss; the run that follows replaces it
+            return None
+        return engine.compile(program)
+
+    def store(self, engine: Engine, program: Program, compiled: Any) -> None:
+        try:
+            payload = engine.dump(compiled)
+            entry = (self.COMPILED, payload) if payload is not None else (self.PROGRAM, ProgramCodec().encode(program))
+            data = self.header + marshal.dumps(entry)
+        except ValueError:
+            return
+
+        # written aside and renamed into place, so readers never see half a file
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(temporary, "wb") as fd:
+                fd.write(data)
+            os.replace(temporary, self.path)
+        except OSError:
+            # an unwritable location only means the next run parses again
+            try:
+                os.remove(temporary)
+            except OSError:
+                pass
@@ -0,0 +1,157 @@
+from typing import Any, Optional, Type
+
+from .. import expressions, tokens
+from ..expressions import (
+    ConstantPool,
+    Expression,
+    LiteralExpression,
+    GroupExpression,
+    IdentifierExpression,
+    UnaryExpression,
+    BinaryExpression,
+)
+from ..tokens import Token, Identifier, StringLiteral, NumberLiteral
+from ..engines import ScopeTable
+from ..engines.engine import Program
+from ..output import OutputSink
+
+
+_LITERAL, _IDENTIFIER, _GROUP, _UNARY, _BINARY = range(5)
+
+
+def _shape(cls: Type[Expression]) -> int:
+    if issubclass(cls, LiteralExpression):
+        return _LITERAL
+    if cls is IdentifierExpression:
+        return _IDENTIFIER
+    if cls is GroupExpression:
+        return _GROUP
+    if issubclass(cls, UnaryExpression):
+        return _UNARY
+    if issubclass(cls, BinaryExpression):
+        return _BINARY
+    raise ValueError(f"cannot encode {cls.__name__}")
+
+
+# Turns a program into nested tuples of plain values that `marshal` can store, and back.
+# Every statement is its scope's number in a ScopeTable and its nodes in postfix order, so
+# neither direction recurses however deep the statement is. Node and token classes are
+# recorded by name in tables of their own, so a payload does not depend on the order the
+# classes happen to be defined in.
+class ProgramCodec:
+    def encode(self, program: Program) -> tuple:
+        self._classes: dict[type, tuple[int, int]] = {}
+        self._kinds: dict[type, int] = {}
+        scopes = ScopeTable()
+        statements = []
+        for scope, expression in program:
+            statements.append((scopes.number(scope), expression._deep, self.__encode_expression(expression)))
+
+        return (
+            [cls.__name__ for cls in self._classes],
+            [cls.__name__ for cls in self._kinds],
+            scopes.parents,
+            scopes.sizes,
+            statements,
+        )
+
+    # the program's root scope prints to `output`, when given
+    def decode(self, payload: tuple, output: Optional[OutputSink] = None) -> Program:
+        class_names, token_names, parents, sizes, statements = payload
+        classes = [self.__named(expressions, name, Expression) for name in class_names]
+        shapes = [_shape(cls) for cls in classes]
+        token_classes = [self.__named(tokens, name, Token) for name in token_names]
+        scopes = ScopeTable.restore(parents, sizes).build(output)
+        constants = ConstantPool()
+        token_memo: dict[tuple, Token] = {}
+
+        program: Program = []
+        for number, deep, records in statements:
+            stack: list[Any] = []
+            for record in records:
+                cls, shape = classes[record[0]], shapes[record[0]]
+                if shape == _GROUP:
+                    stack.append(cls(stack.pop() if record[1] else None))
+                    continue
+
+                token = token_memo.get(record[1])
+                if token is None:
+                    token = token_memo[record[1]] = self.__decode_token(token_classes, record[1])
+                if shape == _LITERAL:
+                    stack.append(cls(token, constants))
+                elif shape == _IDENTIFIER:
+                    node = cls(token)
+                    if record[2] >= 0:
+                        node.depth, node.slot = record[2], record[3]
+                    stack.append(node)
+                elif shape == _UNARY:
+                    stack.append(cls(token, stack.pop()))
+                else:
+                    right = stack.pop()
+                    stack.append(cls(token, stack.pop(), right))
+
+            expression = stack.pop()
+            if deep:
+                expression._deep = True
+            program.append((scopes[number], expression))
+        return program
+
+    def __encode_expression(self, root: Expression) -> list[tuple]:
+        # parents are emitted before their operands, right operands first; reversed, that
+        # is postfix order with left operands first
+        records: list[tuple] = []
+        pending: list[Any] = [root]
+        while pending:
+            node = pending.pop()
+            cls = node.__class__
+            known = self._classes.get(cls)
+            if known is None:
+                known = self._classes[cls] = (len(self._classes), _shape(cls))
+            index, shape = known
+            if shape == _GROUP:
+                records.append((index, node.expr is not None))
+                if node.expr is not None:
+                    pending.append(node.expr)
+            elif shape == _LITERAL:
+                records.append((index, self.__encode_token(node.value)))
+            elif shape == _IDENTIFIER:
+                depth = -1 if node.depth is None else node.depth
+                records.append((index, self.__encode_token(node.name), depth, node.slot))
+            elif shape == _UNARY:
+                records.append((index, self.__encode_token(node.operator)))
+                pending.append(node.right)
+            else:
+                records.append((index, self.__encode_token(node.operator)))
+                pending.append(node.left)
+                pending.append(node.right)
+        records.reverse()
+        return records
+
+    def __encode_token(self, token: Token) -> tuple:
+        cls = token.__class__
+        kind = self._kinds.get(cls)
+        if kind is None:
+            kind = self._kinds[cls] = len(self._kinds)
+        if cls is Identifier:
+            return (kind, token.lexeme)
+        if cls is StringLiteral:
+            return (kind, token.literal)
+        if cls is NumberLiteral:
+            return (kind, token.lexeme, token.value)  # type: ignore[attr-defined]
+        return (kind,)
+
+    @staticmethod
+    def __decode_token(token_classes: list[Type[Token]], code: tuple) -> Token:
+        cls = token_classes[code[0]]
+        if cls is Identifier or cls is StringLiteral:
+            return cls(code[1])
+        if cls is NumberLiteral:
+            return cls(code[1], code[2])
+        return cls()
+
+    @staticmethod
+    def __named(module: Any, name: str, base: type) -> Any:
+        cls = getattr(module, name, None)
+        if not isinstance(cls, type) or not issubclass(cls, base):
+            raise ValueError(f"unknown class {name}")
+        return cls
@@ -0,0 +1,51 @@
+import marshal
+import os
+import socket
+import struct
+import sys
+
+
+# Imports nothing beyond the standard modules it needs, so a request costs the client little
+# more than interpreter startup.
+DEFAULT_SOCKET = os.path.join(os.environ.get("TMPDIR", "/tmp"), f"lox-{os.getuid()}.sock")
+
+STATUS = struct.Struct("<i")
+
+
+# where the client connects and `serve` listens unless told otherwise
+def default_socket() -> str:
+    return os.environ.get("LOX_SOCKET", DEFAULT_SOCKET)
+
+
+# Runs `app.main` arguments on a server started with `python -m app.main serve <socket>`.
+# The client's stdin, stdout and stderr travel with the request, so the worker reads and
+# writes them directly and the client only waits for the exit status.
+def request(path: str, argv: list[str]) -> int:
+    payload = marshal.dumps((argv, os.getcwd()))
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as connection:
+        connection.connect(path)
+        socket.send_fds(connection, [struct.pack("<I", len(payload)) + payload], [0, 1, 2])
+        status = b""
+        while len(status) < STATUS.size:
+            chunk = connection.recv(STATUS.size - len(status))
+            if not chunk:
+                raise ConnectionError("the server closed the connection without an exit status")
+            status += chunk
+    return STATUS.unpack(status)[0]
+
+
+def main() -> None:
+    argv = sys.argv[1:]
+    path = default_socket()
+    if argv[:1] == ["--socket"] and len(argv) > 1:
+        path, argv = argv[1], argv[2:]
+    try:
+        status = request(path, argv)
+    except OSError as e:
+        print(f"lox client: {e}", file=sys.stderr)
+        status = 1
+    sys.exit(status)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+import os
+import sys
+from argparse import ArgumentParser
+from typing import Type
+
+from . import expressions, tokens
+from .expressions import Expression
+from .tokens import Token
+from .engines import Engine
+
+
+# the node the parser builds from each token; tokens missing here are either handled by
+# the parser itself or an error
+TOKEN_EXPRESSIONS: list[tuple[Type[Token], Type[Expression]]] = [
+    (tokens.Identifier, expressions.IdentifierExpression),
+    (tokens.StringLiteral, expressions.StringLiteralExpression),
+    (tokens.NumberLiteral, expressions.NumberLiteralExpression),
+    (tokens.LeftParenthesisSymbol, expressions.GroupExpression),
+    (tokens.StarSymbol, expressions.MultiplyExpression),
+    (tokens.PlusSymbol, expressions.PlusExpression),
+    (tokens.MinusSymbol, expressions.MinusNegativeExpressionRouter),
+    (tokens.BangSymbol, expressions.BangExpression),
+    (tokens.EqualSymbol, expressions.AssignExpression),
+    (tokens.EqualEqualSymbol, expressions.EqualEqualExpression),
+    (tokens.BangEqualSymbol, expressions.BangEqualExpression),
+    (tokens.LessSymbol, expressions.LessExpression),
+    (tokens.LessEqualSymbol, expressions.LessEqualExpression),
+    (tokens.GreaterSymbol, expressions.GreaterExpression),
+    (tokens.GreaterEqualSymbol, expressions.GreaterEqualExpression),
+    (tokens.SlashSymbol, expressions.DivideExpression),
+    (tokens.AndReservedWord, expressions.AndExpression),
+    (tokens.OrReservedWord, expressions.OrExpression),
+    (tokens.FalseReservedWord, expressions.BooleanLiteralExpression),
+    (tokens.TrueReservedWord, expressions.BooleanLiteralExpression),
+    (tokens.NilReservedWord, expressions.NilLiteralExpression),
+    (tokens.PrintReservedWord, expressions.PrintExpression),
+    (tokens.VarReservedWord, expressions.VarExpression),
+]
+
+# closes the group a GroupExpression token opened
+CLOSING_TOKEN: Type[Token] = tokens.RightParenthesisSymbol
+
+TABLE_PATH = os.path.join(os.path.dirname(__file__), "dispatch_table.py")
+
+
+# The source of `app.dispatch_table`: the tables above reduced to token kinds and class
+# names, plus the engine names, so the command line and the parser can use them without
+# importing the expressions and engines modules they were built from.
+def render() -> str:
+    lines = [
+        "# Generated by `python -m app.dispatch`; edit the tables there, not this file.",
+        "",
+        "# token class names by kind, the order the token classes are defined in",
+        "TOKEN_CLASSES = (",
+        *(f"    {cls.__name__!r}," for cls in Token._kind2class),
+        ")",
+        "",
+        "# expression class name by the kind of the token it is built from",
+        "EXPRESSION_CLASSES = {",
+        *(f"    {token_cls.kind}: {cls.__name__!r},  # {token_cls.__name__}" for token_cls, cls in TOKEN_EXPRESSIONS),
+        "}",
+        "",
+        f"CLOSING_KIND = {CLOSING_TOKEN.kind}  # {CLOSING_TOKEN.__name__}",
+        "",
+        f"ENGINE_NAMES = {tuple(Engine.names())!r}",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="generate app/dispatch_table.py")
+    arg_parser.add_argument("--check", action="store_true", help="fail if the generated module is out of date")
+    args = arg_parser.parse_args()
+
+    source = render()
+    try:
+        with open(TABLE_PATH, encoding="utf-8") as f:
+            current = f.read()
+    except FileNotFoundError:
+        current = None
+
+    if args.check:
+        if current != source:
+            print(f"{TABLE_PATH} is out of date, run `python -m app.dispatch`", file=sys.stderr)
+            exit(1)
+    elif current != source:
+        with open(TABLE_PATH, "w", encoding="utf-8") as f:
+            f.write(source)
+
+
+if __name__ == "__main__":
+    main()
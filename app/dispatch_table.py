@@ -0,0 +1,77 @@
+# Generated by `python -m app.dispatch`; edit the tables there, not this file.
+
+# token class names by kind, the order the token classes are defined in
+TOKEN_CLASSES = (
+    'Identifier',
+    'StringLiteral',
+    'NumberLiteral',
+    'Symbol',
+    'ReservedWord',
+    'LeftBraceSymbol',
+    'RightBraceSymbol',
+    'LeftParenthesisSymbol',
+    'RightParenthesisSymbol',
+    'StarSymbol',
+    'DotSymbol',
+    'CommaSymbol',
+    'PlusSymbol',
+    'MinusSymbol',
+    'SemicolonSymbol',
+    'BangSymbol',
+    'EqualSymbol',
+    'EqualEqualSymbol',
+    'BangEqualSymbol',
+    'LessSymbol',
+    'LessEqualSymbol',
+    'GreaterSymbol',
+    'GreaterEqualSymbol',
+    'SlashSymbol',
+    'EOFSymbol',
+    'AndReservedWord',
+    'OrReservedWord',
+    'ClassReservedWord',
+    'ElseReservedWord',
+    'FalseReservedWord',
+    'TrueReservedWord',
+    'NilReservedWord',
+    'ForReservedWord',
+    'FunReservedWord',
+    'IfReservedWord',
+    'PrintReservedWord',
+    'ReturnReservedWord',
+    'SuperReservedWord',
+    'ThisReservedWord',
+    'VarReservedWord',
+    'WhileReservedWord',
+)
+
+# expression class name by the kind of the token it is built from
+EXPRESSION_CLASSES = {
+    0: 'IdentifierExpression',  # Identifier
+    1: 'StringLiteralExpression',  # StringLiteral
+    2: 'NumberLiteralExpression',  # NumberLiteral
+    7: 'GroupExpression',  # LeftParenthesisSymbol
+    9: 'MultiplyExpression',  # StarSymbol
+    12: 'PlusExpression',  # PlusSymbol
+    13: 'MinusNegativeExpressionRouter',  # MinusSymbol
+    15: 'BangExpression',  # BangSymbol
+    16: 'AssignExpression',  # EqualSymbol
+    17: 'EqualEqualExpression',  # EqualEqualSymbol
+    18: 'BangEqualExpression',  # BangEqualSymbol
+    19: 'LessExpression',  # LessSymbol
+    20: 'LessEqualExpression',  # LessEqualSymbol
+    21: 'GreaterExpression',  # GreaterSymbol
+    22: 'GreaterEqualExpression',  # GreaterEqualSymbol
+    23: 'DivideExpression',  # SlashSymbol
+    25: 'AndExpression',  # AndReservedWord
+    26: 'OrExpression',  # OrReservedWord
+    29: 'BooleanLiteralExpression',  # FalseReservedWord
+    30: 'BooleanLiteralExpression',  # TrueReservedWord
+    31: 'NilLiteralExpression',  # NilReservedWord
+    35: 'PrintExpression',  # PrintReservedWord
+    39: 'VarExpression',  # VarReservedWord
+}
+
+CLOSING_KIND = 8  # RightParenthesisSymbol
+
+ENGINE_NAMES = ('tree', 'closure', 'vm', 'py')
@@ -0,0 +1,19 @@
+from .engine import Engine, TreeWalkEngine, ScopeTable
+from .closure import ClosureEngine, ClosureCompiler
+from .bytecode import Chunk, BytecodeCompiler
+from .vm import VirtualMachine
+from .transpiler import PythonTranspiler, PythonProgram, PythonEngine
+
+__all__ = [
+    Engine.__name__,
+    TreeWalkEngine.__name__,
+    ScopeTable.__name__,
+    ClosureEngine.__name__,
+    ClosureCompiler.__name__,
+    Chunk.__name__,
+    BytecodeCompiler.__name__,
+    VirtualMachine.__name__,
+    PythonTranspiler.__name__,
+    PythonProgram.__name__,
+    PythonEngine.__name__,
+]
@@ -0,0 +1,252 @@
+from array import array
+from typing import Any, Optional
+
+from ..execution import ExecutionScope
+from ..expressions import (
+    ConstantPool,
+    Expression,
+    StringLiteralExpression,
+    NumberLiteralExpression,
+    BooleanLiteralExpression,
+    NilLiteralExpression,
+    GroupExpression,
+    IdentifierExpression,
+    NegativeExpression,
+    BangExpression,
+    PlusExpression,
+    MinusExpression,
+    DivideExpression,
+    MultiplyExpression,
+    AndExpression,
+    OrExpression,
+    EqualEqualExpression,
+    BangEqualExpression,
+    LessExpression,
+    LessEqualExpression,
+    GreaterExpression,
+    GreaterEqualExpression,
+    AssignExpression,
+    PrintExpression,
+    VarExpression,
+)
+from .engine import Program, ScopeTable
+
+
+# Every instruction is an opcode byte and a 16-bit little-endian argument. Larger arguments
+# are preceded by EXTENDED_ARG instructions carrying their higher bits, most significant
+# first.
+(
+    CONSTANT,
+    GET_SLOT,
+    GET_NAME,
+    SET_SLOT,
+    SET_NAME,
+    DEFINE_SLOT,
+    DEFINE_NAME,
+    ADD,
+    # the binary operators from SUBTRACT to GREATER_EQUAL are decoded as a range
+    SUBTRACT,
+    MULTIPLY,
+    DIVIDE,
+    EQUAL,
+    NOT_EQUAL,
+    LESS,
+    LESS_EQUAL,
+    GREATER,
+    GREATER_EQUAL,
+    NEGATE,
+    NOT,
+    JUMP_IF_FALSE_OR_POP,
+    JUMP_IF_TRUE_OR_POP,
+    PRINT,
+    POP,
+    SCOPE,
+    EVALUATE,
+    EXTENDED_ARG,
+) = range(26)
+
+OPCODE_NAMES = [
+    "CONSTANT", "GET_SLOT", "GET_NAME", "SET_SLOT", "SET_NAME", "DEFINE_SLOT", "DEFINE_NAME",
+    "ADD", "SUBTRACT", "MULTIPLY", "DIVIDE", "EQUAL", "NOT_EQUAL", "LESS", "LESS_EQUAL",
+    "GREATER", "GREATER_EQUAL", "NEGATE", "NOT", "JUMP_IF_FALSE_OR_POP", "JUMP_IF_TRUE_OR_POP",
+    "PRINT", "POP", "SCOPE", "EVALUATE", "EXTENDED_ARG",
+]
+
+_OPERATORS: dict[type, int] = {
+    PlusExpression: ADD,
+    MinusExpression: SUBTRACT,
+    MultiplyExpression: MULTIPLY,
+    DivideExpression: DIVIDE,
+    EqualEqualExpression: EQUAL,
+    BangEqualExpression: NOT_EQUAL,
+    LessExpression: LESS,
+    LessEqualExpression: LESS_EQUAL,
+    GreaterExpression: GREATER,
+    GreaterEqualExpression: GREATER_EQUAL,
+    NegativeExpression: NEGATE,
+    BangExpression: NOT,
+}
+_UNARY = {NegativeExpression, BangExpression}
+_LITERALS = {StringLiteralExpression, NumberLiteralExpression, BooleanLiteralExpression, NilLiteralExpression}
+
+# jump targets are patched in after the code they skip is emitted, so they always take
+# this many EXTENDED_ARG prefixes
+_JUMP_PREFIXES = 1
+
+
+# A whole program as one code string. Scopes are referred to by their number in `scopes`,
+# so a chunk holds no live objects apart from the expressions in `fallbacks`.
+class Chunk:
+    def __init__(self) -> None:
+        self.code = array("B")
+        self.constants = ConstantPool()
+        self.names: list[str] = []
+        # (scope number, slot) of every resolved variable
+        self.slots: list[tuple[int, int]] = []
+        self.scopes = ScopeTable()
+        # expressions the instruction set does not cover, evaluated by the tree-walker
+        self.fallbacks: list[Expression] = []
+
+    def emit(self, opcode: int, arg: int = 0) -> None:
+        if arg > 0xFFFF:
+            self.emit(EXTENDED_ARG, arg >> 16)
+        self.code.extend((opcode, arg & 0xFF, (arg >> 8) & 0xFF))
+
+    def emit_jump(self, opcode: int) -> int:
+        for _ in range(_JUMP_PREFIXES):
+            self.code.extend((EXTENDED_ARG, 0, 0))
+        self.code.extend((opcode, 0, 0))
+        return len(self.code)
+
+    def patch_jump(self, end: int) -> None:
+        # `end` is where the jump instruction finishes; it lands on the next instruction
+        target = len(self.code)
+        for index in range(_JUMP_PREFIXES + 1):
+            self.code[end - 2 - 3 * index] = (target >> (16 * index)) & 0xFF
+            self.code[end - 1 - 3 * index] = (target >> (16 * index + 8)) & 0xFF
+
+    def disassemble(self) -> str:
+        lines = []
+        ip, start, arg = 0, 0, 0
+        while ip < len(self.code):
+            opcode, arg = self.code[ip], arg << 16 | self.code[ip + 1] | self.code[ip + 2] << 8
+            ip += 3
+            if opcode != EXTENDED_ARG:
+                lines.append(f"{start:>6} {OPCODE_NAMES[opcode]:<22} {arg}")
+                start, arg = ip, 0
+        return "\n".join(lines)
+
+
+# Emits code for expressions in postfix order from an explicit work stack, so statements
+# of any depth compile without recursion.
+class BytecodeCompiler:
+    def __init__(self) -> None:
+        self.chunk = Chunk()
+        self._names: dict[str, int] = {}
+        self._slots: dict[tuple[int, int], int] = {}
+
+    def compile(self, program: Program) -> Chunk:
+        current: Optional[int] = None
+        for scope, expression in program:
+            number = self.chunk.scopes.number(scope)
+            if number != current:
+                self.chunk.emit(SCOPE, number)
+                current = number
+            self.__expression(expression, scope)
+            self.chunk.emit(POP)
+        return self.chunk
+
+    def __name(self, identifier: IdentifierExpression) -> int:
+        name = identifier.name.lexeme
+        index = self._names.get(name)
+        if index is None:
+            index = self._names[name] = len(self.chunk.names)
+            self.chunk.names.append(name)
+        return index
+
+    def __slot(self, identifier: IdentifierExpression, scope: ExecutionScope) -> int:
+        depth = identifier.depth
+        while depth:
+            scope = scope.parent  # type: ignore[assignment]
+            depth -= 1
+        key = (self.chunk.scopes.number(scope), identifier.slot)
+        index = self._slots.get(key)
+        if index is None:
+            index = self._slots[key] = len(self.chunk.slots)
+            self.chunk.slots.append(key)
+        return index
+
+    def __expression(self, root: Expression, scope: ExecutionScope) -> None:
+        # pending work: an expression to visit, an instruction packed as `opcode | arg << 8`,
+        # an (opcode, end) jump to emit or the `end` list of a jump to patch
+        chunk = self.chunk
+        work: list[Any] = [root]
+        while work:
+            node = work.pop()
+            cls = node.__class__
+            if cls is int:
+                chunk.emit(node & 0xFF, node >> 8)
+            elif cls in _LITERALS:
+                chunk.emit(CONSTANT, chunk.constants.add(node.constant))
+            elif cls is IdentifierExpression:
+                if node.depth is None:
+                    chunk.emit(GET_NAME, self.__name(node))
+                else:
+                    chunk.emit(GET_SLOT, self.__slot(node, scope))
+            elif cls in _OPERATORS:
+                work.append(_OPERATORS[cls])
+                work.append(node.right)
+                if cls not in _UNARY:
+                    work.append(node.left)
+            elif cls is GroupExpression:
+                if node.expr is None:
+                    chunk.emit(CONSTANT, chunk.constants.add(None))
+                else:
+                    work.append(node.expr)
+            elif cls is tuple:
+                opcode, end = node
+                end.append(chunk.emit_jump(opcode))
+            elif cls is list:
+                chunk.patch_jump(node[0])
+            elif cls is AndExpression or cls is OrExpression:
+                # the left value is the result when it decides the outcome
+                end: list[int] = []
+                work.append(end)
+                work.append(node.right)
+                work.append((JUMP_IF_FALSE_OR_POP if cls is AndExpression else JUMP_IF_TRUE_OR_POP, end))
+                work.append(node.left)
+            elif cls is PrintExpression:
+                work.append(PRINT)
+                work.append(node.right)
+            elif cls is AssignExpression and node.left.__class__ is IdentifierExpression:
+                target = node.left
+                if target.depth is None:
+                    work.append(SET_NAME | self.__name(target) << 8)
+                else:
+                    work.append(SET_SLOT | self.__slot(target, scope) << 8)
+                work.append(node.right)
+            elif cls is VarExpression and self.__declares(node):
+                target, initializer = node.right, None
+                if target.__class__ is AssignExpression:
+                    target, initializer = target.left, target.right
+                # declarations always land in the statement's own scope
+                if target.depth is None:
+                    work.append(DEFINE_NAME | self.__name(target) << 8)
+                else:
+                    work.append(DEFINE_SLOT | self.__slot(target, scope) << 8)
+                if initializer is None:
+                    work.append(CONSTANT | chunk.constants.add(None) << 8)
+                else:
+                    work.append(initializer)
+            else:
+                if root._deep:
+                    node._deep = True
+                chunk.emit(EVALUATE, len(chunk.fallbacks))
+                chunk.fallbacks.append(node)
+
+    @staticmethod
+    def __declares(node: VarExpression) -> bool:
+        target = node.right
+        if target.__class__ is AssignExpression:
+            target = target.left  # type: ignore[attr-defined]
+        return target.__class__ is IdentifierExpression
@@ -0,0 +1,320 @@
+import gc
+import operator
+from functools import partial
+from typing import Any, Callable, Type
+
+from ..execution import ExecutionScope
+from ..expressions import (
+    Expression,
+    LiteralExpression,
+    StringLiteralExpression,
+    NumberLiteralExpression,
+    BooleanLiteralExpression,
+    NilLiteralExpression,
+    GroupExpression,
+    IdentifierExpression,
+    NegativeExpression,
+    BangExpression,
+    PlusExpression,
+    MinusExpression,
+    DivideExpression,
+    MultiplyExpression,
+    AndExpression,
+    OrExpression,
+    EqualEqualExpression,
+    BangEqualExpression,
+    LessExpression,
+    LessEqualExpression,
+    GreaterExpression,
+    GreaterEqualExpression,
+    AssignExpression,
+    PrintExpression,
+    VarExpression,
+    ROPE_THRESHOLD,
+)
+from .engine import Engine, Program
+
+
+Closure = Callable[[], Any]
+Rule = Callable[['ClosureCompiler', Any, ExecutionScope], Closure]
+
+
+# Turns a statement into nested Python closures, once. Every statement runs against the
+# scope it was parsed in, so the scope, resolved value lists, operands and constants are
+# all captured up front and running a statement is a call to its outermost closure.
+# Checks that can fail run inline and hand the failing values to the node's own
+# `operate`, so errors are raised by exactly the code the tree-walker uses.
+class ClosureCompiler:
+    _rules: dict[Type[Expression], Rule] = {}
+
+    @classmethod
+    def rule(cls, *expression_classes: Type[Expression]) -> Callable[[Rule], Rule]:
+        def wrapped(rule: Rule) -> Rule:
+            for expression_cls in expression_classes:
+                cls._rules[expression_cls] = rule
+            return rule
+
+        return wrapped
+
+    def compile_program(self, program: Program) -> list[Closure]:
+        # every node becomes a few container objects, enough to set off repeated full
+        # collections that traverse the whole program while it is compiled
+        enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return [self.compile(expression, scope) for scope, expression in program]
+        finally:
+            if enabled:
+                gc.enable()
+
+    def compile(self, expression: Expression, scope: ExecutionScope) -> Closure:
+        if expression._deep:
+            # deeper than the closures could nest on the Python call stack
+            return partial(expression.evaluate, scope)
+        return self.closure(expression, scope)
+
+    def closure(self, node: Expression, scope: ExecutionScope) -> Closure:
+        rule = self._rules.get(node.__class__)
+        if rule is None:
+            return partial(node._evaluate, scope)
+        return rule(self, node, scope)
+
+
+@Engine.register
+class ClosureEngine(Engine):
+    name = "closure"
+    streams = True
+
+    def compile(self, program: Program) -> list[Closure]:
+        return ClosureCompiler().compile_program(program)
+
+    def execute(self, compiled: list[Closure]) -> None:
+        for statement in compiled:
+            statement()
+
+
+# *********************************************** Leaves ***********************************************
+@ClosureCompiler.rule(
+    StringLiteralExpression,
+    NumberLiteralExpression,
+    BooleanLiteralExpression,
+    NilLiteralExpression,
+)
+def _literal(compiler: ClosureCompiler, node: LiteralExpression, scope: ExecutionScope) -> Closure:
+    value = node.constant
+    return lambda: value
+
+
+@ClosureCompiler.rule(IdentifierExpression)
+def _identifier(compiler: ClosureCompiler, node: IdentifierExpression, scope: ExecutionScope) -> Closure:
+    if node.depth is None:
+        fetch, name = scope.fetch_variable, node.name.lexeme
+        return lambda: fetch(name).value
+
+    values, slot = _values(node, scope), node.slot
+    return lambda: values[slot]
+
+
+def _values(node: IdentifierExpression, scope: ExecutionScope) -> list[Any]:
+    depth = node.depth
+    while depth:
+        scope = scope.parent  # type: ignore[assignment]
+        depth -= 1
+    return scope.values
+
+
+@ClosureCompiler.rule(GroupExpression)
+def _group(compiler: ClosureCompiler, node: GroupExpression, scope: ExecutionScope) -> Closure:
+    if node.expr is None:
+        return lambda: None
+    return compiler.closure(node.expr, scope)
+
+
+# *********************************************** Unary ***********************************************
+@ClosureCompiler.rule(NegativeExpression)
+def _negative(compiler: ClosureCompiler, node: NegativeExpression, scope: ExecutionScope) -> Closure:
+    right, operate = compiler.closure(node.right, scope), node.operate
+
+    def negative() -> Any:
+        value = right()
+        if value.__class__ is int or value.__class__ is float:
+            return -value
+        return operate(scope, value)
+
+    return negative
+
+
+@ClosureCompiler.rule(BangExpression)
+def _bang(compiler: ClosureCompiler, node: BangExpression, scope: ExecutionScope) -> Closure:
+    right = compiler.closure(node.right, scope)
+    return lambda: not right()
+
+
+# *********************************************** Binary ***********************************************
+@ClosureCompiler.rule(PlusExpression)
+def _plus(compiler: ClosureCompiler, node: PlusExpression, scope: ExecutionScope) -> Closure:
+    left, operate = compiler.closure(node.left, scope), node.operate
+    if node.right.__class__ is NumberLiteralExpression:
+        constant = node.right.constant  # type: ignore[attr-defined]
+
+        def plus_number() -> Any:
+            value = left()
+            if value.__class__ is int or value.__class__ is float:
+                return value + constant
+            return operate(scope, value, constant)
+
+        return plus_number
+
+    right = compiler.closure(node.right, scope)
+
+    def plus() -> Any:
+        left_v, right_v = left(), right()
+        left_cls, right_cls = left_v.__class__, right_v.__class__
+        if (
+            (left_cls is int or left_cls is float) and (right_cls is int or right_cls is float) or
+            left_cls is str and right_cls is str and len(left_v) + len(right_v) < ROPE_THRESHOLD
+        ):
+            return left_v + right_v
+        # long strings and ropes become ropes
+        return operate(scope, left_v, right_v)
+
+    return plus
+
+
+# the numeric operators all check their operands the same way before applying `function`
+def _numeric(function: Callable[[Any, Any], Any]) -> Rule:
+    def rule(compiler: ClosureCompiler, node: Any, scope: ExecutionScope) -> Closure:
+        left, operate = compiler.closure(node.left, scope), node.operate
+        if node.right.__class__ is NumberLiteralExpression:
+            constant = node.right.constant
+
+            def numeric_number() -> Any:
+                value = left()
+                if value.__class__ is int or value.__class__ is float:
+                    return function(value, constant)
+                return operate(scope, value, constant)
+
+            return numeric_number
+
+        right = compiler.closure(node.right, scope)
+
+        def numeric() -> Any:
+            left_v, right_v = left(), right()
+            if (
+                (left_v.__class__ is int or left_v.__class__ is float) and
+                (right_v.__class__ is int or right_v.__class__ is float)
+            ):
+                return function(left_v, right_v)
+            return operate(scope, left_v, right_v)
+
+        return numeric
+
+    return rule
+
+
+def _divide(left_v: Any, right_v: Any) -> Any:
+    if left_v % right_v:
+        return left_v / right_v
+    return left_v // right_v
+
+
+ClosureCompiler.rule(MinusExpression)(_numeric(operator.sub))
+ClosureCompiler.rule(MultiplyExpression)(_numeric(operator.mul))
+ClosureCompiler.rule(DivideExpression)(_numeric(_divide))
+ClosureCompiler.rule(LessExpression)(_numeric(operator.lt))
+ClosureCompiler.rule(LessEqualExpression)(_numeric(operator.le))
+ClosureCompiler.rule(GreaterExpression)(_numeric(operator.gt))
+ClosureCompiler.rule(GreaterEqualExpression)(_numeric(operator.ge))
+
+
+@ClosureCompiler.rule(EqualEqualExpression)
+def _equal(compiler: ClosureCompiler, node: EqualEqualExpression, scope: ExecutionScope) -> Closure:
+    left, right = compiler.closure(node.left, scope), compiler.closure(node.right, scope)
+    return lambda: left() == right()
+
+
+@ClosureCompiler.rule(BangEqualExpression)
+def _not_equal(compiler: ClosureCompiler, node: BangEqualExpression, scope: ExecutionScope) -> Closure:
+    left, right = compiler.closure(node.left, scope), compiler.closure(node.right, scope)
+    return lambda: left() != right()
+
+
+@ClosureCompiler.rule(AndExpression)
+def _and(compiler: ClosureCompiler, node: AndExpression, scope: ExecutionScope) -> Closure:
+    left, right = compiler.closure(node.left, scope), compiler.closure(node.right, scope)
+    return lambda: left() and right()
+
+
+@ClosureCompiler.rule(OrExpression)
+def _or(compiler: ClosureCompiler, node: OrExpression, scope: ExecutionScope) -> Closure:
+    left, right = compiler.closure(node.left, scope), compiler.closure(node.right, scope)
+    return lambda: left() or right()
+
+
+@ClosureCompiler.rule(AssignExpression)
+def _assign(compiler: ClosureCompiler, node: AssignExpression, scope: ExecutionScope) -> Closure:
+    if node.left.__class__ is not IdentifierExpression:
+        # assignments through `var` and invalid targets keep the tree-walker's behaviour
+        return partial(node._evaluate, scope)
+
+    target: IdentifierExpression = node.left  # type: ignore[assignment]
+    right = compiler.closure(node.right, scope)
+    if target.depth is None:
+        fetch, name = scope.fetch_variable, target.name.lexeme
+
+        def assign_dynamic() -> Any:
+            value = right()
+            fetch(name).value = value
+            return value
+
+        return assign_dynamic
+
+    values, slot = _values(target, scope), target.slot
+
+    def assign() -> Any:
+        value = values[slot] = right()
+        return value
+
+    return assign
+
+
+# *********************************************** Statement ***********************************************
+@ClosureCompiler.rule(PrintExpression)
+def _print(compiler: ClosureCompiler, node: PrintExpression, scope: ExecutionScope) -> Closure:
+    right = compiler.closure(node.right, scope)
+    root = scope.root
+
+    def print_value() -> None:
+        root.output.write_value(right())
+
+    return print_value
+
+
+@ClosureCompiler.rule(VarExpression)
+def _var(compiler: ClosureCompiler, node: VarExpression, scope: ExecutionScope) -> Closure:
+    identifier: Any = node.right
+    if identifier.__class__ is IdentifierExpression:
+        initializer: Closure = lambda: None
+    elif identifier.__class__ is AssignExpression and identifier.left.__class__ is IdentifierExpression:
+        initializer = compiler.closure(identifier.right, scope)
+        identifier = identifier.left
+    else:
+        return partial(node._evaluate, scope)
+
+    if identifier.depth is None:
+        create, name = scope.create_variable, identifier.name.lexeme
+
+        def declare_dynamic() -> Any:
+            value = initializer()
+            create(name).value = value
+            return value
+
+        return declare_dynamic
+
+    values, slot = scope.values, identifier.slot
+
+    def declare() -> Any:
+        value = values[slot] = initializer()
+        return value
+
+    return declare
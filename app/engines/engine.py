@@ -0,0 +1,108 @@
+from abc import ABC, abstractmethod
+from typing import Any, Optional, Type
+
+from ..execution import ExecutionScope
+from ..expressions import Expression
+from ..output import OutputSink
+
+
+Program = list[tuple[ExecutionScope, Expression]]
+
+
+# A way of running a parsed program; `run --engine=<name>` picks one by name. Engines that
+# translate the program first do it in `compile`, so the two phases can be timed apart.
+# Engines whose compiled form can be marshalled offer it through `dump` and `load`, so a
+# cached program skips compilation as well as parsing.
+class Engine(ABC):
+    name: str
+    # runs statements against the scopes they were parsed in, so a program can be
+    # compiled and executed one statement at a time as it is parsed
+    streams: bool = False
+    _engines: dict[str, Type['Engine']] = {}
+
+    @classmethod
+    def register(cls, engine_cls: Type['Engine']) -> Type['Engine']:
+        cls._engines[engine_cls.name] = engine_cls
+        return engine_cls
+
+    @classmethod
+    def names(cls) -> list[str]:
+        return list(cls._engines)
+
+    # `output` is where `print` writes in the scopes an engine builds for itself; programs
+    # that run in the parser's scopes write to the sink of the context that parsed them
+    def __init__(self, output: Optional[OutputSink] = None) -> None:
+        self.output = output
+
+    @classmethod
+    def create(cls, name: str, output: Optional[OutputSink] = None) -> 'Engine':
+        return cls._engines[name](output)
+
+    def compile(self, program: Program) -> Any:
+        return program
+
+    @abstractmethod
+    def execute(self, compiled: Any) -> None:
+        ...
+
+    # a marshallable form of `compiled`, or None when only the program itself can be kept
+    def dump(self, compiled: Any) -> Optional[Any]:
+        return None
+
+    def load(self, payload: Any) -> Any:
+        raise NotImplementedError
+
+    def run(self, program: Program) -> None:
+        self.execute(self.compile(program))
+
+
+@Engine.register
+class TreeWalkEngine(Engine):
+    name = "tree"
+    streams = True
+
+    def execute(self, compiled: Program) -> None:
+        for scope, expression in compiled:
+            expression.evaluate(scope)
+
+
+# Numbers the scopes of a program in the order they are first seen, parents first, and
+# describes each by its parent's number and the count of resolved slots it holds, which is
+# all an engine needs to build equivalent scopes of its own.
+class ScopeTable:
+    def __init__(self) -> None:
+        self.parents: list[int] = []
+        self.sizes: list[int] = []
+        self._numbers: dict[ExecutionScope, int] = {}
+
+    @classmethod
+    def restore(cls, parents: list[int], sizes: list[int]) -> 'ScopeTable':
+        table = cls()
+        table.parents, table.sizes = list(parents), list(sizes)
+        return table
+
+    def number(self, scope: ExecutionScope) -> int:
+        number = self._numbers.get(scope)
+        if number is not None:
+            return number
+
+        unnumbered: list[ExecutionScope] = []
+        current: Optional[ExecutionScope] = scope
+        while current is not None and current not in self._numbers:
+            unnumbered.append(current)
+            current = current.parent
+        for pending in reversed(unnumbered):
+            self.parents.append(-1 if pending.parent is None else self._numbers[pending.parent])
+            self.sizes.append(len(pending.values))
+            self._numbers[pending] = len(self.sizes) - 1
+        return self._numbers[scope]
+
+    def build(self, output: Optional[OutputSink] = None) -> list[ExecutionScope]:
+        scopes: list[ExecutionScope] = []
+        for parent, size in zip(self.parents, self.sizes):
+            scope = ExecutionScope(scopes[parent] if parent >= 0 else None)
+            scope.values = [None] * size
+            if parent < 0 and output is not None:
+                scope.output = output
+            scopes.append(scope)
+        return scopes
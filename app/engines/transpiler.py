@@ -0,0 +1,442 @@
+import ast
+import math
+from types import CodeType
+from typing import Any, Optional
+
+from ..utils import NoneNumberOperandError, UnMatchedOprendError
+from ..execution import ExecutionScope
+from ..expressions import (
+    Expression,
+    StringLiteralExpression,
+    NumberLiteralExpression,
+    BooleanLiteralExpression,
+    NilLiteralExpression,
+    GroupExpression,
+    IdentifierExpression,
+    NegativeExpression,
+    BangExpression,
+    PlusExpression,
+    MinusExpression,
+    DivideExpression,
+    MultiplyExpression,
+    AndExpression,
+    OrExpression,
+    EqualEqualExpression,
+    BangEqualExpression,
+    LessExpression,
+    LessEqualExpression,
+    GreaterExpression,
+    GreaterEqualExpression,
+    AssignExpression,
+    PrintExpression,
+    VarExpression,
+    Rope,
+    ROPE_THRESHOLD,
+)
+from .engine import Engine, Program, ScopeTable
+
+
+# static types of operands; anything else is only known at run time
+_NUMBER, _STRING, _BOOL, _NIL, _UNKNOWN = range(5)
+
+_LITERALS = {StringLiteralExpression, NumberLiteralExpression, BooleanLiteralExpression, NilLiteralExpression}
+_NUMERIC = {
+    MinusExpression: "-",
+    MultiplyExpression: "*",
+    LessExpression: "<",
+    LessEqualExpression: "<=",
+    GreaterExpression: ">",
+    GreaterEqualExpression: ">=",
+}
+_EQUALITY = {EqualEqualExpression: "==", BangEqualExpression: "!="}
+
+# `if` blocks an `and` / `or` chain may nest before the rest of it is handed to the
+# tree-walker; Python refuses to indent much deeper than 100 levels
+MAX_BRANCH_DEPTH = 64
+
+_MAIN = "_lox_main"
+
+
+_NUMBERS = frozenset([int, float])
+_STRINGS = frozenset([str, Rope])
+
+
+def _plus_error(left: Any, right: Any) -> None:
+    if (
+        (left.__class__ is int or left.__class__ is float or left.__class__ in _STRINGS) and
+        (right.__class__ is int or right.__class__ is float or right.__class__ in _STRINGS)
+    ):
+        raise UnMatchedOprendError()
+    raise NoneNumberOperandError()
+
+
+# A program lowered to one Python function, compiled with `compile()`. `code` is the module
+# defining it; the function takes the program's scopes, the expressions left to the
+# tree-walker and the constants that have no literal form. A program loaded from the cache
+# comes with its code object and without the source.
+class PythonProgram:
+    def __init__(
+        self,
+        source: Optional[str],
+        scopes: ScopeTable,
+        fallbacks: list[Expression],
+        constants: list[Any],
+        code: Optional[CodeType] = None,
+    ) -> None:
+        self.source = source
+        self.code: CodeType = code if code is not None else compile(source, "<lox>", "exec")  # type: ignore[arg-type]
+        self.scopes = scopes
+        self.fallbacks = fallbacks
+        self.constants = constants
+
+
+# Lowers every statement to flat Python statements over temporaries, one per operation,
+# so expressions of any depth become straight-line code and CPython's own eval loop runs
+# the program. Resolved variables become locals of the generated function, renamed after
+# their scope and slot. Operators carry inline type checks, dropped where an operand's
+# type is known from its literal or the operation that produced it, and raise the same
+# errors as the tree-walker. Expressions this does not cover are evaluated by the
+# tree-walker against real scopes; a program with any keeps resolved variables in those
+# scopes' value lists instead of locals.
+class PythonTranspiler:
+    def transpile(self, program: Program) -> PythonProgram:
+        self.__reset(in_scopes=False)
+        source = self.__lower(program)
+        if self.fallbacks:
+            self.__reset(in_scopes=True)
+            source = self.__lower(program)
+        return PythonProgram(source, self.scopes, self.fallbacks, self.constants)
+
+    def __reset(self, in_scopes: bool) -> None:
+        self.in_scopes = in_scopes
+        self.scopes = ScopeTable()
+        self.fallbacks: list[Expression] = []
+        self.constants: list[Any] = []
+        self.lines: list[str] = []
+        self.locals: dict[tuple[int, int], str] = {}
+        self.scope_aliases: set[int] = set()
+        self.value_aliases: set[int] = set()
+        self.temps = 0
+        self.indent = 1
+        # static types of locals known at the current point of the straight-line code, and
+        # the facts from before every open `and` / `or` branch
+        self.known: dict[str, int] = {}
+        self.branch_facts: list[dict[str, int]] = []
+
+    def __lower(self, program: Program) -> str:
+        for scope, expression in program:
+            self.__statement(expression, scope)
+
+        prologue = []
+        for number in sorted(self.scope_aliases):
+            prologue.append(f"    _scope{number} = _scopes[{number}]")
+        for number in sorted(self.value_aliases):
+            prologue.append(f"    _values{number} = _scopes[{number}].values")
+        names = list(self.locals.values())
+        for start in range(0, len(names), 256):
+            prologue.append("    " + " = ".join(names[start:start + 256]) + " = None")
+
+        header = f"def {_MAIN}(_scopes, _fallbacks, _constants):"
+        body = prologue + self.lines or ["    pass"]
+        return "\n".join([header, *body]) + "\n"
+
+    def __emit(self, line: str) -> None:
+        self.lines.append("    " * self.indent + line)
+
+    def __temp(self) -> str:
+        self.temps += 1
+        return f"_t{self.temps}"
+
+    # *********************************************** Operands ***********************************************
+    def __literal(self, value: Any) -> tuple[str, int]:
+        cls = value.__class__
+        if cls is bool:
+            return repr(value), _BOOL
+        if value is None:
+            return "None", _NIL
+        if cls is str:
+            return repr(value), _STRING
+        if cls is int or (cls is float and math.isfinite(value)):
+            return (f"({value!r})" if value < 0 or repr(value).startswith("-") else repr(value)), _NUMBER
+        self.constants.append(value)
+        return f"_constants[{len(self.constants) - 1}]", _NUMBER
+
+    def __variable(self, identifier: IdentifierExpression, scope: ExecutionScope) -> str:
+        depth = identifier.depth
+        while depth:
+            scope = scope.parent  # type: ignore[assignment]
+            depth -= 1
+        number = self.scopes.number(scope)
+        if self.in_scopes:
+            self.value_aliases.add(number)
+            return f"_values{number}[{identifier.slot}]"
+        key = (number, identifier.slot)
+        name = self.locals.get(key)
+        if name is None:
+            name = self.locals[key] = f"v_{identifier.name.lexeme}_{number}_{identifier.slot}"
+        return name
+
+    def __scope(self, scope: ExecutionScope) -> str:
+        number = self.scopes.number(scope)
+        self.scope_aliases.add(number)
+        return f"_scope{number}"
+
+    # run time tests for a type, None when the static type already guarantees it
+    @staticmethod
+    def __is_number(operand: str, kind: int) -> Optional[str]:
+        if kind == _NUMBER:
+            return None
+        if kind != _UNKNOWN:
+            return "False"
+        return f"{operand}.__class__ in _NUMBERS"
+
+    @staticmethod
+    def __is_string(operand: str, kind: int) -> Optional[str]:
+        if kind == _STRING:
+            return None
+        if kind != _UNKNOWN:
+            return "False"
+        return f"{operand}.__class__ in _STRINGS"
+
+    # `left + right` for two Lox strings; no rope is shorter than the threshold, so
+    # operands shorter than it together are plain strings. The length of a literal is
+    # counted here rather than when the program runs.
+    @staticmethod
+    def __concat(left: str, right: str) -> str:
+        room = ROPE_THRESHOLD
+        lengths = []
+        for operand in (left, right):
+            if operand[0] in "'\"":
+                room -= len(ast.literal_eval(operand))
+            else:
+                lengths.append(f"len({operand})")
+        if not lengths:
+            return f"{left} + {right}" if room > 0 else f"_Rope({left}, {right})"
+        return f"({left} + {right} if {' + '.join(lengths)} < {room} else _Rope({left}, {right}))"
+
+    # *********************************************** Statements ***********************************************
+    def __statement(self, root: Expression, scope: ExecutionScope) -> None:
+        # operands waiting for their operation: Python expressions with no side effects,
+        # either literals, variables or temporaries, and their static types
+        values: list[tuple[str, int]] = []
+        work: list[Any] = [root]
+        branches = 0
+        # temporaries never outlive their statement, and few locals keep compile() fast
+        self.temps = 0
+        while work:
+            node = work.pop()
+            cls = node.__class__
+
+            if cls is tuple:
+                # an operation whose operands are now on `values`
+                node, phase = node
+                cls = node.__class__
+                if cls is AndExpression or cls is OrExpression:
+                    if phase == 0:
+                        temp = self.__temp()
+                        self.__emit(f"{temp} = {values.pop()[0]}")
+                        # reads copied inside the branch would not exist when it is skipped
+                        self.__materialize(values, None)
+                        self.__emit(f"if {temp}:" if cls is AndExpression else f"if not {temp}:")
+                        self.indent += 1
+                        self.branch_facts.append(self.known.copy())
+                        branches += 1
+                        values.append((temp, _UNKNOWN))
+                        work.append((node, 1))
+                        work.append(node.right)
+                    else:
+                        right = values.pop()[0]
+                        temp = values[-1][0]
+                        self.__emit(f"{temp} = {right}")
+                        self.indent -= 1
+                        # only what holds whether or not the branch ran
+                        before = self.branch_facts.pop()
+                        self.known = {name: kind for name, kind in before.items() if self.known.get(name) == kind}
+                        branches -= 1
+                    continue
+                values.append(self.__operate(node, values, scope))
+                continue
+
+            if cls in _LITERALS:
+                values.append(self.__literal(node.constant))
+            elif cls is IdentifierExpression:
+                if node.depth is not None and not self.in_scopes:
+                    variable = self.__variable(node, scope)
+                    values.append((variable, self.known.get(variable, _UNKNOWN)))
+                elif node.depth is not None:
+                    temp = self.__temp()
+                    self.__emit(f"{temp} = {self.__variable(node, scope)}")
+                    values.append((temp, _UNKNOWN))
+                else:
+                    # a failed lookup has to happen at this point of the evaluation order
+                    temp = self.__temp()
+                    self.__emit(f"{temp} = {self.__scope(scope)}.fetch_variable({node.name.lexeme!r}).value")
+                    values.append((temp, _UNKNOWN))
+            elif cls is GroupExpression:
+                if node.expr is None:
+                    values.append(("None", _NIL))
+                else:
+                    work.append(node.expr)
+            elif cls in _NUMERIC or cls in _EQUALITY or cls is PlusExpression or cls is DivideExpression:
+                work.append((node, 0))
+                work.append(node.right)
+                work.append(node.left)
+            elif cls is NegativeExpression or cls is BangExpression or cls is PrintExpression:
+                work.append((node, 0))
+                work.append(node.right)
+            elif (cls is AndExpression or cls is OrExpression) and branches < MAX_BRANCH_DEPTH:
+                work.append((node, 0))
+                work.append(node.left)
+            elif cls is AssignExpression and node.left.__class__ is IdentifierExpression:
+                work.append((node, 0))
+                work.append(node.right)
+            elif cls is VarExpression and self.__declares(node):
+                target = node.right
+                if target.__class__ is AssignExpression:
+                    work.append((node, 0))
+                    work.append(target.right)
+                else:
+                    values.append(("None", _NIL))
+                    values.append(self.__operate(node, values, scope))
+            else:
+                # the tree-walker may read or write any variable
+                self.__materialize(values, None)
+                if root._deep:
+                    node._deep = True
+                temp = self.__temp()
+                self.__emit(f"{temp} = _fallbacks[{len(self.fallbacks)}].evaluate({self.__scope(scope)})")
+                self.fallbacks.append(node)
+                values.append((temp, _UNKNOWN))
+
+    def __operate(self, node: Any, values: list[tuple[str, int]], scope: ExecutionScope) -> tuple[str, int]:
+        cls = node.__class__
+        if cls is NegativeExpression:
+            operand, kind = values.pop()
+            self.__require_numbers([(operand, kind)])
+            temp = self.__temp()
+            self.__emit(f"{temp} = -{operand}")
+            return temp, _NUMBER
+        if cls is BangExpression:
+            temp = self.__temp()
+            self.__emit(f"{temp} = not {values.pop()[0]}")
+            return temp, _BOOL
+        if cls is PrintExpression:
+            operand, kind = values.pop()
+            if kind == _NUMBER or kind == _STRING:
+                self.__emit(f"_print_line({operand})")
+            else:
+                self.__emit(f"_print({operand})")
+            return "None", _NIL
+        if cls is AssignExpression or cls is VarExpression:
+            operand, kind = values.pop()
+            target = node.left if cls is AssignExpression else node.right
+            if target.__class__ is AssignExpression:
+                target = target.left
+            if target.depth is not None:
+                variable = self.__variable(target, scope)
+                # operands already read keep the value they had
+                self.__materialize(values, variable)
+                self.__emit(f"{variable} = {operand}")
+                self.known[variable] = kind
+            elif cls is AssignExpression:
+                self.__emit(f"{self.__scope(scope)}.fetch_variable({target.name.lexeme!r}).value = {operand}")
+            else:
+                self.__emit(f"{self.__scope(scope)}.create_variable({target.name.lexeme!r}).value = {operand}")
+            return operand, kind
+
+        right, right_kind = values.pop()
+        left, left_kind = values.pop()
+        temp = self.__temp()
+        if cls in _EQUALITY:
+            self.__emit(f"{temp} = {left} {_EQUALITY[cls]} {right}")
+            return temp, _BOOL
+
+        if cls is PlusExpression:
+            if left_kind == right_kind and left_kind == _NUMBER:
+                self.__emit(f"{temp} = {left} + {right}")
+                return temp, _NUMBER
+            if left_kind == right_kind and left_kind == _STRING:
+                self.__emit(f"{temp} = {self.__concat(left, right)}")
+                return temp, _STRING
+            numbers = [self.__is_number(left, left_kind), self.__is_number(right, right_kind)]
+            strings = [self.__is_string(left, left_kind), self.__is_string(right, right_kind)]
+            either = " or ".join(" and ".join(filter(None, tests)) or "True" for tests in (numbers, strings))
+            self.__emit(f"if not ({either}):")
+            self.__emit(f"    _plus_error({left}, {right})")
+            # past the check both operands are numbers or both are strings
+            if left_kind == _NUMBER or right_kind == _NUMBER:
+                self.__emit(f"{temp} = {left} + {right}")
+            elif left_kind == _STRING or right_kind == _STRING:
+                self.__emit(f"{temp} = {self.__concat(left, right)}")
+            else:
+                self.__emit(f"{temp} = {left} + {right} if {left}.__class__ in _NUMBERS else {self.__concat(left, right)}")
+            return temp, _UNKNOWN
+
+        self.__require_numbers([(left, left_kind), (right, right_kind)])
+        if cls is DivideExpression:
+            self.__emit(f"{temp} = {left} / {right} if {left} % {right} else {left} // {right}")
+            return temp, _NUMBER
+        self.__emit(f"{temp} = {left} {_NUMERIC[cls]} {right}")
+        return temp, _NUMBER if cls is MinusExpression or cls is MultiplyExpression else _BOOL
+
+    def __require_numbers(self, operands: list[tuple[str, int]]) -> None:
+        checks = []
+        for operand, kind in operands:
+            check = self.__is_number(operand, kind)
+            if check and check not in checks:
+                checks.append(check)
+        if checks:
+            self.__emit(f"if not ({' and '.join(checks)}):")
+            self.__emit("    raise NoneNumberOperandError()")
+        # past the check, locals are known to hold numbers until they are assigned
+        for operand, _ in operands:
+            if operand.startswith("v_"):
+                self.known[operand] = _NUMBER
+
+    def __materialize(self, values: list[tuple[str, int]], variable: Optional[str]) -> None:
+        # copy pending reads of `variable`, or of every variable, into temporaries
+        for index, (operand, kind) in enumerate(values):
+            if operand.startswith("v_"):
+                if variable is None or operand == variable:
+                    temp = self.__temp()
+                    self.__emit(f"{temp} = {operand}")
+                    values[index] = (temp, kind)
+
+    @staticmethod
+    def __declares(node: VarExpression) -> bool:
+        target = node.right
+        if target.__class__ is AssignExpression:
+            target = target.left  # type: ignore[attr-defined]
+        return target.__class__ is IdentifierExpression
+
+
+@Engine.register
+class PythonEngine(Engine):
+    name = "py"
+
+    def compile(self, program: Program) -> PythonProgram:
+        return PythonTranspiler().transpile(program)
+
+    def dump(self, compiled: PythonProgram) -> Optional[Any]:
+        if compiled.fallbacks:
+            return None
+        return (compiled.code, compiled.scopes.parents, compiled.scopes.sizes, compiled.constants)
+
+    def load(self, payload: Any) -> PythonProgram:
+        code, parents, sizes, constants = payload
+        return PythonProgram(None, ScopeTable.restore(parents, sizes), [], list(constants), code)
+
+    def execute(self, compiled: PythonProgram) -> None:
+        scopes = compiled.scopes.build(self.output)
+        output = scopes[0].output if scopes else ExecutionScope.output
+        namespace = {
+            "NoneNumberOperandError": NoneNumberOperandError,
+            "_plus_error": _plus_error,
+            "_print": output.write_value,
+            "_print_line": output.write_line,
+            "_NUMBERS": _NUMBERS,
+            "_STRINGS": _STRINGS,
+            "_Rope": Rope,
+        }
+        exec(compiled.code, namespace)
+        namespace[_MAIN](scopes, compiled.fallbacks, compiled.constants)
@@ -0,0 +1,180 @@
+from typing import Any, Optional
+
+from ..utils import NoneNumberOperandError, UnMatchedOprendError
+from ..execution import ExecutionScope
+from ..expressions import Rope, ROPE_THRESHOLD
+from .engine import Engine, Program, ScopeTable
+from .bytecode import (
+    Chunk,
+    BytecodeCompiler,
+    CONSTANT,
+    GET_SLOT,
+    GET_NAME,
+    SET_SLOT,
+    SET_NAME,
+    DEFINE_SLOT,
+    DEFINE_NAME,
+    ADD,
+    SUBTRACT,
+    MULTIPLY,
+    DIVIDE,
+    NEGATE,
+    NOT,
+    EQUAL,
+    NOT_EQUAL,
+    LESS,
+    LESS_EQUAL,
+    GREATER,
+    GREATER_EQUAL,
+    JUMP_IF_FALSE_OR_POP,
+    JUMP_IF_TRUE_OR_POP,
+    PRINT,
+    POP,
+    SCOPE,
+    EVALUATE,
+    EXTENDED_ARG,
+)
+
+
+# A dispatch loop over a chunk with a value stack. The scopes are rebuilt from the
+# chunk's description, so a chunk runs the same whether it was just compiled or not.
+@Engine.register
+class VirtualMachine(Engine):
+    name = "vm"
+
+    def compile(self, program: Program) -> Chunk:
+        return BytecodeCompiler().compile(program)
+
+    def dump(self, compiled: Chunk) -> Optional[Any]:
+        if compiled.fallbacks:
+            return None
+        return (
+            compiled.code.tobytes(),
+            compiled.constants.values,
+            compiled.names,
+            compiled.slots,
+            compiled.scopes.parents,
+            compiled.scopes.sizes,
+        )
+
+    def load(self, payload: Any) -> Chunk:
+        code, constants, names, slots, parents, sizes = payload
+        chunk = Chunk()
+        chunk.code.frombytes(code)
+        for value in constants:
+            chunk.constants.add(value)
+        chunk.names = list(names)
+        chunk.slots = [tuple(slot) for slot in slots]
+        chunk.scopes = ScopeTable.restore(parents, sizes)
+        return chunk
+
+    def execute(self, compiled: Chunk) -> None:
+        scopes = compiled.scopes.build(self.output)
+        slot_values = [scopes[number].values for number, _ in compiled.slots]
+        slot_indices = [slot for _, slot in compiled.slots]
+
+        code = compiled.code.tobytes()
+        constants = compiled.constants.values
+        names = compiled.names
+        fallbacks = compiled.fallbacks
+        stack: list[Any] = []
+        push, pop = stack.append, stack.pop
+        scope = scopes[0] if scopes else ExecutionScope(None)
+        write_value = scope.output.write_value
+
+        ip, end = 0, len(code)
+        while ip < end:
+            opcode, arg = code[ip], code[ip + 1] | code[ip + 2] << 8
+            ip += 3
+            while opcode == EXTENDED_ARG:
+                opcode, arg = code[ip], arg << 16 | code[ip + 1] | code[ip + 2] << 8
+                ip += 3
+
+            if opcode == CONSTANT:
+                push(constants[arg])
+            elif opcode == GET_SLOT:
+                push(slot_values[arg][slot_indices[arg]])
+            elif opcode == GET_NAME:
+                push(scope.fetch_variable(names[arg]).value)
+            elif opcode == ADD:
+                right = pop()
+                left = stack[-1]
+                left_cls, right_cls = left.__class__, right.__class__
+                if (
+                    (left_cls is int or left_cls is float) and (right_cls is int or right_cls is float) or
+                    left_cls is str and right_cls is str and len(left) + len(right) < ROPE_THRESHOLD
+                ):
+                    stack[-1] = left + right
+                elif (left_cls is str or left_cls is Rope) and (right_cls is str or right_cls is Rope):
+                    stack[-1] = Rope(left, right)
+                elif (
+                    (left_cls is int or left_cls is float or left_cls is str or left_cls is Rope) and
+                    (right_cls is int or right_cls is float or right_cls is str or right_cls is Rope)
+                ):
+                    raise UnMatchedOprendError()
+                else:
+                    raise NoneNumberOperandError()
+            elif SUBTRACT <= opcode <= GREATER_EQUAL:
+                right = pop()
+                left = stack[-1]
+                if opcode == EQUAL:
+                    stack[-1] = left == right
+                    continue
+                if opcode == NOT_EQUAL:
+                    stack[-1] = left != right
+                    continue
+                if (
+                    (left.__class__ is not int and left.__class__ is not float) or
+                    (right.__class__ is not int and right.__class__ is not float)
+                ):
+                    raise NoneNumberOperandError()
+                if opcode == SUBTRACT:
+                    stack[-1] = left - right
+                elif opcode == MULTIPLY:
+                    stack[-1] = left * right
+                elif opcode == DIVIDE:
+                    stack[-1] = left / right if left % right else left // right
+                elif opcode == LESS:
+                    stack[-1] = left < right
+                elif opcode == LESS_EQUAL:
+                    stack[-1] = left <= right
+                elif opcode == GREATER:
+                    stack[-1] = left > right
+                else:
+                    stack[-1] = left >= right
+            elif opcode == POP:
+                pop()
+            elif opcode == PRINT:
+                write_value(stack[-1])
+                stack[-1] = None
+            elif opcode == DEFINE_SLOT:
+                slot_values[arg][slot_indices[arg]] = stack[-1]
+            elif opcode == DEFINE_NAME:
+                scope.create_variable(names[arg]).value = stack[-1]
+            elif opcode == SET_SLOT:
+                slot_values[arg][slot_indices[arg]] = stack[-1]
+            elif opcode == SET_NAME:
+                scope.fetch_variable(names[arg]).value = stack[-1]
+            elif opcode == NEGATE:
+                value = stack[-1]
+                if value.__class__ is not int and value.__class__ is not float:
+                    raise NoneNumberOperandError()
+                stack[-1] = -value
+            elif opcode == NOT:
+                stack[-1] = not stack[-1]
+            elif opcode == JUMP_IF_FALSE_OR_POP:
+                if stack[-1]:
+                    pop()
+                else:
+                    ip = arg
+            elif opcode == JUMP_IF_TRUE_OR_POP:
+                if stack[-1]:
+                    ip = arg
+                else:
+                    pop()
+            elif opcode == SCOPE:
+                scope = scopes[arg]
+            elif opcode == EVALUATE:
+                push(fallbacks[arg].evaluate(scope))
+            else:
+                raise ValueError(f"bad opcode {opcode} at {ip - 3}")
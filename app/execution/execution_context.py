@@ -1,14 +1,23 @@
 from typing import Any, TYPE_CHECKING, Optional, cast
 
 from ..utils import UndefinedVariableError, RuntimeError
+from ..output import OutputSink, StreamOutputSink
 
 if TYPE_CHECKING:
     from ..expressions import IdentifierExpression
 
+# Owns the scopes of one program and the sink its `print` statements write to, which
+# the root scope carries so every scope below it can reach it.
 class ExecutionContext:
-    def __init__(self) -> None:
+    def __init__(self, output: Optional[OutputSink] = None) -> None:
         self.root_scope = ExecutionScope(None)
         self._current_scope = self.root_scope
+        if output is not None:
+            self.root_scope.output = output
+    
+    @property
+    def output(self) -> OutputSink:
+        return self.root_scope.output
     
     @property
     def current_scope(self) -> 'ExecutionScope':
@@ -26,10 +35,16 @@ class ExecutionContext:
 
 class ExecutionScope:
     _variables: dict[str, 'Variable']
+    # values of the names the resolver bound to this scope, by slot
+    values: list[Any]
+    # where `print` writes; only the root scope's is used
+    output: OutputSink = StreamOutputSink()
     
     def __init__(self, parent: Optional['ExecutionScope']) -> None:
         self.parent = parent
+        self.root: ExecutionScope = parent.root if parent is not None else self
         self._variables = {}
+        self.values = []
     
     def create_variable(self, name: str) -> 'Variable':
         self._variables[name] = Variable(self, name)
@@ -1,6 +1,11 @@
 from .expressions import *
+from .constant_pool import ConstantPool
+from .rope import Rope, flatten, ROPE_THRESHOLD
 
 __all__ = [
+    ConstantPool.__name__,
+    Rope.__name__,
+    flatten.__name__,
     Expression.__name__,
     LiteralExpression.__name__,
     GroupExpression.__name__,
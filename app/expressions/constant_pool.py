@@ -0,0 +1,27 @@
+from typing import Any
+
+
+# Decoded literal values of one program; equal values of the same type share one slot and
+# one object.
+class ConstantPool:
+    def __init__(self) -> None:
+        self.values: list[Any] = []
+        self._slots: dict[tuple[type, Any], int] = {}
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    # nodes keep the values they were given, so a pool can be emptied once the
+    # statements using it are built
+    def clear(self) -> None:
+        self.values.clear()
+        self._slots.clear()
+
+    def add(self, value: Any) -> int:
+        # floats are keyed by their representation so that 0.0 and -0.0 stay apart
+        key = (value.__class__, repr(value) if value.__class__ is float else value)
+        slot = self._slots.get(key)
+        if slot is None:
+            slot = self._slots[key] = len(self.values)
+            self.values.append(value)
+        return slot
@@ -1,11 +1,13 @@
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional, Type, Union, cast
+from typing import TYPE_CHECKING, Any, Callable, Optional, Type, Union, cast
 
-from ..utils import MissingExpressionError, NoneNumberOperandError, UnMatchedOprendError, RuntimeError
+from ..utils import NoneNumberOperandError, UnMatchedOprendError, RuntimeError
+from .rope import Rope, ROPE_THRESHOLD
 
 if TYPE_CHECKING:
     from ..tokens import Token
-    from ..execution import ExecutionScope, Variable
+    from .constant_pool import ConstantPool
+    from ..execution import ExecutionScope
 
 
 def precedence(pre: int) -> Callable[[Type['Expression']], Type['Expression']]:
@@ -24,190 +26,178 @@ def right_associative(cls: Type['Expression']) -> Type['Expression']:
     cls._right_associative = True
     return cls
 
+
+def pure(cls: Type['Expression']) -> Type['Expression']:
+    # `operate` has no side effects, so it may run ahead of time on constant operands
+    cls._pure = True
+    return cls
+
+
+def short_circuit(proceed_on: bool) -> Callable[[Type['Expression']], Type['Expression']]:
+    # the right operand is only evaluated when the left one's truth value is `proceed_on`
+    def wrapped(cls: Type['Expression']) -> Type['Expression']:
+        cls._proceed_on = proceed_on
+        return cls
+    
+    return wrapped
+
 @precedence(0)
 class Expression(ABC):
     _precedence: int
     _statement: bool = False
     _right_associative: bool = False
-    _token2expression_map: dict[Type['Token'], Type['Expression']] = {}
-    
+    _proceed_on: Optional[bool] = None
+    _pure: bool = False
+    # evaluated without looking at operands
+    _leaf: bool = False
+    # set by the parser on statements too large to evaluate on the Python call stack
+    _deep: bool = False
+
     @abstractmethod
-    def __init__(
-        self, 
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        iter: Iterator['Token']
-    ) -> None:
+    def pieces(self) -> tuple[Union[str, 'Expression'], ...]:
         ...
-        
-    @abstractmethod
+
     def __str__(self) -> str:
-        ...
-    
-    @staticmethod
-    def from_iter(
-        iter: Iterator['Token'],
-        prev_expr: Optional['Expression'],
-    ):
-        token = next(iter)
-        return Expression.from_token(token, prev_expr, iter)
-    
-    @classmethod
-    @abstractmethod
-    def from_token(
-        cls: Type['Expression'],
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        iter: Iterator['Token']
-    ) -> 'Expression':
-        if token.__class__ not in Expression._token2expression_map:
-            raise MissingExpressionError(-1, token)
-        
-        return Expression._token2expression_map[token.__class__].from_token(token, prev_expr, iter)
-    
-    @abstractmethod
+        parts: list[str] = []
+        pending: list[Any] = [self]
+        while pending:
+            item = pending.pop()
+            if item.__class__ is str:
+                parts.append(item)
+            elif item._leaf:
+                parts.append(item.pieces()[0])
+            else:
+                pending.extend(item.pieces()[::-1])
+        return "".join(parts)
+
     def evaluate(self, scope: 'ExecutionScope') -> Any:
+        if self._deep:
+            return _evaluate_on_stack(self, scope)
+        return self._evaluate(scope)
+
+    @abstractmethod
+    def _evaluate(self, scope: 'ExecutionScope') -> Any:
         ...
-    
-    @classmethod
-    def yield_from(cls: Type['Expression'], token_cls: Type['Token']):
-        Expression._token2expression_map[token_cls] = cls
-        return token_cls
+
+    # what `operate` needs evaluated first, in order
+    def operands(self) -> tuple['Expression', ...]:
+        return ()
+
+    def operate(self, scope: 'ExecutionScope', *values: Any) -> Any:
+        raise NotImplementedError
 
 
 class LiteralExpression(Expression, ABC):
-    __slots__= ["value"]
+    __slots__= ["value", "constant"]
     value: 'Token'
+    constant: Any
+    _leaf = True
     
-    def __init__(
-        self, 
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        iter: Iterator['Token']
-    ) -> None:
+    def __init__(self, token: 'Token', constants: Optional['ConstantPool'] = None) -> None:
         self.value = token
+        self.constant = self.decode(token)
+        if constants is not None:
+            self.constant = constants.values[constants.add(self.constant)]
+
+    @staticmethod
+    @abstractmethod
+    def decode(token: 'Token') -> Any:
+        ...
+
+    def _evaluate(self, scope: 'ExecutionScope') -> Any:
+        return self.constant
     
+    def pieces(self) -> tuple[str]:
+        return (str(self),)
+
     @abstractmethod
     def __str__(self) -> str:
         ...
 
-    @classmethod
-    def from_token(
-        cls: Type['LiteralExpression'],
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        iter: Iterator['Token']
-    ) -> "LiteralExpression":
-        return cls(token, prev_expr, iter)
-
 
+@pure
 class GroupExpression(Expression):
     __slots__ = ["expr"]
     expr: Optional[Expression]
     
-    def __init__(
-        self, 
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        iter: Iterator['Token']
-    ) -> None:
-        self.expr = None
-        for token in iter:
-            if token.lexeme == ")":
-                break
-            self.expr = Expression.from_token(token, self.expr, iter)
+    def __init__(self, expr: Optional[Expression]) -> None:
+        self.expr = expr
         
-    def __str__(self) -> str:
-        return f"(group {self.expr if self.expr else ''})"
-
-    @classmethod
-    def from_token(
-        cls: Type['GroupExpression'],
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        iter: Iterator['Token']
-    ) -> "GroupExpression":
-        return cls(token, prev_expr, iter)
+    def pieces(self) -> tuple[Union[str, Expression], ...]:
+        return ("(group ", self.expr if self.expr else "", ")")
 
-    def evaluate(self, scope: 'ExecutionScope') -> Any:
+    def _evaluate(self, scope: 'ExecutionScope') -> Any:
         if self.expr:
-            return self.expr.evaluate(scope)
+            return self.expr._evaluate(scope)
         else:
             return None
 
+    def operands(self) -> tuple[Expression, ...]:
+        return (self.expr,) if self.expr else ()
+
+    def operate(self, scope: 'ExecutionScope', value: Any = None) -> Any:
+        return value
+
 
 class IdentifierExpression(Expression):
-    __slots__ = ["name"]
+    __slots__ = ["name", "depth", "slot"]
     name: 'Token'
+    # scopes to walk up and the index of the value there; names the resolver did not bind
+    # keep `depth` None and are looked up by name
+    depth: Optional[int]
+    slot: int
+    _leaf = True
     
-    def __init__(
-        self, 
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        iter: Iterator['Token']
-    ) -> None:
+    def __init__(self, token: 'Token') -> None:
         self.name = token
+        self.depth = None
+        self.slot = 0
+
+    def _evaluate(self, scope: 'ExecutionScope') -> Any:
+        depth = self.depth
+        if depth is None:
+            return scope.fetch_variable(self.name.lexeme).value
+        while depth:
+            scope = scope.parent  # type: ignore[assignment]
+            depth -= 1
+        return scope.values[self.slot]
     
-    @classmethod
-    def from_token(
-        cls: Type['IdentifierExpression'],
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        iter: Iterator['Token']
-    ) -> "IdentifierExpression":
-        return cls(token, prev_expr, iter)
-
-    def evaluate(self, scope: 'ExecutionScope') -> Any:
-        return scope.fetch_variable(self.name.lexeme).value
-    
-    def left_value_evaluate(self, scope: 'ExecutionScope') -> 'Variable':
-        return scope.fetch_variable(self.name.lexeme)
+    def store(self, scope: 'ExecutionScope', value: Any) -> None:
+        depth = self.depth
+        if depth is None:
+            scope.fetch_variable(self.name.lexeme).value = value
+            return
+        while depth:
+            scope = scope.parent  # type: ignore[assignment]
+            depth -= 1
+        scope.values[self.slot] = value
+
+    def declare(self, scope: 'ExecutionScope', value: Any) -> None:
+        if self.depth is None:
+            scope.create_variable(self.name.lexeme).value = value
+        else:
+            scope.values[self.slot] = value
 
-    def __str__(self) -> str:
-        return f"(Identifier {self.name.lexeme})"
+    def pieces(self) -> tuple[str]:
+        return (f"(Identifier {self.name.lexeme})",)
 
 class UnaryExpression(Expression, ABC):
     __slots__ = ["operator", "right"]
     operator: 'Token'
     right: 'Expression'
 
-    def __init__(
-        self, 
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        iter: Iterator['Token']
-    ) -> None:
-        self.operator = token
-        self.right = Expression.from_iter(iter, None)
+    def __init__(self, operator: 'Token', right: 'Expression') -> None:
+        self.operator = operator
+        self.right = right
 
-    def __str__(self) -> str:
-        return f"({self.operator.lexeme} {self.right})"
-
-    @classmethod
-    def from_token(
-        cls: Type['UnaryExpression'],
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        iter: Iterator['Token']
-    ) -> "Expression":
-        if prev_expr:        
-            right_most = UnaryExpression.__rightest_unary(prev_expr)
-            if right_most and right_most.operator == token:
-                _self = cls(token, right_most.right, iter)
-                right_most.right = _self
-                return prev_expr
-
-        return cls(token, prev_expr, iter)
+    def pieces(self) -> tuple[Union[str, Expression], ...]:
+        return ("(", self.operator.lexeme, " ", self.right, ")")
 
-    @staticmethod
-    def __rightest_unary(expr: Expression) -> Optional['UnaryExpression']:
-        second_rightest: Optional[Union[UnaryExpression, BinaryExpression]] = None
-        rightest = expr
-        while hasattr(rightest, "right"):
-            second_rightest = cast(Union[UnaryExpression, BinaryExpression], rightest)
-            rightest = second_rightest.right
-        
-        return second_rightest if (second_rightest and isinstance(second_rightest, UnaryExpression)) else None
+    def _evaluate(self, scope: 'ExecutionScope') -> Any:
+        return self.operate(scope, self.right._evaluate(scope))
+
+    def operands(self) -> tuple[Expression, ...]:
+        return (self.right,)
     
 
 class BinaryExpression(Expression, ABC):
@@ -216,94 +206,61 @@ class BinaryExpression(Expression, ABC):
     right: 'Expression'
     left: 'Expression'
 
-    def __init__(
-        self, 
-        token: 'Token', 
-        prev_expr: 'Expression', 
-        iter: Iterator['Token']
-    ) -> None:        
-        self.operator = token
-        self.left = prev_expr
-        self.right = Expression.from_iter(iter, None)
+    def __init__(self, operator: 'Token', left: 'Expression', right: 'Expression') -> None:
+        self.operator = operator
+        self.left = left
+        self.right = right
 
-    def __str__(self) -> str:
-        return f"({self.operator.lexeme} {self.left} {self.right})"
-
-    @classmethod
-    def from_token(
-        cls: Type['BinaryExpression'],
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        iter: Iterator['Token']
-    ) -> "Expression":
-        if not prev_expr:
-            raise MissingExpressionError(-1, token)
-        
-        return cls.__insert_self_node(token, prev_expr, iter)
-
-    @classmethod
-    def __insert_self_node(
-        cls: Type['BinaryExpression'],
-        token: 'Token', 
-        current: 'Expression', 
-        iter: Iterator['Token']
-    ) -> "Expression":
-        if not hasattr(current, "right") or current._precedence > cls._precedence:
-            return cls(token, current, iter)
-
-        right_node = cls.__insert_self_node(token, current.right, iter)
-        if (
-            (current.__class__ == right_node.__class__ and current._right_associative) or
-            (right_node._precedence > current._precedence)
-        ):
-            current.right = right_node
-            return current    
-        else:
-            assert isinstance(right_node, BinaryExpression)
-            current.right = right_node.left
-            right_node.left = current
-                        
-            return right_node
+    def pieces(self) -> tuple[Union[str, Expression], ...]:
+        return ("(", self.operator.lexeme, " ", self.left, " ", self.right, ")")
+
+    def _evaluate(self, scope: 'ExecutionScope') -> Any:
+        return self.operate(scope, self.left._evaluate(scope), self.right._evaluate(scope))
+
+    def operands(self) -> tuple[Expression, ...]:
+        return (self.left, self.right)
 
 # *********************************************** Literal ***********************************************
 class StringLiteralExpression(LiteralExpression):
     def __str__(self) -> str:
         return self.value.literal
         
-    def evaluate(self, scope: 'ExecutionScope') -> str:
-        return self.value.literal
+    @staticmethod
+    def decode(token: 'Token') -> str:
+        return token.literal
        
         
 class NumberLiteralExpression(LiteralExpression):
     def __str__(self) -> str:
         return self.value.literal
         
-    def evaluate(self, scope: 'ExecutionScope') -> Union[int, float]:
-        if "." in self.value.lexeme:
-            return float(self.value.lexeme)
-        return int(self.value.lexeme)
+    @staticmethod
+    def decode(token: 'Token') -> Union[int, float]:
+        return token.value  # type: ignore[attr-defined]
 
 
 class BooleanLiteralExpression(LiteralExpression):
     def __str__(self) -> str:
         return self.value.lexeme
 
-    def evaluate(self, scope: 'ExecutionScope') -> bool:
-        return self.value.lexeme == "true"
+    @staticmethod
+    def decode(token: 'Token') -> bool:
+        return token.lexeme == "true"
     
 
 class NilLiteralExpression(LiteralExpression):
     def __str__(self) -> str:
         return self.value.lexeme
 
-    def evaluate(self, scope: 'ExecutionScope') -> None:
+    @staticmethod
+    def decode(token: 'Token') -> None:
         return None
 
 # *********************************************** Unary ***********************************************
 @precedence(5)
+@pure
 class NegativeExpression(UnaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> Any:
-        right_v = self.right.evaluate(scope)
+    def operate(self, scope: 'ExecutionScope', right_v: Any) -> Any:
         if not _is_number(right_v):
             raise NoneNumberOperandError()
 
@@ -311,21 +268,25 @@ class NegativeExpression(UnaryExpression):
 
 
 @precedence(5)
+@pure
 class BangExpression(UnaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> bool:        
-        return not self.right.evaluate(scope)
+    def operate(self, scope: 'ExecutionScope', right_v: Any) -> bool:        
+        return not right_v
     
         
 # *********************************************** Binary ***********************************************
 @precedence(3)
+@pure
 class PlusExpression(BinaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> Any:        
-        left_v = self.left.evaluate(scope)
-        right_v = self.right.evaluate(scope)
+    def operate(self, scope: 'ExecutionScope', left_v: Any, right_v: Any) -> Any:
         if isinstance(left_v, str) and isinstance(right_v, str):
-            return left_v + right_v
+            if len(left_v) + len(right_v) < ROPE_THRESHOLD:
+                return left_v + right_v
+            return Rope(left_v, right_v)
         if _is_number(left_v) and _is_number(right_v):
             return left_v + right_v
+        if _is_string(left_v) and _is_string(right_v):
+            return Rope(left_v, right_v)
         
         if (
             (_is_string(left_v) or _is_number(left_v)) and
@@ -337,10 +298,9 @@ class PlusExpression(BinaryExpression):
         
 
 @precedence(3)
+@pure
 class MinusExpression(BinaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> Any:
-        left_v = self.left.evaluate(scope)
-        right_v = self.right.evaluate(scope)
+    def operate(self, scope: 'ExecutionScope', left_v: Any, right_v: Any) -> Any:
         if not _is_number(left_v) or not _is_number(right_v):
             raise NoneNumberOperandError()
         
@@ -349,10 +309,9 @@ class MinusExpression(BinaryExpression):
 
 # @precedence(3)
 @precedence(4)
+@pure
 class DivideExpression(BinaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> Any:
-        left_v = self.left.evaluate(scope)
-        right_v = self.right.evaluate(scope)
+    def operate(self, scope: 'ExecutionScope', left_v: Any, right_v: Any) -> Any:
         if not _is_number(left_v) or not _is_number(right_v):
             raise NoneNumberOperandError()
         
@@ -364,76 +323,71 @@ class DivideExpression(BinaryExpression):
     
 # @precedence(3)
 @precedence(4)
+@pure
 class MultiplyExpression(BinaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> Any:
-        left_v = self.left.evaluate(scope)
-        right_v = self.right.evaluate(scope)
+    def operate(self, scope: 'ExecutionScope', left_v: Any, right_v: Any) -> Any:
         if not _is_number(left_v) or not _is_number(right_v):
             raise NoneNumberOperandError()
         
         return left_v * right_v 
     
 
+@short_circuit(True)
 class AndExpression(BinaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> bool:        
-        return self.left.evaluate(scope) and self.right.evaluate(scope) 
+    def _evaluate(self, scope: 'ExecutionScope') -> bool:        
+        return self.left._evaluate(scope) and self.right._evaluate(scope) 
 
 
+@short_circuit(False)
 class OrExpression(BinaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> bool:        
-        return self.left.evaluate(scope) or self.right.evaluate(scope)
+    def _evaluate(self, scope: 'ExecutionScope') -> bool:        
+        return self.left._evaluate(scope) or self.right._evaluate(scope)
     
 
 @precedence(1)
+@pure
 class EqualEqualExpression(BinaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> bool:
-        left_v = self.left.evaluate(scope)
-        right_v = self.right.evaluate(scope)
+    def operate(self, scope: 'ExecutionScope', left_v: Any, right_v: Any) -> bool:
         return left_v == right_v
 
 
 @precedence(1)
+@pure
 class BangEqualExpression(BinaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> bool:
-        left_v = self.left.evaluate(scope)
-        right_v = self.right.evaluate(scope)
+    def operate(self, scope: 'ExecutionScope', left_v: Any, right_v: Any) -> bool:
         return left_v != right_v
 
 
 @precedence(2)
+@pure
 class LessExpression(BinaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> bool:
-        left_v = self.left.evaluate(scope)
-        right_v = self.right.evaluate(scope)
+    def operate(self, scope: 'ExecutionScope', left_v: Any, right_v: Any) -> bool:
         if not _is_number(left_v) or not _is_number(right_v):
             raise NoneNumberOperandError()
         return left_v < right_v
 
 @precedence(2)
+@pure
 class LessEqualExpression(BinaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> bool:
-        left_v = self.left.evaluate(scope)
-        right_v = self.right.evaluate(scope)
+    def operate(self, scope: 'ExecutionScope', left_v: Any, right_v: Any) -> bool:
         if not _is_number(left_v) or not _is_number(right_v):
             raise NoneNumberOperandError()
         return left_v <= right_v
 
 
 @precedence(2)
+@pure
 class GreaterExpression(BinaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> bool:
-        left_v = self.left.evaluate(scope)
-        right_v = self.right.evaluate(scope)
+    def operate(self, scope: 'ExecutionScope', left_v: Any, right_v: Any) -> bool:
         if not _is_number(left_v) or not _is_number(right_v):
             raise NoneNumberOperandError()
         return left_v > right_v
 
 
 @precedence(2)
+@pure
 class GreaterEqualExpression(BinaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> bool:
-        left_v = self.left.evaluate(scope)
-        right_v = self.right.evaluate(scope)
+    def operate(self, scope: 'ExecutionScope', left_v: Any, right_v: Any) -> bool:
         if not _is_number(left_v) or not _is_number(right_v):
             raise NoneNumberOperandError()
         return left_v >= right_v
@@ -441,16 +395,20 @@ class GreaterEqualExpression(BinaryExpression):
 
 @right_associative
 class AssignExpression(BinaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> None:
+    def _evaluate(self, scope: 'ExecutionScope') -> None:
+        return self.operate(scope, self.operands()[0]._evaluate(scope))
+
+    def operands(self) -> tuple[Expression, ...]:
         assert (
             isinstance(self.left, IdentifierExpression) or 
             isinstance(self.left, VarExpression)
         )
+        return (self.right,)
+
+    def operate(self, scope: 'ExecutionScope', right_v: Any) -> None:
         left_expr = cast(Union[IdentifierExpression, VarExpression], self.left)
-        right_v = self.right.evaluate(scope)
         
-        var = left_expr.left_value_evaluate(scope)
-        var.value = right_v
+        left_expr.store(scope, right_v)
         
         return right_v
 
@@ -458,63 +416,98 @@ class AssignExpression(BinaryExpression):
 # *********************************************** Statement ***********************************************
 @statement
 class PrintExpression(UnaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> Any:
-        value = self.right.evaluate(scope)
-        if isinstance(value, bool):
-            print(str(value).lower())
-        elif value is None:
-            print("nil")
-        else:
-            print(value)
+    def operate(self, scope: 'ExecutionScope', value: Any) -> Any:
+        scope.root.output.write_value(value)
 
 
 @statement
 class VarExpression(UnaryExpression):
-    def evaluate(self, scope: 'ExecutionScope') -> None:
+    def _evaluate(self, scope: 'ExecutionScope') -> None:
+        if self.__initialized():
+            return self.operate(scope, cast(AssignExpression, self.right).right._evaluate(scope))
+        return self.operate(scope)
+
+    def operands(self) -> tuple[Expression, ...]:
+        if self.__initialized():
+            return (cast(AssignExpression, self.right).right,)
+        return ()
+
+    # `values` holds the initializer's value when there is one
+    def operate(self, scope: 'ExecutionScope', *values: Any) -> None:
         iden: IdentifierExpression
         if self.right.__class__ == IdentifierExpression:
             iden = cast(IdentifierExpression, self.right)
-            return scope.create_variable(iden.name.lexeme).value
-        elif (
-            self.right.__class__ == AssignExpression and 
-            cast(AssignExpression, self.right).left.__class__ == IdentifierExpression
-        ):
+            iden.declare(scope, None)
+            return None
+        elif values:
             assign_expr: AssignExpression = cast(AssignExpression, self.right)
             iden = cast(IdentifierExpression, assign_expr.left)
-            value = assign_expr.right.evaluate(scope)
-            var = scope.create_variable(iden.name.lexeme)
-            var.value = value
+            value = values[0]
+            iden.declare(scope, value)
             
             return value
                 
         raise RuntimeError()
+
+    def __initialized(self) -> bool:
+        return (
+            self.right.__class__ == AssignExpression and 
+            cast(AssignExpression, self.right).left.__class__ == IdentifierExpression
+        )
         
     
-    def left_value_evaluate(self, scope: 'ExecutionScope') -> 'Variable':
+    def store(self, scope: 'ExecutionScope', value: Any) -> None:
         self.evaluate(scope)
         r: IdentifierExpression = cast(IdentifierExpression, self.right)
         
-        # return variable
-        return r.left_value_evaluate(scope)
+        r.store(scope, value)
         
 
 # *********************************************** Util ***********************************************
+_VISIT = -1
+_BRANCH = -2
+
+
+def _evaluate_on_stack(root: Expression, scope: 'ExecutionScope') -> Any:
+    # the same operations as `_evaluate`, with pending work and operand values on explicit stacks
+    values: list[Any] = []
+    work: list[tuple[Expression, int]] = [(root, _VISIT)]
+    while work:
+        node, count = work.pop()
+        if count == _VISIT:
+            if node._leaf:
+                values.append(node._evaluate(scope))
+            elif node._proceed_on is not None:
+                binary = cast(BinaryExpression, node)
+                work.append((binary, _BRANCH))
+                work.append((binary.left, _VISIT))
+            else:
+                operands = node.operands()
+                work.append((node, len(operands)))
+                work.extend((operand, _VISIT) for operand in reversed(operands))
+        elif count == _BRANCH:
+            if bool(values[-1]) == node._proceed_on:
+                values.pop()
+                work.append((cast(BinaryExpression, node).right, _VISIT))
+        elif count:
+            operand_values = values[-count:]
+            del values[-count:]
+            values.append(node.operate(scope, *operand_values))
+        else:
+            values.append(node.operate(scope))
+
+    return values.pop()
+
+
 def _is_number(obj: Any):
     return obj.__class__ == int or obj.__class__ == float
 
 def _is_string(obj: Any):
-    return obj.__class__ == str
+    return obj.__class__ == str or obj.__class__ == Rope
 
 
 
+# `-` negates at the start of an operand and subtracts after one
 class MinusNegativeExpressionRouter(Expression, ABC):
-    @staticmethod
-    def from_token(
-        token: 'Token', 
-        prev_expr: Optional['Expression'], 
-        iter: Iterator['Token']
-    ) -> 'Expression':
-        if prev_expr is None:
-            return NegativeExpression.from_token(token, None, iter)
-        else:
-            return MinusExpression.from_token(token, prev_expr, iter)
\ No newline at end of file
+    prefix: Type[UnaryExpression] = NegativeExpression
+    infix: Type[BinaryExpression] = MinusExpression
@@ -0,0 +1,63 @@
+from typing import Any, Union
+
+
+# strings shorter than this are concatenated by copying, which is cheaper than a node
+ROPE_THRESHOLD = 4096
+
+
+# A Lox string made by `+`, kept as its two halves so that concatenation takes constant
+# time however long the operands are. It is joined into one Python string only when it is
+# looked at, by `str()`, formatting or comparison, and the result replaces the halves, so
+# a rope is joined at most once. Everything a program can observe is the same as for the
+# joined string: its truth value, its equality with other strings and how it is printed.
+# Only strings of at least ROPE_THRESHOLD characters are ropes.
+class Rope:
+    __slots__ = ["left", "right", "length", "flat"]
+    left: Union[str, 'Rope']
+    right: Union[str, 'Rope']
+
+    def __init__(self, left: Union[str, 'Rope'], right: Union[str, 'Rope']) -> None:
+        self.left = left
+        self.right = right
+        self.length = len(left) + len(right)
+        self.flat: Union[str, None] = None
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __str__(self) -> str:
+        flat = self.flat
+        if flat is None:
+            # left-deep ropes are as deep as the number of `+`, so they are walked in a loop
+            pieces: list[str] = []
+            pending: list[Union[str, Rope]] = [self]
+            while pending:
+                node = pending.pop()
+                if node.__class__ is str:
+                    pieces.append(node)  # type: ignore[arg-type]
+                elif node.flat is not None:  # type: ignore[union-attr]
+                    pieces.append(node.flat)  # type: ignore[union-attr]
+                else:
+                    pending.append(node.right)  # type: ignore[union-attr]
+                    pending.append(node.left)  # type: ignore[union-attr]
+            flat = self.flat = "".join(pieces)
+            self.left = self.right = ""
+        return flat
+
+    def __format__(self, format_spec: str) -> str:
+        return format(str(self), format_spec)
+
+    def __repr__(self) -> str:
+        return repr(str(self))
+
+    def __eq__(self, other: object) -> bool:
+        if other.__class__ is Rope or other.__class__ is str:
+            return str(self) == str(other)
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+
+def flatten(value: Any) -> Any:
+    return str(value) if value.__class__ is Rope else value
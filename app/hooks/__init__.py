@@ -0,0 +1,6 @@
+from .hooks import Hooks, hooks
+
+__all__ = [
+    Hooks.__name__,
+    "hooks",
+]
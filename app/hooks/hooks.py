@@ -0,0 +1,139 @@
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional
+
+if TYPE_CHECKING:
+    from ..engines.engine import Program
+
+
+EVENTS = (
+    "on_token",
+    "on_statement_parsed",
+    "on_statement_start",
+    "on_statement_end",
+    "on_variable_define",
+    "on_variable_assign",
+    "on_runtime_error",
+)
+
+# events that need the program run statement by statement on the tree walker
+EXECUTION_EVENTS = ("on_statement_start", "on_statement_end", "on_variable_define", "on_variable_assign")
+
+
+# Callbacks for what the interpreter does, for tracing and metrics without changing it.
+# A handler is registered under the event it is named after:
+#
+#     @hooks.register
+#     def on_token(token): ...
+#
+# Handlers are called with the token; the scope and expression of a statement that was
+# parsed, is about to run or has run; the name and value of a variable that was declared
+# or assigned; and the RuntimeError a program stopped with. `install` swaps in
+# instrumented versions of the scanners, the parser and variable storage, only for the
+# events that have handlers, so without any the interpreter runs the code it always does.
+# With statement or variable handlers, `run` skips the optimization passes that drop
+# statements, so every statement of the source is seen.
+class Hooks:
+    def __init__(self) -> None:
+        self.handlers: dict[str, list[Callable[..., Any]]] = {event: [] for event in EVENTS}
+        self._installed: list[tuple[type, str, Optional[Any]]] = []
+
+    def register(self, handler: Callable[..., Any]) -> Callable[..., Any]:
+        return self.add(handler.__name__, handler)
+
+    def add(self, event: str, handler: Callable[..., Any]) -> Callable[..., Any]:
+        if event not in self.handlers:
+            raise ValueError(f"unknown hook event {event!r}, expected one of {', '.join(EVENTS)}")
+        self.handlers[event].append(handler)
+        return handler
+
+    def clear(self) -> None:
+        self.uninstall()
+        for handlers in self.handlers.values():
+            handlers.clear()
+
+    @property
+    def enabled(self) -> bool:
+        return any(self.handlers.values())
+
+    # whether a run has to go through `execute` for every handler to be called
+    @property
+    def executes(self) -> bool:
+        return any(self.handlers[event] for event in EXECUTION_EVENTS)
+
+    def emit(self, event: str, *args: Any) -> None:
+        for handler in self.handlers[event]:
+            handler(*args)
+
+    def install(self) -> None:
+        if self._installed:
+            return
+        if self.handlers["on_token"]:
+            from ..tokens import Scanner, ParallelScanner
+            for scanner_cls in (Scanner, ParallelScanner):
+                self.__replace(scanner_cls, "__iter__", self.__tokens(scanner_cls.__iter__))
+        if self.handlers["on_statement_parsed"]:
+            from ..parse import Parser
+            self.__replace(Parser, "__iter__", self.__statements(Parser.__iter__))
+        if self.handlers["on_variable_define"]:
+            from ..expressions import IdentifierExpression
+            self.__replace(IdentifierExpression, "declare", self.__variables(IdentifierExpression.declare, "on_variable_define"))
+        if self.handlers["on_variable_assign"]:
+            from ..expressions import IdentifierExpression
+            self.__replace(IdentifierExpression, "store", self.__variables(IdentifierExpression.store, "on_variable_assign"))
+
+    def uninstall(self) -> None:
+        for cls, name, original in reversed(self._installed):
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+        self._installed.clear()
+
+    # the statement loop of the tree walker with the statement handlers around every statement
+    def execute(self, program: 'Program') -> None:
+        started = self.handlers["on_statement_start"]
+        ended = self.handlers["on_statement_end"]
+        for scope, expression in program:
+            for handler in started:
+                handler(scope, expression)
+            expression.evaluate(scope)
+            for handler in ended:
+                handler(scope, expression)
+
+    def __replace(self, cls: type, name: str, replacement: Any) -> None:
+        self._installed.append((cls, name, cls.__dict__.get(name)))
+        setattr(cls, name, replacement)
+
+    def __tokens(self, original: Any) -> Any:
+        handlers = self.handlers["on_token"]
+
+        def __iter__(scanner: Any) -> Iterator[Any]:
+            for token in original(scanner):
+                for handler in handlers:
+                    handler(token)
+                yield token
+
+        return __iter__
+
+    def __statements(self, original: Any) -> Any:
+        handlers = self.handlers["on_statement_parsed"]
+
+        def __iter__(parser: Any) -> Iterator[Any]:
+            for scope, expression in original(parser):
+                for handler in handlers:
+                    handler(scope, expression)
+                yield scope, expression
+
+        return __iter__
+
+    def __variables(self, original: Any, event: str) -> Any:
+        handlers = self.handlers[event]
+
+        def store(identifier: Any, scope: Any, value: Any) -> None:
+            original(identifier, scope, value)
+            for handler in handlers:
+                handler(identifier.name.lexeme, value)
+
+        return store
+
+
+hooks = Hooks()
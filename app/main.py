@@ -1,17 +1,59 @@
 from argparse import ArgumentParser, Namespace
+import os
 import sys
+import time
+from typing import TYPE_CHECKING, Callable, Optional
 
-from .tokens import Tokenizer
-from .parse import Parser
-from .execution import ExecutionScope
+# only what every command needs is imported here; the rest is imported by the commands
+# that use it, so `tokenize` never loads the parser and `parse` never loads the engines
+from .tokens import Scanner, ParallelScanner, Source, open_source, DEFAULT_CHUNK_SIZE
+from .output import token_writer, BufferedOutputSink
+from .dispatch_table import ENGINE_NAMES
 from .utils import RuntimeError
+from .hooks import hooks
+
+if TYPE_CHECKING:
+    from .parse import IncrementalParser
 
 def main():
     args = parse_args()
-    args.entry(args)
+    run_command(args)
     # print(args)
 
-def parse_args() -> Namespace:
+# the hooks a command asks for are in place while it runs, and only then
+def run_command(ns: Namespace) -> None:
+    install_hooks(ns)
+    try:
+        ns.entry(ns)
+    finally:
+        hooks.clear()
+
+# the instrumented code paths are chosen here, once: without handlers nothing changes
+def install_hooks(ns: Namespace) -> None:
+    if getattr(ns, "hooks", None):
+        from importlib import import_module, reload
+        for module in ns.hooks:
+            # a module imported by an earlier command of a server worker registers its
+            # handlers again
+            if module in sys.modules:
+                reload(sys.modules[module])
+            else:
+                import_module(module)
+    if hooks.enabled:
+        hooks.install()
+
+def parse_args(argv: Optional[list[str]] = None, arg_parser: Optional[ArgumentParser] = None) -> Namespace:
+    argv = sys.argv[1:] if argv is None else argv
+    # `serve` without a socket listens where app.client connects by default
+    if argv[:1] == ["serve"]:
+        serve_parser = ArgumentParser(add_help=False)
+        config_serve_parser(serve_parser)
+        if not serve_parser.parse_known_args(argv[1:])[1]:
+            from .client import default_socket
+            argv = argv + [default_socket()]
+    return (arg_parser or build_arg_parser()).parse_args(argv)
+
+def build_arg_parser() -> ArgumentParser:
     arg_parser = ArgumentParser()
     sub_parser = arg_parser.add_subparsers()
     
@@ -20,88 +62,395 @@ def parse_args() -> Namespace:
     config_parse_parser(sub_parser.add_parser("parse"))
     config_evaluate_parser(sub_parser.add_parser("evaluate"))
     config_execute_parser(sub_parser.add_parser("run"))
+    config_watch_parser(sub_parser.add_parser("watch"))
+    config_serve_parser(sub_parser.add_parser("serve", help="serve requests from app.client on the socket at `file`, where app.client connects by default"))
     
     
-    return arg_parser.parse_args()
+    return arg_parser
+
 
 
 
+def config_source_arguments(arg_parser: ArgumentParser) -> None:
+    arg_parser.add_argument("--mmap", action="store_true", help="memory-map the input file instead of reading it")
+    arg_parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="characters read per chunk")
+    arg_parser.add_argument("--jobs", type=int, default=1, help="tokenize in this many processes")
+    arg_parser.add_argument("--hooks", action="append", metavar="MODULE", help="import MODULE, which registers handlers on app.hooks.hooks")
 
 def config_parse_parser(arg_parser: ArgumentParser) -> None:
+    config_source_arguments(arg_parser)
     arg_parser.set_defaults(entry=print_parse_result)
     
 def config_evaluate_parser(arg_parser: ArgumentParser) -> None:
+    config_source_arguments(arg_parser)
     arg_parser.set_defaults(entry=print_evalute_result)
     
 def config_tokenize_parser(arg_parser: ArgumentParser) -> None:
+    config_source_arguments(arg_parser)
+    arg_parser.add_argument("--format", choices=["text", "jsonl", "binary"], default="text")
     arg_parser.set_defaults(entry=print_tokens)
 
 def config_execute_parser(arg_parser: ArgumentParser) -> None:
+    config_source_arguments(arg_parser)
+    arg_parser.add_argument("-O", dest="optimize", type=int, choices=[0, 1], default=1, help="optimization level")
+    arg_parser.add_argument("--pass-timings", action="store_true", help="report the time every optimization pass takes")
+    arg_parser.add_argument("--engine", choices=ENGINE_NAMES, default="tree", help="how the program is executed")
+    arg_parser.add_argument("--cache", action="store_true", help="reuse the program stored by an earlier run of the same source")
+    arg_parser.add_argument("--cache-dir", help="where cached programs are kept; __loxcache__ next to the script by default")
+    arg_parser.add_argument("--stream", action="store_true", help="check the syntax, then parse and execute one statement at a time in bounded memory")
+    arg_parser.add_argument("--profile", action="store_true", help="report calls and time per phase, expression class and line on stderr")
+    arg_parser.add_argument("--profile-json", metavar="PATH", help="write the profile as JSON to PATH")
+    arg_parser.add_argument("--batch", nargs="*", metavar="PATH", help="run these scripts and every .lox script below these directories, and `file`, in --jobs processes; `file` is always the last argument, so --jobs goes before the paths: `run --jobs N --batch PATH... DIR` or `run --batch --jobs N DIR`")
     arg_parser.set_defaults(entry=execute_file)
+
+def config_watch_parser(arg_parser: ArgumentParser) -> None:
+    arg_parser.add_argument("--command", choices=list(WATCH_COMMANDS), default="run", help="what to do on every change")
+    arg_parser.add_argument("--interval", type=float, default=0.2, help="seconds between checks for changes")
+    arg_parser.add_argument("-O", dest="optimize", type=int, choices=[0, 1], default=1, help="optimization level")
+    arg_parser.add_argument("--engine", choices=ENGINE_NAMES, default="tree", help="how the program is executed")
+    arg_parser.set_defaults(entry=watch_file)
+
+def config_serve_parser(arg_parser: ArgumentParser) -> None:
+    arg_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="pre-forked worker processes")
+    arg_parser.set_defaults(entry=serve)
+
+
+def open_input(ns: Namespace) -> Source:
+    return open_source(ns.file, ns.chunk_size, ns.mmap)
     
     
 def print_parse_result(ns: Namespace) -> None:
-    with open(ns.file) as fd:
-        file_contents = fd.read()
-    
-    parser = Parser(file_contents)
-    for scope, expression in parser:
-        print(expression)
+    from .parse import Parser
+    with open_input(ns) as source:
+        parser = Parser(source, ns.jobs)
+        for scope, expression in parser:
+            print(expression)
     
     if parser.error:
         exit(65)
 
 
 def print_evalute_result(ns: Namespace) -> None:
-    with open(ns.file) as fd:
-        file_contents = fd.read()
-    
-    parser = Parser(file_contents)
-    try:
-        for scope, expression in parser:
-            value = expression.evaluate(scope)
-            if isinstance(value, bool):
-                print(str(value).lower())
-            elif value is None:
-                print("nil")
-            else:
-                print(value)
-    except RuntimeError as e:
-        print(e, file=sys.stderr)
-        exit(70)
+    from .parse import Parser
+    output = BufferedOutputSink()
+    with open_input(ns) as source:
+        parser = Parser(source, ns.jobs, output)
+        parser.before_report = output.flush
+        try:
+            for scope, expression in parser:
+                output.write_value(expression.evaluate(scope))
+        except RuntimeError as e:
+            output.flush()
+            print(e, file=sys.stderr)
+            exit(70)
+        finally:
+            output.flush()
     
     if parser.error:
         exit(65)
 
 
 def print_tokens(ns: Namespace) -> None:
-    with open(ns.file) as fd:
-        file_contents = fd.read()
-    
-    tokenized = Tokenizer(file_contents)
-    for token in tokenized:
-        print(token)
+    with open_input(ns) as source:
+        tokenized = ParallelScanner(source, ns.jobs) if ns.jobs > 1 else Scanner(source)
+        writer = token_writer(ns.format)
+        tokenized.before_report = writer.flush
+        for token in tokenized:
+            writer.write(token, tokenized.token_start, tokenized.offset)
+        writer.close()
     
     if tokenized.error:
         exit(65)
     
     
 def execute_file(ns: Namespace) -> None:
-    with open(ns.file) as fd:
-        file_contents = fd.read()
+    if ns.batch is not None:
+        run_batch(ns)
+        return
+    if ns.stream:
+        stream_file(ns)
+        return
+    if ns.profile or ns.profile_json:
+        profile_file(ns)
+        return
+
+    from .parse import Parser
+    from .optimize import Optimizer
+    from .engines import Engine
+
+    output = BufferedOutputSink()
+    engine = Engine.create(ns.engine, output)
+    if hooks.executes and ns.engine != "tree":
+        exit(f"statement and variable hooks cannot run on the {ns.engine} engine")
+    cache = None
+    # a cached program is not parsed, so parse hooks would miss it
+    if ns.cache and ns.file != "-" and not hooks.enabled:
+        from .cache import ProgramCache
+        cache = ProgramCache(ns.file, f"{ns.engine}-O{ns.optimize}", ns.cache_dir)
+    compiled = cache.load(engine) if cache else None
+
+    if compiled is None:
+        with open_input(ns) as source:
+            parser = Parser(source, ns.jobs, output)
+            parse_results = list(parser)
+        if parser.error:
+            exit(65)
+        
+        # statement and variable hooks see every statement of the source
+        optimizer = Optimizer(ns.optimize, keep_statements=hooks.executes)
+        parse_results = optimizer.optimize(parse_results)
+        if ns.pass_timings:
+            for name, seconds in optimizer.timings:
+                print(f"{name:<20} {seconds * 1e3:10.3f} ms", file=sys.stderr)
+
+        compiled = engine.compile(parse_results)
+        if cache:
+            cache.store(engine, parse_results, compiled)
     
-    parser = Parser(file_contents)
-    parse_results = list(parser)
+    try:
+        if hooks.executes:
+            hooks.execute(compiled)
+        else:
+            engine.execute(compiled)
+    except RuntimeError as e:
+        output.flush()
+        hooks.emit("on_runtime_error", e)
+        print(e, file=sys.stderr)
+        exit(70)
+    finally:
+        output.flush()
+
+
+def profile_file(ns: Namespace) -> None:
+    from .parse import Parser
+    from .optimize import Optimizer
+    from .profiler import Profiler
+
+    # only the tree walker evaluates the expressions themselves; the cache is not used so
+    # that every phase is measured
+    if ns.engine != "tree":
+        exit(f"run --profile cannot execute on the {ns.engine} engine")
+    # handlers would be timed as part of the statements they run around
+    if hooks.executes:
+        exit("statement and variable hooks cannot run with --profile")
+
+    output = BufferedOutputSink()
+    profiler = Profiler()
+    profiler.install()
+    try:
+        with open_input(ns) as source:
+            parser = Parser(source, ns.jobs, output)
+            program, lines = profiler.parse(parser)
+        if parser.error:
+            exit(65)
+
+        program = profiler.optimize(Optimizer(ns.optimize), program)
+        try:
+            profiler.execute(program, lines)
+        except RuntimeError as e:
+            output.flush()
+            hooks.emit("on_runtime_error", e)
+            print(e, file=sys.stderr)
+            exit(70)
+        finally:
+            output.flush()
+    finally:
+        profiler.uninstall()
+        sys.stdout.flush()
+        if ns.profile:
+            profiler.report(sys.stderr)
+        if ns.profile_json:
+            profiler.write_json(ns.profile_json)
+
+
+def stream_file(ns: Namespace) -> None:
+    from .parse import Parser
+    from .optimize import Optimizer
+    from .engines import Engine
+
+    output = BufferedOutputSink()
+    engine = Engine.create(ns.engine, output)
+    if not engine.streams:
+        exit(f"run --stream cannot execute on the {ns.engine} engine")
+    if hooks.executes and ns.engine != "tree":
+        exit(f"statement and variable hooks cannot run on the {ns.engine} engine")
+
+    # the input is read twice and stdin only once, so it is copied to a file first
+    if ns.file == "-":
+        import shutil
+        import tempfile
+        with tempfile.NamedTemporaryFile("w", suffix=".lox", delete=False) as spool:
+            shutil.copyfileobj(sys.stdin, spool)
+        try:
+            stream_file(Namespace(**{**vars(ns), "file": spool.name}))
+        finally:
+            os.unlink(spool.name)
+        return
+
+    # a syntax error anywhere wins over a runtime error, so the whole file is checked
+    # before anything runs; statements are dropped as soon as they are parsed, and parse
+    # hooks see them on the second pass only
+    hooks.uninstall()
+    with open_input(ns) as source:
+        parser = Parser(source, ns.jobs)
+        for _ in parser:
+            pass
+    if hooks.enabled:
+        hooks.install()
     if parser.error:
         exit(65)
-    
+
+    # passes that need the whole program are skipped, which changes nothing a program
+    # can observe; each statement is optimized and executed on its own, then released
+    optimizer = Optimizer(ns.optimize, local=True)
+    execute = hooks.execute if hooks.executes else engine.execute
+    with open_input(ns) as source:
+        parser = Parser(source, ns.jobs, output)
+        try:
+            for statement in parser:
+                execute(engine.compile(optimizer.optimize([statement])))
+                del statement
+                parser.constants.clear()
+        except RuntimeError as e:
+            output.flush()
+            hooks.emit("on_runtime_error", e)
+            print(e, file=sys.stderr)
+            exit(70)
+        finally:
+            output.flush()
+
+    if ns.pass_timings:
+        for name, seconds in optimizer.timings:
+            print(f"{name:<20} {seconds * 1e3:10.3f} ms", file=sys.stderr)
+
+
+# processes forked from this one share whatever it imported, so everything a command may
+# need is loaded before forking
+def preload_commands() -> None:
+    from . import parse, optimize, engines, cache  # noqa: F401
+
+
+def run_batch(ns: Namespace) -> None:
+    from .batch import BatchRunner, find_scripts
+    preload_commands()
+
+    scripts = find_scripts(ns.batch + [ns.file])
+    # --jobs spreads the scripts; each one is tokenized in its worker
+    options = Namespace(**vars(ns))
+    options.batch = None
+    options.jobs = 1
+
+    results = []
+    for result in BatchRunner(execute_file, options, ns.jobs).run(scripts):
+        for text, stream in ((result.stdout, sys.stdout), (result.stderr, sys.stderr)):
+            if text:
+                sys.stdout.flush()
+                stream.write(f"==> {result.path} <==\n{text}")
+                if not text.endswith("\n"):
+                    stream.write("\n")
+        results.append(result)
+
+    sys.stderr.flush()
+    print(f"{'status':>6} {'ms':>10}  script")
+    for result in results:
+        print(f"{result.status:>6} {result.seconds * 1e3:>10.1f}  {result.path}")
+    statuses: dict[int, int] = {}
+    for result in results:
+        statuses[result.status] = statuses.get(result.status, 0) + 1
+    counts = ", ".join(f"{count} exited {status}" for status, count in sorted(statuses.items()))
+    print(f"{len(results)} scripts: {counts}")
+
+    if any(result.status for result in results):
+        exit(1)
+
+
+def watch_file(ns: Namespace) -> None:
+    from .parse import IncrementalParser
+    parser = IncrementalParser()
+    seen = None
     try:
-        for scope, expression in parse_results:
-            expression.evaluate(scope)
+        while True:
+            try:
+                stat = os.stat(ns.file)
+                current = (stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                current = None
+            if current is not None and current != seen:
+                seen = current
+                with open_source(ns.file) as source:
+                    text = source.read()
+                start = time.perf_counter()
+                parser.update(text)
+                status = WATCH_COMMANDS[ns.command](ns, parser)
+                sys.stdout.flush()
+                print(f"[watch] {ns.command} exited {status} in {(time.perf_counter() - start) * 1e3:.1f} ms", file=sys.stderr)
+            time.sleep(ns.interval)
+    except KeyboardInterrupt:
+        pass
+
+
+def watch_tokens(ns: Namespace, parser: 'IncrementalParser') -> int:
+    scanner = parser.scanner
+    writer = token_writer("text")
+    pending = 0
+    for token, start, end in scanner.spans():
+        while pending < len(scanner.errors) and scanner.errors[pending][0] < start:
+            writer.flush()
+            print(scanner.errors[pending][1], file=sys.stderr)
+            pending += 1
+        writer.write(token, start, end)
+    writer.close()
+    return 65 if scanner.error else 0
+
+
+def watch_parse(ns: Namespace, parser: 'IncrementalParser') -> int:
+    for scope, expression in parser.program:
+        print(expression)
+    sys.stdout.flush()
+    for e in parser.errors():
+        print(e, file=sys.stderr)
+    return 65 if parser.error else 0
+
+
+def watch_run(ns: Namespace, parser: 'IncrementalParser') -> int:
+    from .optimize import Optimizer
+    from .engines import Engine
+    from .cache import ProgramCodec
+
+    if parser.error:
+        for e in parser.errors():
+            print(e, file=sys.stderr)
+        return 65
+
+    # the parser keeps its statements for the next change, so every run optimizes and
+    # executes a copy of them in fresh scopes
+    output = BufferedOutputSink()
+    codec = ProgramCodec()
+    program = Optimizer(ns.optimize).optimize(codec.decode(codec.encode(parser.program), output))
+    try:
+        Engine.create(ns.engine, output).run(program)
     except RuntimeError as e:
+        output.flush()
+        sys.stdout.flush()
         print(e, file=sys.stderr)
-        exit(70)
+        return 70
+    finally:
+        output.flush()
+    return 0
+
+
+def serve(ns: Namespace) -> None:
+    from .server import LoxServer
+    preload_commands()
+    from functools import partial
+    LoxServer(ns.file, ns.workers, partial(parse_args, arg_parser=build_arg_parser()), run_command).serve_forever()
+
 
+WATCH_COMMANDS: dict[str, Callable[[Namespace, 'IncrementalParser'], int]] = {
+    "tokenize": watch_tokens,
+    "parse": watch_parse,
+    "run": watch_run,
+}
 
 
 if __name__ == "__main__":
@@ -0,0 +1,12 @@
+from .optimizer import Optimizer, OptimizationPass
+from .passes import ConstantFolding, DoubleNegationRemoval, DeadStoreElimination
+from .resolver import VariableResolution
+
+__all__ = [
+    Optimizer.__name__,
+    OptimizationPass.__name__,
+    ConstantFolding.__name__,
+    DoubleNegationRemoval.__name__,
+    DeadStoreElimination.__name__,
+    VariableResolution.__name__,
+]
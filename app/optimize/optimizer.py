@@ -0,0 +1,54 @@
+import time
+from abc import ABC, abstractmethod
+from typing import Type
+
+from ..execution import ExecutionScope
+from ..expressions import Expression
+
+
+Program = list[tuple[ExecutionScope, Expression]]
+
+
+class OptimizationPass(ABC):
+    name: str
+    # the lowest `-O` level the pass runs at
+    level: int = 1
+    # rewrites every statement on its own, so it can also run on one statement at a time
+    local: bool = False
+    # removes statements rather than only rewriting them
+    drops_statements: bool = False
+
+    @abstractmethod
+    def run(self, program: Program) -> Program:
+        ...
+
+
+class Optimizer:
+    _passes: list[Type[OptimizationPass]] = []
+
+    def __init__(self, level: int, local: bool = False, keep_statements: bool = False) -> None:
+        self.passes = [
+            pass_cls() for pass_cls in Optimizer._passes
+            if pass_cls.level <= level and (pass_cls.local or not local)
+            and not (pass_cls.drops_statements and keep_statements)
+        ]
+        # (pass name, seconds) summed over every `optimize` call
+        self.timings: list[tuple[str, float]] = []
+
+    @classmethod
+    def register(cls, pass_cls: Type[OptimizationPass]) -> Type[OptimizationPass]:
+        # passes run in registration order
+        cls._passes.append(pass_cls)
+        return pass_cls
+
+    def optimize(self, program: Program) -> Program:
+        for index, optimization in enumerate(self.passes):
+            start = time.perf_counter()
+            program = optimization.run(program)
+            seconds = time.perf_counter() - start
+            if index < len(self.timings):
+                seconds += self.timings[index][1]
+                self.timings[index] = (optimization.name, seconds)
+            else:
+                self.timings.append((optimization.name, seconds))
+        return program
@@ -0,0 +1,215 @@
+from abc import ABC, abstractmethod
+from collections import Counter
+from typing import Callable, Optional
+
+from ..utils import RuntimeError
+from ..tokens import NumberLiteral, StringLiteral, TrueReservedWord, FalseReservedWord, NilReservedWord
+from ..expressions import (
+    Expression,
+    LiteralExpression,
+    GroupExpression,
+    IdentifierExpression,
+    NumberLiteralExpression,
+    StringLiteralExpression,
+    BooleanLiteralExpression,
+    NilLiteralExpression,
+    NegativeExpression,
+    BangExpression,
+    MinusExpression,
+    MultiplyExpression,
+    DivideExpression,
+    EqualEqualExpression,
+    BangEqualExpression,
+    LessExpression,
+    LessEqualExpression,
+    GreaterExpression,
+    GreaterEqualExpression,
+    AssignExpression,
+    VarExpression,
+    flatten,
+)
+from .optimizer import Program, OptimizationPass, Optimizer
+
+
+_CHILDREN = ("left", "right", "expr")
+
+
+def rewrite(root: Expression, rule: Callable[[Expression], Expression]) -> Expression:
+    # bottom-up: every node is replaced by `rule(node)` after its children were
+    stack: list[tuple[Expression, bool]] = [(root, False)]
+    while stack:
+        node, visited = stack.pop()
+        if visited:
+            for attr in _CHILDREN:
+                child = getattr(node, attr, None)
+                if isinstance(child, Expression):
+                    setattr(node, attr, rule(child))
+            continue
+
+        stack.append((node, True))
+        for attr in _CHILDREN:
+            child = getattr(node, attr, None)
+            if isinstance(child, Expression):
+                stack.append((child, False))
+    return rule(root)
+
+
+def walk(root: Expression) -> list[Expression]:
+    nodes = []
+    pending = [root]
+    while pending:
+        node = pending.pop()
+        nodes.append(node)
+        for attr in _CHILDREN:
+            child = getattr(node, attr, None)
+            if isinstance(child, Expression):
+                pending.append(child)
+    return nodes
+
+
+def unwrap(expression: Expression) -> Expression:
+    # a group evaluates to exactly its inner expression
+    while isinstance(expression, GroupExpression) and expression.expr is not None:
+        expression = expression.expr
+    return expression
+
+
+def literal_for(value: object) -> Optional[LiteralExpression]:
+    # literals hold plain strings, so a folded concatenation is joined here
+    value = flatten(value)
+    if value is None:
+        return NilLiteralExpression(NilReservedWord())
+    if value.__class__ is bool:
+        return BooleanLiteralExpression(TrueReservedWord() if value else FalseReservedWord())
+    if value.__class__ is str:
+        return StringLiteralExpression(StringLiteral(value))  # type: ignore[arg-type]
+    if value.__class__ is int or value.__class__ is float:
+        return NumberLiteralExpression(NumberLiteral(repr(value), value))  # type: ignore[arg-type]
+    return None
+
+
+class ExpressionPass(OptimizationPass, ABC):
+    local = True
+
+    def run(self, program: Program) -> Program:
+        optimized = []
+        for scope, expression in program:
+            result = rewrite(expression, self.rewrite)
+            if expression._deep:
+                result._deep = True
+            optimized.append((scope, result))
+        return optimized
+
+    @abstractmethod
+    def rewrite(self, node: Expression) -> Expression:
+        ...
+
+
+# Evaluates side-effect free operators whose operands are all literals ahead of time and
+# replaces them with the resulting literal. An operation that fails is left in place so
+# the error is still raised when, and only if, the program gets to it.
+@Optimizer.register
+class ConstantFolding(ExpressionPass):
+    name = "constant-folding"
+
+    def rewrite(self, node: Expression) -> Expression:
+        if node._proceed_on is not None:
+            left = unwrap(node.left)  # type: ignore[attr-defined]
+            if not isinstance(left, LiteralExpression):
+                return node
+            if bool(left.constant) == node._proceed_on:
+                return node.right  # type: ignore[attr-defined]
+            return left
+
+        if not node._pure:
+            return node
+        operands = node.operands()
+        if not all(isinstance(operand, LiteralExpression) for operand in operands):
+            return node
+        try:
+            value = node.operate(None, *(operand.constant for operand in operands))  # type: ignore[arg-type, attr-defined]
+        except (Exception, RuntimeError):
+            return node
+        return literal_for(value) or node
+
+
+_BOOLEAN_RESULTS = (
+    BangExpression,
+    BooleanLiteralExpression,
+    EqualEqualExpression,
+    BangEqualExpression,
+    LessExpression,
+    LessEqualExpression,
+    GreaterExpression,
+    GreaterEqualExpression,
+)
+_NUMBER_RESULTS = (NegativeExpression, MinusExpression, MultiplyExpression, DivideExpression, NumberLiteralExpression)
+
+
+# `!!!x` is `!x` and `---x` is `-x` whatever `x` is. Two negations cancel only when the
+# operand already has the type the pair would convert it to (or fail on), so `!!(a < b)`
+# becomes `a < b` but `!!a` and `--a` stay.
+@Optimizer.register
+class DoubleNegationRemoval(ExpressionPass):
+    name = "double-negation"
+
+    def rewrite(self, node: Expression) -> Expression:
+        if node.__class__ is BangExpression:
+            results: tuple = _BOOLEAN_RESULTS
+        elif node.__class__ is NegativeExpression:
+            results = _NUMBER_RESULTS
+        else:
+            return node
+
+        inner = unwrap(node.right)  # type: ignore[attr-defined]
+        if inner.__class__ is not node.__class__:
+            return node
+        operand = unwrap(inner.right)  # type: ignore[attr-defined]
+        if operand.__class__ is node.__class__:
+            return operand
+        if isinstance(operand, results):
+            return inner.right  # type: ignore[attr-defined]
+        return node
+
+
+# Drops top-level `var` statements whose name is never mentioned anywhere else in the
+# program and whose initializer, if any, is a literal. Any other mention, an assignment
+# included, keeps every declaration of that name.
+@Optimizer.register
+class DeadStoreElimination(OptimizationPass):
+    name = "dead-store"
+    drops_statements = True
+
+    def run(self, program: Program) -> Program:
+        mentions: Counter[str] = Counter()
+        declarations: Counter[str] = Counter()
+        for _, expression in program:
+            declared = self.__declared(expression)
+            if declared is not None:
+                declarations[declared] += 1
+            for node in walk(expression):
+                if isinstance(node, IdentifierExpression):
+                    mentions[node.name.lexeme] += 1
+
+        return [
+            (scope, expression) for scope, expression in program
+            if not self.__dead(expression, mentions, declarations)
+        ]
+
+    @staticmethod
+    def __declared(expression: Expression) -> Optional[str]:
+        if expression.__class__ is not VarExpression:
+            return None
+        target = expression.right  # type: ignore[attr-defined]
+        if target.__class__ is AssignExpression:
+            if not isinstance(unwrap(target.right), LiteralExpression):
+                return None
+            target = target.left
+        if target.__class__ is not IdentifierExpression:
+            return None
+        return target.name.lexeme
+
+    @classmethod
+    def __dead(cls, expression: Expression, mentions: Counter[str], declarations: Counter[str]) -> bool:
+        declared = cls.__declared(expression)
+        return declared is not None and mentions[declared] == declarations[declared]
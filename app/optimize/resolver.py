@@ -0,0 +1,100 @@
+from typing import Optional
+
+from ..execution import ExecutionScope
+from ..expressions import Expression, IdentifierExpression, AssignExpression, VarExpression
+from .optimizer import Program, OptimizationPass, Optimizer
+
+
+_CHILDREN = ("expr", "right", "left")
+
+
+# Binds every identifier to the scope depth and slot it refers to when it is evaluated.
+# Statements run once each, in order, against the scope they were parsed in, so replaying
+# the evaluation order over the program finds exactly the declarations a lookup would.
+# The only code that may not run is the right side of `and` / `or`: names declared there
+# stay dynamic everywhere, as do names with no declaration in sight, which then fail by
+# name at run time just as before.
+@Optimizer.register
+class VariableResolution(OptimizationPass):
+    name = "resolve-variables"
+
+    def run(self, program: Program) -> Program:
+        self.dynamic = self.__conditionally_declared(program)
+        self.slots: dict[ExecutionScope, dict[str, int]] = {}
+        for scope, expression in program:
+            self.__resolve(expression, scope)
+        return program
+
+    def __resolve(self, expression: Expression, scope: ExecutionScope) -> None:
+        # (declares, node) in evaluation order
+        pending: list[tuple[bool, Expression]] = [(False, expression)]
+        while pending:
+            declares, node = pending.pop()
+            if declares:
+                self.__declare(node, scope)  # type: ignore[arg-type]
+            elif node.__class__ is IdentifierExpression:
+                self.__bind(node, scope)  # type: ignore[arg-type]
+            elif node.__class__ is VarExpression:
+                target = node.right  # type: ignore[attr-defined]
+                if target.__class__ is IdentifierExpression:
+                    pending.append((True, target))
+                elif target.__class__ is AssignExpression and target.left.__class__ is IdentifierExpression:
+                    pending.append((True, target.left))
+                    pending.append((False, target.right))
+            elif node.__class__ is AssignExpression:
+                # the value is evaluated before the target
+                pending.append((False, node.left))  # type: ignore[attr-defined]
+                pending.append((False, node.right))  # type: ignore[attr-defined]
+            else:
+                for attr in _CHILDREN:
+                    child = getattr(node, attr, None)
+                    if isinstance(child, Expression):
+                        pending.append((False, child))
+
+    def __declare(self, identifier: IdentifierExpression, scope: ExecutionScope) -> None:
+        name = identifier.name.lexeme
+        if name in self.dynamic:
+            return
+        slots = self.slots.setdefault(scope, {})
+        slot = slots.get(name)
+        if slot is None:
+            slot = slots[name] = len(scope.values)
+            scope.values.append(None)
+        identifier.depth = 0
+        identifier.slot = slot
+
+    def __bind(self, identifier: IdentifierExpression, scope: ExecutionScope) -> None:
+        name = identifier.name.lexeme
+        if name in self.dynamic:
+            return
+        depth = 0
+        current: Optional[ExecutionScope] = scope
+        while current is not None:
+            slot = self.slots.get(current, {}).get(name)
+            if slot is not None:
+                identifier.depth = depth
+                identifier.slot = slot
+                return
+            current = current.parent
+            depth += 1
+
+    @staticmethod
+    def __conditionally_declared(program: Program) -> set[str]:
+        names = set()
+        for _, expression in program:
+            # (node, whether it only runs when an `and` / `or` lets it)
+            pending = [(expression, False)]
+            while pending:
+                node, conditional = pending.pop()
+                if conditional and node.__class__ is VarExpression:
+                    target = node.right  # type: ignore[attr-defined]
+                    if target.__class__ is AssignExpression:
+                        target = target.left
+                    if target.__class__ is IdentifierExpression:
+                        names.add(target.name.lexeme)
+
+                for attr in _CHILDREN:
+                    child = getattr(node, attr, None)
+                    if isinstance(child, Expression):
+                        pending.append((child, conditional or (attr == "right" and node._proceed_on is not None)))
+        return names
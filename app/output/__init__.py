@@ -0,0 +1,15 @@
+from .token_writer import TokenWriter, TextTokenWriter, JsonlTokenWriter, BinaryTokenWriter, token_writer
+from .output_sink import OutputSink, StreamOutputSink, BufferedOutputSink, MemoryOutputSink, format_value
+
+__all__ = [
+    TokenWriter.__name__,
+    TextTokenWriter.__name__,
+    JsonlTokenWriter.__name__,
+    BinaryTokenWriter.__name__,
+    token_writer.__name__,
+    OutputSink.__name__,
+    StreamOutputSink.__name__,
+    BufferedOutputSink.__name__,
+    MemoryOutputSink.__name__,
+    format_value.__name__,
+]
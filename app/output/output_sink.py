@@ -0,0 +1,93 @@
+import sys
+from abc import ABC, abstractmethod
+from typing import Any, Optional, TextIO
+
+
+DEFAULT_THRESHOLD = 1 << 16
+
+
+def format_value(value: Any) -> str:
+    # how `print` and `evaluate` show a Lox value
+    if value.__class__ is bool:
+        return "true" if value else "false"
+    if value is None:
+        return "nil"
+    return str(value)
+
+
+# Where a program's `print` statements go. Every value is written as one line through
+# `write_value`; `write_line` skips the Lox formatting for values that need none, numbers
+# and strings.
+class OutputSink(ABC):
+    @abstractmethod
+    def write(self, text: str) -> None:
+        ...
+
+    def write_value(self, value: Any) -> None:
+        self.write(format_value(value) + "\n")
+
+    def write_line(self, value: Any) -> None:
+        self.write(f"{value}\n")
+
+    # hands everything written so far on; called before anything is printed to stderr
+    def flush(self) -> None:
+        pass
+
+
+# Writes every line as soon as it is printed, to `stream` or, without one, to whatever
+# sys.stdout is at the time: exactly what the builtin print() does.
+class StreamOutputSink(OutputSink):
+    def __init__(self, stream: Optional[TextIO] = None) -> None:
+        self.stream = stream
+
+    def write(self, text: str) -> None:
+        (self.stream or sys.stdout).write(text)
+
+
+# Collects lines and writes them to `stream` in one call once `threshold` characters are
+# pending and on every `flush`. The stream itself is not flushed, so the text reaches the
+# terminal or file exactly when the same print() calls would have put it there.
+class BufferedOutputSink(OutputSink):
+    def __init__(self, stream: Optional[TextIO] = None, threshold: int = DEFAULT_THRESHOLD) -> None:
+        self.stream = stream if stream is not None else sys.stdout
+        self.threshold = threshold
+        self.pending: list[str] = []
+        self.size = 0
+
+    def write(self, text: str) -> None:
+        self.pending.append(text)
+        self.size += len(text)
+        if self.size >= self.threshold:
+            self.flush()
+
+    def write_value(self, value: Any) -> None:
+        text = format_value(value) + "\n"
+        self.pending.append(text)
+        self.size += len(text)
+        if self.size >= self.threshold:
+            self.flush()
+
+    def write_line(self, value: Any) -> None:
+        text = f"{value}\n"
+        self.pending.append(text)
+        self.size += len(text)
+        if self.size >= self.threshold:
+            self.flush()
+
+    def flush(self) -> None:
+        if self.pending:
+            self.stream.write("".join(self.pending))
+            self.pending.clear()
+            self.size = 0
+
+
+# Keeps everything printed, for embedding the interpreter and for tests.
+class MemoryOutputSink(OutputSink):
+    def __init__(self) -> None:
+        self.pending: list[str] = []
+
+    def write(self, text: str) -> None:
+        self.pending.append(text)
+
+    def getvalue(self) -> str:
+        return "".join(self.pending)
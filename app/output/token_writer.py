@@ -0,0 +1,146 @@
+import json
+import struct
+import sys
+from abc import ABC, abstractmethod
+from array import array
+from typing import BinaryIO, TextIO
+
+from ..tokens import Token, Identifier, StringLiteral, NumberLiteral, Symbol, ReservedWord
+
+
+DEFAULT_BUFFER_SIZE = 1 << 16
+
+
+class TokenWriter(ABC):
+    @abstractmethod
+    def write(self, token: Token, start: int, end: int) -> None:
+        ...
+
+    @abstractmethod
+    def flush(self) -> None:
+        ...
+
+    def close(self) -> None:
+        self.flush()
+
+
+class TextTokenWriter(TokenWriter):
+    def __init__(self, stream: TextIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        self.stream = stream
+        self.buffer_size = buffer_size
+        self._parts: list[str] = []
+        self._size = 0
+        # symbols and reserved words always print the same line
+        self._lines: dict[int, str] = {
+            cls.kind: f"{cls()}\n"
+            for cls in Token._kind2class
+            if issubclass(cls, (Symbol, ReservedWord)) and cls not in (Symbol, ReservedWord)
+        }
+        self._identifier_lines: dict[str, str] = {}
+
+    def write(self, token: Token, start: int, end: int) -> None:
+        line = self._lines.get(token.kind)
+        if line is None:
+            if token.kind == Identifier.kind:
+                line = self._identifier_lines.get(token.lexeme)
+                if line is None:
+                    line = self._identifier_lines[token.lexeme] = f"IDENTIFIER {token.lexeme} null\n"
+            else:
+                line = f"{token}\n"
+
+        self._parts.append(line)
+        self._size += len(line)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+    def flush(self) -> None:
+        if self._parts:
+            self.stream.write("".join(self._parts))
+            self._parts.clear()
+            self._size = 0
+        self.stream.flush()
+
+
+class JsonlTokenWriter(TextTokenWriter):
+    def write(self, token: Token, start: int, end: int) -> None:
+        literal: object = None
+        if token.kind == StringLiteral.kind:
+            literal = token.literal
+        elif token.kind == NumberLiteral.kind:
+            literal = float(token.literal)
+
+        line = json.dumps({
+            "type": token.token_type,
+            "lexeme": token.lexeme,
+            "literal": literal,
+            "offset": start,
+            "length": end - start,
+        }) + "\n"
+
+        self._parts.append(line)
+        self._size += len(line)
+        if self._size >= self.buffer_size:
+            self.flush()
+
+
+# Layout: b"LOXTOK", a version byte, the number of kinds (u16) and one length-prefixed
+# token type name per kind, then blocks of `count (u32), count kinds (u8), count offsets
+# (u32), count lengths (u32)`, all little endian, closed by a block with count 0.
+class BinaryTokenWriter(TokenWriter):
+    MAGIC = b"LOXTOK"
+    VERSION = 1
+
+    def __init__(self, stream: BinaryIO, buffer_size: int = DEFAULT_BUFFER_SIZE) -> None:
+        self.stream = stream
+        self.block_size = max(1, buffer_size // 9)
+        self._kinds = array("B")
+        self._starts = array("I")
+        self._lengths = array("I")
+
+        names = [cls.__dict__.get("token_type", "").encode() for cls in Token._kind2class]
+        header = [self.MAGIC, struct.pack("<BH", self.VERSION, len(names))]
+        for name in names:
+            header.append(struct.pack("<B", len(name)) + name)
+        self.stream.write(b"".join(header))
+
+    def write(self, token: Token, start: int, end: int) -> None:
+        self._kinds.append(token.kind)
+        self._starts.append(start)
+        self._lengths.append(end - start)
+        if len(self._kinds) >= self.block_size:
+            self.__write_block()
+
+    def flush(self) -> None:
+        if self._kinds:
+            self.__write_block()
+        self.stream.flush()
+
+    def close(self) -> None:
+        self.flush()
+        self.stream.write(struct.pack("<I", 0))
+        self.stream.flush()
+
+    def __write_block(self) -> None:
+        starts, lengths = self._starts, self._lengths
+        if sys.byteorder == "big":
+            starts, lengths = array("I", starts), array("I", lengths)
+            starts.byteswap()
+            lengths.byteswap()
+
+        self.stream.write(b"".join((
+            struct.pack("<I", len(self._kinds)),
+            self._kinds.tobytes(),
+            starts.tobytes(),
+            lengths.tobytes(),
+        )))
+        self._kinds = array("B")
+        self._starts = array("I")
+        self._lengths = array("I")
+
+
+def token_writer(format: str, buffer_size: int = DEFAULT_BUFFER_SIZE) -> TokenWriter:
+    if format == "jsonl":
+        return JsonlTokenWriter(sys.stdout, buffer_size)
+    if format == "binary":
+        return BinaryTokenWriter(sys.stdout.buffer, buffer_size)
+    return TextTokenWriter(sys.stdout, buffer_size)
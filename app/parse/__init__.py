@@ -1,5 +1,7 @@
 from .parser import Parser
+from .incremental_parser import IncrementalParser
 
 __all__ = [
-    Parser.__name__
+    Parser.__name__,
+    IncrementalParser.__name__,
 ]
\ No newline at end of file
@@ -0,0 +1,254 @@
+from typing import Iterator, Optional, Type, cast
+
+from ..utils import MissingExpressionError
+from ..tokens import Token
+from .. import dispatch_table, expressions
+from ..expressions import (
+    ConstantPool,
+    Expression,
+    LiteralExpression,
+    GroupExpression,
+    UnaryExpression,
+    BinaryExpression,
+    MinusNegativeExpressionRouter,
+)
+
+
+_ATOM, _PREFIX, _INFIX, _ROUTER, _GROUP, _LITERAL = range(6)
+
+# a statement with more nodes than this may be nested deeper than the Python call stack
+# allows, so it is marked to evaluate on an explicit stack
+MAX_RECURSIVE_NODES = 256
+
+
+def _dispatch() -> dict[int, Type[Expression]]:
+    # token kinds are only meaningful for the token classes the table was generated from
+    if tuple(cls.__name__ for cls in Token._kind2class) != dispatch_table.TOKEN_CLASSES:
+        raise ImportError("app/dispatch_table.py is out of date, run `python -m app.dispatch`")
+    return {kind: getattr(expressions, name) for kind, name in dispatch_table.EXPRESSION_CLASSES.items()}
+
+
+_EXPRESSIONS = _dispatch()
+_CLOSING_KIND = dispatch_table.CLOSING_KIND
+
+
+def _role(cls: Type[Expression]) -> int:
+    if issubclass(cls, MinusNegativeExpressionRouter):
+        return _ROUTER
+    if issubclass(cls, UnaryExpression):
+        return _PREFIX
+    if issubclass(cls, BinaryExpression):
+        return _INFIX
+    if issubclass(cls, GroupExpression):
+        return _GROUP
+    if issubclass(cls, LiteralExpression):
+        return _LITERAL
+    return _ATOM
+
+
+# An expression under construction together with its right spine: every unary or binary
+# node from the root down to the last operand, the only place where the next token can
+# attach. `maxima` indexes the spine nodes whose precedence is higher than every node
+# above them, so finding the topmost node that binds tighter than an incoming operator
+# looks at a handful of entries instead of walking the spine.
+class _Sequence:
+    __slots__ = ["root", "spine", "maxima", "owner", "pending", "prefixes"]
+
+    def __init__(self, owner: Optional[UnaryExpression] = None) -> None:
+        self.root: Optional[Expression] = None
+        self.spine: list[Expression] = []
+        self.maxima: list[int] = []
+        self.owner = owner
+        # set while an operand is being read: what to do with it once complete
+        self.pending: Optional[tuple[int, Type[Expression], Token]] = None
+        self.prefixes: list[tuple[Type[UnaryExpression], Token]] = []
+
+    def push(self, node: Expression) -> None:
+        if not self.maxima or node._precedence > self.spine[self.maxima[-1]]._precedence:
+            self.maxima.append(len(self.spine))
+        self.spine.append(node)
+
+    def push_chain(self, node: Optional[Expression]) -> None:
+        while hasattr(node, "right"):
+            self.push(node)  # type: ignore[arg-type]
+            node = node.right  # type: ignore[union-attr]
+
+    def pop(self) -> Expression:
+        node = self.spine.pop()
+        if self.maxima and self.maxima[-1] == len(self.spine):
+            self.maxima.pop()
+        return node
+
+    def truncate(self, index: int) -> None:
+        del self.spine[index:]
+        while self.maxima and self.maxima[-1] >= index:
+            self.maxima.pop()
+
+    def reset(self, root: Expression) -> None:
+        self.spine.clear()
+        self.maxima.clear()
+        self.root = root
+        self.push_chain(root)
+
+
+# Precedence climbing over the `@precedence` / `@right_associative` metadata and the
+# token to expression map. Every node is built once, with its operands, and a binary
+# operator only touches the part of the right spine it climbs past, so a statement is
+# parsed in time linear in its length. Groups open a new sequence on an explicit frame
+# stack instead of recursing, so nesting depth is bounded by memory only.
+class ExpressionParser:
+    def __init__(self, tokens: Iterator[Token], constants: ConstantPool) -> None:
+        self.tokens = tokens
+        self.constants = constants
+        self._frames = [_Sequence()]
+        self._nodes = 0
+        # abstract base class checks are slow, so every kind is classified once
+        self._roles: dict[int, tuple[int, Type[Expression]]] = {}
+
+    def __lookup(self, token: Token) -> tuple[int, Type[Expression]]:
+        entry = self._roles.get(token.kind)
+        if entry is None:
+            cls = _EXPRESSIONS.get(token.kind)
+            if cls is None:
+                raise MissingExpressionError(-1, token)
+            entry = self._roles[token.kind] = (_role(cls), cls)
+        return entry
+
+    def feed(self, token: Token) -> None:
+        frames = self._frames
+        self.__step(token)
+        # an unfinished operand or open group pulls the tokens it needs
+        while len(frames) > 1 or frames[0].pending is not None:
+            self.__step(next(self.tokens))
+
+        root = frames[0].root
+        if frames[0].owner is None and root is not None and root._statement:
+            # the rest of the statement builds its operand
+            assert isinstance(root, UnaryExpression)
+            sequence = frames[0] = _Sequence(root)
+            sequence.reset(root.right)
+
+    # nothing has been fed since the last `take`
+    @property
+    def empty(self) -> bool:
+        sequence = self._frames[0]
+        return len(self._frames) == 1 and sequence.root is None and sequence.owner is None and sequence.pending is None
+
+    def take(self) -> Optional[Expression]:
+        sequence = self._frames[0]
+        self._frames[0] = _Sequence()
+        expression = sequence.owner or sequence.root
+        if expression is not None and self._nodes > MAX_RECURSIVE_NODES:
+            expression._deep = True
+        self._nodes = 0
+        return expression
+
+    def __step(self, token: Token) -> None:
+        frames = self._frames
+        sequence = frames[-1]
+        if sequence.pending is not None:
+            self.__operand(sequence, token)
+            return
+        if len(frames) > 1 and token.kind == _CLOSING_KIND:
+            frames.pop()
+            self.__complete(frames[-1], GroupExpression(sequence.root))
+            return
+
+        role, cls = self.__lookup(token)
+        if role == _ROUTER and sequence.root is not None:
+            role, cls = _INFIX, cast(Type[MinusNegativeExpressionRouter], cls).infix
+
+        if role == _INFIX:
+            if sequence.root is None:
+                raise MissingExpressionError(-1, token)
+            sequence.pending = (_INFIX, cls, token)
+        elif (
+            role == _PREFIX and
+            sequence.spine and
+            isinstance(sequence.spine[-1], UnaryExpression) and
+            sequence.spine[-1].operator == token
+        ):
+            # a repeated prefix operator nests under the innermost one
+            sequence.pending = (_PREFIX, cls, token)
+        else:
+            sequence.pending = (_ATOM, cls, token)
+            self.__operand(sequence, token)
+
+    def __operand(self, sequence: _Sequence, token: Token) -> None:
+        # a single operand: literal, identifier or group behind any number of prefix operators
+        role, cls = self.__lookup(token)
+        if role == _ROUTER:
+            role, cls = _PREFIX, cast(Type[MinusNegativeExpressionRouter], cls).prefix
+        if role == _PREFIX:
+            sequence.prefixes.append((cast(Type[UnaryExpression], cls), token))
+        elif role == _INFIX:
+            raise MissingExpressionError(-1, token)
+        elif role == _GROUP:
+            self._frames.append(_Sequence())
+        elif role == _LITERAL:
+            self.__complete(sequence, cast(Type[LiteralExpression], cls)(token, self.constants))
+        else:
+            self.__complete(sequence, cls(token))  # type: ignore[call-arg]
+
+    def __complete(self, sequence: _Sequence, node: Expression) -> None:
+        self._nodes += 1 + len(sequence.prefixes)
+        for prefix, operator in reversed(sequence.prefixes):
+            node = prefix(operator, node)
+        sequence.prefixes.clear()
+        assert sequence.pending is not None
+        action, cls, token = sequence.pending
+        sequence.pending = None
+
+        if action != _ATOM:
+            self._nodes += 1
+        if action == _INFIX:
+            self.__insert_binary(sequence, cast(Type[BinaryExpression], cls), token, node)
+        elif action == _PREFIX:
+            nested = cast(Type[UnaryExpression], cls)(token, node)
+            sequence.spine[-1].right = nested  # type: ignore[attr-defined]
+            sequence.push_chain(nested)
+        else:
+            sequence.reset(node)
+
+        if sequence.owner is not None:
+            assert sequence.root is not None
+            sequence.owner.right = sequence.root
+
+    def __insert_binary(
+        self,
+        sequence: _Sequence,
+        cls: Type[BinaryExpression],
+        token: Token,
+        right: Expression
+    ) -> None:
+        spine = sequence.spine
+        precedence = cls._precedence
+
+        # everything below the topmost node binding tighter than `cls` is its left operand
+        cut = len(spine)
+        for index in sequence.maxima:
+            if spine[index]._precedence > precedence:
+                cut = index
+                break
+        if cut < len(spine):
+            left = spine[cut]
+            sequence.truncate(cut)
+        else:
+            left = spine[-1].right if spine else sequence.root  # type: ignore[attr-defined]
+
+        # climb past the nodes `cls` does not bind tighter than
+        while spine:
+            node = spine[-1]
+            if precedence > node._precedence or (node.__class__ is cls and cls._right_associative):
+                break
+            sequence.pop()
+            node.right = left  # type: ignore[attr-defined]
+            left = node
+
+        expression = cls(token, left, right)
+        if spine:
+            spine[-1].right = expression  # type: ignore[attr-defined]
+        else:
+            sequence.root = expression
+        sequence.push(expression)
+        sequence.push_chain(right)
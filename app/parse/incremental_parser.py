@@ -0,0 +1,144 @@
+from bisect import bisect_right
+from typing import Optional
+
+from ..execution import ExecutionScope
+from ..utils import BaseError, ParserBaseError, MissingScopeExpressionError, RuntimeError
+from ..tokens import IncrementalScanner, LineIndex, Token, EOFSymbol, SemicolonSymbol, LeftBraceSymbol, RightBraceSymbol
+from ..expressions import Expression, ConstantPool
+from .expression_parser import ExpressionParser
+
+
+class _Cursor:
+    # the token list as the iterator ExpressionParser pulls from, counting what it took
+    def __init__(self, tokens: list[Token], index: int) -> None:
+        self.tokens = tokens
+        self.index = index
+
+    def __iter__(self) -> '_Cursor':
+        return self
+
+    def __next__(self) -> Token:
+        if self.index >= len(self.tokens):
+            raise StopIteration
+        self.index += 1
+        return self.tokens[self.index - 1]
+
+
+# `Parser` over an IncrementalScanner that keeps its results between edits. The token
+# stream is cut into segments at every `;`, `{` and `}` after which no expression is
+# pending; each segment is known by its first token, the scope the parser was in there and
+# the statement it produced, if any. An edit is parsed again from the start of the segment
+# holding its first changed token until a boundary past the changed tokens lines up with
+# an old one in the same scope, from where the old segments, error included, are reused.
+class IncrementalParser:
+    def __init__(self, text: str = "") -> None:
+        self.scanner = IncrementalScanner()
+        self.constants = ConstantPool()
+        self.root_scope = ExecutionScope(None)
+        self.segment_starts: list[int] = [0]
+        self.segment_scopes: list[ExecutionScope] = [self.root_scope]
+        self.statements: list[Optional[tuple[ExecutionScope, Expression]]] = [None]
+        self.parse_error: Optional[BaseError] = None
+        # index of the last token consumed when `parse_error` was raised
+        self.error_token = 0
+        if text:
+            self.update(text)
+
+    @property
+    def error(self) -> bool:
+        return self.parse_error is not None or self.scanner.error
+
+    @property
+    def program(self) -> list[tuple[ExecutionScope, Expression]]:
+        return [statement for statement in self.statements if statement is not None]
+
+    # the errors a full parse reports, in order: tokenizer errors up to where parsing stopped
+    def errors(self) -> list[BaseError]:
+        limit = len(self.scanner.text) + 1
+        if self.parse_error is not None:
+            limit = self.scanner.starts[self.error_token]
+        errors: list[BaseError] = [e for anchor, e in self.scanner.errors if anchor < limit]
+        if self.parse_error is not None:
+            if isinstance(self.parse_error, ParserBaseError):
+                self.parse_error.locate(LineIndex(self.scanner.text), self.scanner.ends[self.error_token])
+            errors.append(self.parse_error)
+        return errors
+
+    def update(self, text: str) -> None:
+        self.__reparse(*self.scanner.update(text))
+
+    def edit(self, start: int, end: int, replacement: str) -> None:
+        self.__reparse(*self.scanner.edit(start, end, replacement))
+
+    def __reparse(self, first: int, old_stop: int, new_stop: int) -> None:
+        if first == old_stop == new_stop:
+            return
+
+        segment = bisect_right(self.segment_starts, first) - 1
+        old_starts, old_scopes, old_statements = self.segment_starts, self.segment_scopes, self.statements
+        old_error, old_error_token = self.parse_error, self.error_token
+        self.segment_starts = old_starts[:segment + 1]
+        self.segment_scopes = old_scopes[:segment + 1]
+        self.statements = old_statements[:segment]
+        self.parse_error = None
+
+        tokens = self.scanner.tokens
+        cursor = _Cursor(tokens, self.segment_starts[-1])
+        expressions = ExpressionParser(cursor, self.constants)
+        scope = self.segment_scopes[-1]
+        eof_kind = EOFSymbol.kind
+        semicolon_kind = SemicolonSymbol.kind
+        left_brace_kind = LeftBraceSymbol.kind
+        right_brace_kind = RightBraceSymbol.kind
+        shift = new_stop - old_stop
+
+        statement: Optional[tuple[ExecutionScope, Expression]] = None
+        try:
+            for token in cursor:
+                kind = token.kind
+                if kind == eof_kind:
+                    break
+                if kind == semicolon_kind:
+                    expression = expressions.take()
+                    if expression:
+                        statement = (scope, expression)
+                elif kind == left_brace_kind:
+                    scope = ExecutionScope(scope)
+                    if not expressions.empty:
+                        continue
+                elif kind == right_brace_kind:
+                    if not scope.parent:
+                        raise RuntimeError()
+                    scope = scope.parent
+                    if not expressions.empty:
+                        continue
+                else:
+                    expressions.feed(token)
+                    continue
+
+                # a boundary: close the current segment and open the next one here
+                self.statements.append(statement)
+                statement = None
+                boundary = cursor.index
+                if boundary >= new_stop:
+                    old_boundary = boundary - shift
+                    index = bisect_right(old_starts, old_boundary) - 1
+                    if old_starts[index] == old_boundary and old_scopes[index] is scope:
+                        self.segment_starts.extend(start + shift for start in old_starts[index:])
+                        self.segment_scopes.extend(old_scopes[index:])
+                        self.statements.extend(old_statements[index:])
+                        self.parse_error, self.error_token = old_error, old_error_token + shift
+                        return
+                self.segment_starts.append(boundary)
+                self.segment_scopes.append(scope)
+
+            expression = expressions.take()
+            if expression:
+                statement = (scope, expression)
+            if scope is not self.root_scope:
+                raise MissingScopeExpressionError(-1)
+        except (ParserBaseError, RuntimeError) as e:
+            # a `}` without a `{` fails the same way the scope stack of a full parse does
+            self.parse_error = e
+            self.error_token = cursor.index - 1
+        self.statements.append(statement)
@@ -1,55 +1,67 @@
 import sys
-from typing import Iterator, Optional
+from typing import Callable, Iterator, Optional, Union
 
 from ..execution import ExecutionContext, ExecutionScope
+from ..output import OutputSink
 from ..utils import ParserBaseError, MissingScopeExpressionError
-from ..tokens import Tokenizer, EOFSymbol, SemicolonSymbol, LeftBraceSymbol, RightBraceSymbol
-from ..expressions import Expression
+from ..tokens import Scanner, ParallelScanner, Source, EOFSymbol, SemicolonSymbol, LeftBraceSymbol, RightBraceSymbol
+from ..expressions import Expression, ConstantPool
+from .expression_parser import ExpressionParser
 
 class Parser:
-    def __init__(self, s:str) -> None:
-        self.tokenizer = Tokenizer(s)
+    # statements print to `output` when they are run in the scopes of this parser
+    def __init__(self, s: Union[str, Source], jobs: int = 1, output: Optional[OutputSink] = None) -> None:
+        self.tokenizer: Union[Scanner, ParallelScanner] = ParallelScanner(s, jobs) if jobs > 1 else Scanner(s)
         self.self_error = False
-        self.context = ExecutionContext()
+        # lets buffered output catch up before an error is printed
+        self.before_report: Optional[Callable[[], None]] = None
+        self.context = ExecutionContext(output)
+        self.constants = ConstantPool()
     
     @property
     def error(self) -> bool:
         return self.self_error or self.tokenizer.error
     
     def __iter__(self) -> Iterator[tuple[ExecutionScope, Expression]]:
+        self.tokenizer.before_report = self.before_report
         token_iter = iter(self.tokenizer)
-        expression: Optional[Expression] = None
+        expressions = ExpressionParser(token_iter, self.constants)
+        eof_kind = EOFSymbol.kind
+        semicolon_kind = SemicolonSymbol.kind
+        left_brace_kind = LeftBraceSymbol.kind
+        right_brace_kind = RightBraceSymbol.kind
     
         try:
             for token in token_iter:
                 # print("DEBUG: " + str(token))
+                kind = token.kind
 
-                if token.__class__ == EOFSymbol:
+                if kind == eof_kind:
                     break
-                if token.__class__ == SemicolonSymbol:
+                if kind == semicolon_kind:
+                    expression = expressions.take()
                     if expression:
                         # print("DEBUG: " + str(expression))
                         yield (self.context.current_scope, expression)
-                    expression = None
                     continue
-                if token.__class__ == LeftBraceSymbol:
+                if kind == left_brace_kind:
                     self.context.push_scope()
                     continue
-                if token.__class__ == RightBraceSymbol:
+                if kind == right_brace_kind:
                     self.context.pop_scope()
                     continue
                 
-                if expression and expression._statement:
-                    expression.right = Expression.from_token(token, expression.right, token_iter)
-                else:
-                    expression = Expression.from_token(token, expression, token_iter)
+                expressions.feed(token)
             
+            expression = expressions.take()
             if expression:
                 yield (self.context.current_scope, expression)
 
             if self.context.current_scope is not self.context.root_scope:
                 raise MissingScopeExpressionError(self.tokenizer.line)
         except ParserBaseError as e:
-            e.line_num = self.tokenizer.line
+            e.locate(self.tokenizer.lines, self.tokenizer.offset)
+            if self.before_report:
+                self.before_report()
             print(e, file=sys.stderr)
             self.self_error = True
\ No newline at end of file
@@ -0,0 +1,5 @@
+from .profiler import Profiler
+
+__all__ = [
+    Profiler.__name__,
+]
@@ -0,0 +1,169 @@
+import json
+import time
+from typing import Any, Iterator, Optional, TextIO
+
+from ..expressions import Expression
+from ..tokens import Scanner, ParallelScanner
+from ..parse import Parser
+from ..optimize import Optimizer
+from ..engines.engine import Program
+
+
+PHASES = ("tokenize", "parse", "optimize", "evaluate")
+
+
+def _subclasses(cls: type) -> list[type]:
+    found: list[type] = []
+    pending = [cls]
+    while pending:
+        current = pending.pop()
+        found.append(current)
+        pending.extend(current.__subclasses__())
+    return found
+
+
+# Counts and times a tree-walking run. `install` replaces `_evaluate` on every Expression
+# class and `__iter__` on the scanners with timed wrappers and `uninstall` puts the
+# originals back, so nothing is measured, or slowed down, outside of a profiled run.
+# Time is kept per phase, per expression class, excluding the nodes below, and per line,
+# the line a statement ends on. Nodes of statements too deep for the call stack run on
+# the explicit stack through `operate` and only their leaves are counted by class.
+class Profiler:
+    def __init__(self) -> None:
+        self.phases: dict[str, float] = dict.fromkeys(PHASES, 0.0)
+        # class name -> [calls, seconds excluding the nodes below]
+        self.expressions: dict[str, list[Any]] = {}
+        # line -> [statements run, seconds]
+        self.lines: dict[Optional[int], list[Any]] = {}
+        self._installed: list[tuple[type, str, Optional[Any]]] = []
+        # time spent in the nodes below the one being evaluated, one entry per open node
+        self._below: list[float] = [0.0]
+
+    def install(self) -> None:
+        classes = _subclasses(Expression)
+        originals = [(cls, cls._evaluate) for cls in classes]
+        for cls, original in originals:
+            self.__replace(cls, "_evaluate", self.__timed_evaluate(cls.__name__, original))
+        for scanner_cls in (Scanner, ParallelScanner):
+            self.__replace(scanner_cls, "__iter__", self.__timed_tokens(scanner_cls.__iter__))
+
+    def uninstall(self) -> None:
+        for cls, name, original in reversed(self._installed):
+            if original is None:
+                delattr(cls, name)
+            else:
+                setattr(cls, name, original)
+        self._installed.clear()
+
+    def parse(self, parser: Parser) -> tuple[Program, dict[int, int]]:
+        # the program and the line every statement ends on, by statement id
+        program: Program = []
+        lines: dict[int, int] = {}
+        tokenize = self.phases["tokenize"]
+        start = time.perf_counter()
+        for scope, expression in parser:
+            lines[id(expression)] = parser.tokenizer.line
+            program.append((scope, expression))
+        tokens = self.phases["tokenize"] - tokenize
+        self.phases["parse"] += time.perf_counter() - start - tokens
+        return program, lines
+
+    def optimize(self, optimizer: Optimizer, program: Program) -> Program:
+        start = time.perf_counter()
+        program = optimizer.optimize(program)
+        self.phases["optimize"] += time.perf_counter() - start
+        return program
+
+    def execute(self, program: Program, lines: dict[int, int]) -> None:
+        clock = time.perf_counter
+        try:
+            for scope, expression in program:
+                # statements the optimizer replaced as a whole have no line
+                stats = self.lines.setdefault(lines.get(id(expression)), [0, 0.0])
+                start = clock()
+                try:
+                    expression.evaluate(scope)
+                finally:
+                    elapsed = clock() - start
+                    stats[0] += 1
+                    stats[1] += elapsed
+                    self.phases["evaluate"] += elapsed
+        finally:
+            self._below[:] = [0.0]
+
+    def to_json(self) -> dict[str, Any]:
+        return {
+            "phases": self.phases,
+            "expressions": {
+                name: {"calls": calls, "seconds": seconds}
+                for name, (calls, seconds) in self.expressions.items() if calls
+            },
+            "lines": {
+                str(line): {"statements": runs, "seconds": seconds}
+                for line, (runs, seconds) in self.lines.items()
+            },
+        }
+
+    def write_json(self, path: str) -> None:
+        with open(path, "w") as fd:
+            json.dump(self.to_json(), fd, indent=2)
+            fd.write("\n")
+
+    def report(self, stream: TextIO, limit: int = 20) -> None:
+        print(f"{'phase':<30} {'ms':>12}", file=stream)
+        for name, seconds in self.phases.items():
+            print(f"{name:<30} {seconds * 1e3:12.3f}", file=stream)
+
+        print(f"\n{'expression':<30} {'calls':>12} {'self ms':>12} {'us/call':>10}", file=stream)
+        expressions = sorted(self.expressions.items(), key=lambda item: -item[1][1])
+        for name, (calls, seconds) in expressions:
+            if calls:
+                print(f"{name:<30} {calls:12d} {seconds * 1e3:12.3f} {seconds * 1e6 / calls:10.3f}", file=stream)
+
+        print(f"\n{'line':<30} {'statements':>12} {'ms':>12}", file=stream)
+        lines = sorted(self.lines.items(), key=lambda item: -item[1][1])
+        for line, (runs, seconds) in lines[:limit]:
+            print(f"{'-' if line is None else line:<30} {runs:12d} {seconds * 1e3:12.3f}", file=stream)
+        if len(lines) > limit:
+            print(f"... {len(lines) - limit} more lines", file=stream)
+
+    def __replace(self, cls: type, name: str, replacement: Any) -> None:
+        self._installed.append((cls, name, cls.__dict__.get(name)))
+        setattr(cls, name, replacement)
+
+    def __timed_evaluate(self, name: str, original: Any) -> Any:
+        stats = self.expressions.setdefault(name, [0, 0.0])
+        below = self._below
+        clock = time.perf_counter
+
+        def _evaluate(node: Expression, scope: Any) -> Any:
+            below.append(0.0)
+            start = clock()
+            try:
+                return original(node, scope)
+            finally:
+                elapsed = clock() - start
+                stats[0] += 1
+                stats[1] += elapsed - below.pop()
+                below[-1] += elapsed
+
+        return _evaluate
+
+    def __timed_tokens(self, original: Any) -> Any:
+        phases = self.phases
+        clock = time.perf_counter
+
+        def __iter__(scanner: Any) -> Iterator[Any]:
+            tokens = original(scanner)
+            while True:
+                start = clock()
+                try:
+                    token = next(tokens)
+                except StopIteration:
+                    phases["tokenize"] += clock() - start
+                    return
+                phases["tokenize"] += clock() - start
+                yield token
+
+        return __iter__
+
@@ -0,0 +1,5 @@
+from .lox_server import LoxServer
+
+__all__ = [
+    LoxServer.__name__,
+]
@@ -0,0 +1,160 @@
+import gc
+import marshal
+import os
+import signal
+import socket
+import struct
+import sys
+import traceback
+from argparse import Namespace
+from typing import Callable, Optional
+
+from ..client import STATUS
+from ..utils import exit_status
+
+
+_LENGTH = struct.Struct("<I")
+MAX_FDS = 3
+
+
+# Accepts requests from `app.client` on a Unix domain socket. Everything is imported
+# and the argument parser built once, before `workers` processes are forked to share the
+# listening socket; each takes one request at a time. A request is a command line, the
+# client's working directory and its stdin, stdout and stderr, so a command sees the same
+# streams, prints the same output and exits with the same status it would run on its own.
+class LoxServer:
+    # `parse_args` turns a request's arguments into the namespace `app.main` would run and
+    # `run` runs it the way `app.main` would
+    def __init__(
+        self, path: str, workers: int, parse_args: Callable[[list[str]], Namespace], run: Callable[[Namespace], None],
+    ) -> None:
+        self.path = path
+        self.workers = max(1, workers)
+        self.parse_args = parse_args
+        self.run = run
+
+    def serve_forever(self) -> None:
+        listener = self.__listen()
+        # objects created so far are shared by every worker; keeping the collector off
+        # them keeps their pages from being copied into each one
+        gc.collect()
+        gc.freeze()
+
+        children: set[int] = set()
+        previous = signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        try:
+            for _ in range(self.workers):
+                children.add(self.__fork(listener))
+            while True:
+                pid, _ = os.wait()
+                if pid in children:
+                    children.remove(pid)
+                    children.add(self.__fork(listener))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            signal.signal(signal.SIGTERM, previous)
+            for pid in children:
+                try:
+                    os.kill(pid, signal.SIGTERM)
+                except ProcessLookupError:
+                    pass
+            for pid in children:
+                try:
+                    os.waitpid(pid, 0)
+                except ChildProcessError:
+                    pass
+            listener.close()
+            os.unlink(self.path)
+
+    def __listen(self) -> socket.socket:
+        if os.path.exists(self.path):
+            with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+                try:
+                    probe.connect(self.path)
+                except OSError:
+                    # left behind by a server that is gone
+                    os.unlink(self.path)
+                else:
+                    raise SystemExit(f"a server is already listening on {self.path}")
+
+        listener = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        listener.bind(self.path)
+        listener.listen(socket.SOMAXCONN)
+        return listener
+
+    def __fork(self, listener: socket.socket) -> int:
+        pid = os.fork()
+        if pid:
+            return pid
+
+        status = 0
+        try:
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            while True:
+                connection, _ = listener.accept()
+                with connection:
+                    self.handle(connection)
+        except KeyboardInterrupt:
+            pass
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+        finally:
+            # a worker never returns into the parent's loop
+            os._exit(status)
+
+    def handle(self, connection: socket.socket) -> None:
+        request = self.__receive(connection)
+        if request is None:
+            return
+        payload, fds = request
+        argv, cwd = marshal.loads(payload)
+        status = self.execute(argv, cwd, fds)
+        try:
+            connection.sendall(STATUS.pack(status))
+        except OSError:
+            pass
+
+    def execute(self, argv: list[str], cwd: str, fds: list[int]) -> int:
+        stdin_fd, stdout_fd, stderr_fd = fds
+        saved = sys.stdin, sys.stdout, sys.stderr
+        # the client's streams, buffered the way the interpreter would buffer them there
+        sys.stdin = open(stdin_fd, "r")
+        sys.stdout = open(stdout_fd, "w", buffering=1 if os.isatty(stdout_fd) else -1)
+        sys.stderr = open(stderr_fd, "w", buffering=1, errors="backslashreplace")
+        try:
+            os.chdir(cwd)
+            self.run(self.parse_args(argv))
+            status = 0
+        except SystemExit as e:
+            status = exit_status(e)
+        except KeyboardInterrupt:
+            raise
+        except BaseException:
+            traceback.print_exc()
+            status = 1
+        finally:
+            for stream in (sys.stdout, sys.stderr, sys.stdin):
+                try:
+                    stream.close()
+                except OSError:
+                    pass
+            sys.stdin, sys.stdout, sys.stderr = saved
+        return status
+
+    @staticmethod
+    def __receive(connection: socket.socket) -> Optional[tuple[bytes, list[int]]]:
+        data, fds, _, _ = socket.recv_fds(connection, 1 << 16, MAX_FDS)
+        if len(fds) != MAX_FDS:
+            for fd in fds:
+                os.close(fd)
+            return None
+        while len(data) < _LENGTH.size or len(data) < _LENGTH.size + _LENGTH.unpack_from(data)[0]:
+            chunk = connection.recv(1 << 16)
+            if not chunk:
+                for fd in fds:
+                    os.close(fd)
+                return None
+            data += chunk
+        return data[_LENGTH.size:], fds
@@ -1,8 +1,24 @@
 from .tokenizer import Tokenizer 
+from .scanner import Scanner
+from .line_index import LineIndex
+from .token_buffer import TokenBuffer
+from .parallel_scanner import ParallelScanner
+from .incremental_scanner import IncrementalScanner
+from .source import Source, StringSource, StreamSource, MmapSource, open_source, DEFAULT_CHUNK_SIZE
 from .tokens import *
 
 __all__=[
     Tokenizer.__name__,
+    Scanner.__name__,
+    LineIndex.__name__,
+    TokenBuffer.__name__,
+    ParallelScanner.__name__,
+    IncrementalScanner.__name__,
+    Source.__name__,
+    StringSource.__name__,
+    StreamSource.__name__,
+    MmapSource.__name__,
+    open_source.__name__,
     Token.__name__,
     Identifier.__name__,
     StringLiteral.__name__,
@@ -1,22 +1,33 @@
+from typing import Union
+
+from .line_index import LineIndex
+from .source import Source
+
+
 class CharacterProvider:
-    def __init__(self, s: str) -> None:
+    def __init__(self, s: Union[str, Source]) -> None:
+        # random access over the whole text, so a streaming source is read in full
+        if isinstance(s, Source):
+            s = s.read()
         self.s = s
         self.string_len = len(s)
         self.index = 0
-        self.line = 1
+        self.lines = LineIndex(s)
+    
+    @property
+    def line(self) -> int:
+        return self.lines.line_of(self.index)
     
     def forward(self, step: int = 1) -> str:
         if self.index + step > self.string_len:
             raise StopIteration
         
-        self.line += self.s.count("\n", self.index, self.index + step)
         self.index += step
         return self.s[self.index - step: self.index]
 
                 
     def backward(self, step:int = 1) -> None:
         self.index -= step
-        self.line -= self.s.count("\n", self.index, self.index + step)
     
     def top(self, step: int = 1) -> str:
         return self.s[self.index: self.index + step]
@@ -0,0 +1,118 @@
+from bisect import bisect_left
+from typing import Iterator
+
+from ..utils import TokenizerBaseError
+from .scanner import Scanner
+from .tokens import Token, EOFSymbol
+
+
+class _EditScanner(Scanner):
+    # records errors with the offset of the token end they follow instead of printing
+    def __init__(self, source: str, first_line: int, base: int) -> None:
+        super().__init__(source, first_line)
+        self.base = base
+        self.errors: list[tuple[int, TokenizerBaseError]] = []
+
+    def report(self, e: TokenizerBaseError) -> None:
+        self.error = True
+        self.errors.append((self.base + self._offset, e))
+
+
+def _common_prefix(a: str, b: str, limit: int) -> int:
+    # binary search with slice comparisons, which run at memcmp speed
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[low:middle] == b[low:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+def _common_suffix(a: str, b: str, limit: int) -> int:
+    low, high = 0, limit
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[len(a) - middle:len(a) - low] == b[len(b) - middle:len(b) - low]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+
+# Keeps the token stream of a source between edits. An edit is rescanned from the end of
+# the last token before it, a match boundary no lexeme looks more than one character past,
+# up to the first token after the edit that starts where an old token started: the text
+# from there on is unchanged, so are its tokens and errors, and they are only shifted.
+class IncrementalScanner:
+    def __init__(self, text: str = "") -> None:
+        self.text = ""
+        self.tokens: list[Token] = [EOFSymbol()]
+        self.starts: list[int] = [0]
+        self.ends: list[int] = [0]
+        # (offset of the token end an error follows, error), in source order
+        self.errors: list[tuple[int, TokenizerBaseError]] = []
+        if text:
+            self.edit(0, 0, text)
+
+    @property
+    def error(self) -> bool:
+        return bool(self.errors)
+
+    def spans(self) -> Iterator[tuple[Token, int, int]]:
+        return zip(self.tokens, self.starts, self.ends)
+
+    def update(self, text: str) -> tuple[int, int, int]:
+        if text == self.text:
+            count = len(self.tokens)
+            return count, count, count
+        old = self.text
+        limit = min(len(old), len(text))
+        prefix = _common_prefix(old, text, limit)
+        suffix = _common_suffix(old, text, limit - prefix)
+        return self.edit(prefix, len(old) - suffix, text[prefix:len(text) - suffix])
+
+    # Replaces `text[start:end]` with `replacement` and returns `(first, old_stop,
+    # new_stop)`: the tokens from `first` to `old_stop` were replaced by the ones from
+    # `first` to `new_stop`, and every token after them was only shifted.
+    def edit(self, start: int, end: int, replacement: str) -> tuple[int, int, int]:
+        old = self.text
+        text = self.text = old[:start] + replacement + old[end:]
+        delta = len(replacement) - (end - start)
+        edit_end = start + len(replacement)
+
+        # a token that reaches the edit may grow into it, so it is scanned again
+        first = bisect_left(self.ends, start)
+        restart = self.ends[first - 1] if first else 0
+        scanner = _EditScanner(text[restart:], text.count("\n", 0, restart) + 1, restart)
+
+        tokens: list[Token] = []
+        starts: list[int] = []
+        ends: list[int] = []
+        stop = len(self.tokens)
+        for token in scanner:
+            token_start = restart + scanner.token_start
+            if token_start >= edit_end:
+                old_start = token_start - delta
+                index = bisect_left(self.starts, old_start, first)
+                if index < len(self.starts) and self.starts[index] == old_start:
+                    stop = index
+                    break
+            tokens.append(token)
+            starts.append(token_start)
+            ends.append(restart + scanner.offset)
+
+        resumed = self.starts[stop] if stop < len(self.starts) else len(old) + 1
+        lines = replacement.count("\n") - old.count("\n", start, end)
+        kept = [(anchor, e) for anchor, e in self.errors if anchor < restart]
+        for anchor, e in self.errors:
+            if anchor >= resumed:
+                e.line_num += lines
+                scanner.errors.append((anchor + delta, e))
+        self.errors = kept + scanner.errors
+
+        self.tokens[first:stop] = tokens
+        self.starts[first:] = starts + [offset + delta for offset in self.starts[stop:]]
+        self.ends[first:] = ends + [offset + delta for offset in self.ends[stop:]]
+        return first, stop, first + len(tokens)
@@ -0,0 +1,31 @@
+from array import array
+from bisect import bisect_left
+from typing import Optional
+
+
+class LineIndex:
+    _newlines: Optional[array]
+    
+    # `s` may be a window of a larger source that starts at offset `base` on line `base_line`
+    def __init__(self, s: str, base: int = 0, base_line: int = 1) -> None:
+        self.s = s
+        self.base = base
+        self.base_line = base_line
+        self._newlines = None
+    
+    @property
+    def newlines(self) -> array:
+        # built on the first lookup, which usually means the first reported error
+        if self._newlines is None:
+            newlines = array("q")
+            find = self.s.find
+            index = find("\n")
+            while index != -1:
+                newlines.append(index)
+                index = find("\n", index + 1)
+            self._newlines = newlines
+        
+        return self._newlines
+    
+    def line_of(self, offset: int) -> int:
+        return bisect_left(self.newlines, offset - self.base) + self.base_line
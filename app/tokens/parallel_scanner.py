@@ -0,0 +1,145 @@
+import re
+import sys
+from typing import Callable, Iterator, Optional, Union
+
+from ..utils import TokenizerBaseError
+from .line_index import LineIndex
+from .scanner import Scanner
+from .source import Source
+from .token_buffer import TokenBuffer
+from .tokens import Token, EOFSymbol
+
+
+# the only lexemes that may contain a newline; a newline outside of them ends every token
+_MULTILINE_PATTERN = re.compile(r'"[^"]*"?|//[^\n]*')
+
+MIN_CHUNK_SIZE = 1 << 16
+
+
+def find_split_points(s: str, parts: int) -> list[int]:
+    # offsets just after a newline that is neither inside a string literal nor a comment
+    points = [0]
+    pos = 0
+    for part in range(1, parts):
+        target = max(len(s) * part // parts, pos)
+        while True:
+            match = _MULTILINE_PATTERN.search(s, pos)
+            limit = match.start() if match else len(s)
+            if limit > target:
+                newline = s.find("\n", target, limit)
+                if newline != -1:
+                    pos = newline + 1
+                    break
+            if match is None:
+                pos = len(s)
+                break
+            pos = match.end()
+            target = max(target, pos)
+
+        if pos >= len(s):
+            break
+        if pos > points[-1]:
+            points.append(pos)
+
+    points.append(len(s))
+    return points
+
+
+class _ChunkScanner(Scanner):
+    # records errors with the number of tokens scanned before them instead of printing
+    def __init__(self, source: str, first_line: int) -> None:
+        super().__init__(source, first_line)
+        self.count = 0
+        self.errors: list[tuple[int, str]] = []
+
+    def report(self, e: TokenizerBaseError) -> None:
+        self.error = True
+        self.errors.append((self.count, str(e)))
+
+
+def _scan_chunk(chunk: tuple[str, int]) -> tuple[TokenBuffer, list[tuple[int, str]]]:
+    scanner = _ChunkScanner(*chunk)
+    buffer = TokenBuffer()
+    for token in scanner:
+        if token.kind == EOFSymbol.kind:
+            break
+        buffer.append(token, scanner.token_start, scanner.offset)
+        scanner.count += 1
+
+    return buffer, scanner.errors
+
+
+# Drop-in replacement for `Scanner` that tokenizes newline-aligned chunks in a process
+# pool and replays the merged stream, errors included, in source order.
+class ParallelScanner:
+    def __init__(self, source: Union[str, Source], jobs: int) -> None:
+        self.s = source if isinstance(source, str) else source.read()
+        self.jobs = jobs
+        self.error = False
+        self.before_report: Optional[Callable[[], None]] = None
+        self.lines = LineIndex(self.s)
+        self.token_start = 0
+        self._offset = 0
+
+    @property
+    def line(self) -> int:
+        return self.lines.line_of(self._offset)
+
+    @property
+    def offset(self) -> int:
+        return self._offset
+
+    def chunks(self) -> list[tuple[str, int]]:
+        parts = max(1, min(self.jobs * 4, len(self.s) // MIN_CHUNK_SIZE))
+        points = find_split_points(self.s, parts)
+        chunks = []
+        line = 1
+        for start, end in zip(points, points[1:]):
+            chunks.append((self.s[start:end], line))
+            line += self.s.count("\n", start, end)
+        return chunks
+
+    def __iter__(self) -> Iterator[Token]:
+        chunks = self.chunks()
+        if len(chunks) <= 1 or self.jobs <= 1:
+            results = map(_scan_chunk, chunks)
+            yield from self.__replay(chunks, results)
+        else:
+            # the pool machinery takes longer to import than most inputs take to scan
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                yield from self.__replay(chunks, executor.map(_scan_chunk, chunks))
+
+        self.token_start = self._offset = len(self.s)
+        yield EOFSymbol()
+
+    def __replay(
+        self,
+        chunks: list[tuple[str, int]],
+        results: Iterator[tuple[TokenBuffer, list[tuple[int, str]]]]
+    ) -> Iterator[Token]:
+        base = 0
+        for (chunk, _), (buffer, errors) in zip(chunks, results):
+            pending = iter(errors)
+            error = next(pending, None)
+            starts = buffer.starts
+            lengths = buffer.lengths
+            for index in range(len(buffer)):
+                while error is not None and error[0] <= index:
+                    self.__report(error[1])
+                    error = next(pending, None)
+
+                self.token_start = base + starts[index]
+                self._offset = self.token_start + lengths[index]
+                yield buffer.token(index)
+
+            while error is not None:
+                self.__report(error[1])
+                error = next(pending, None)
+            base += len(chunk)
+
+    def __report(self, message: str) -> None:
+        self.error = True
+        if self.before_report:
+            self.before_report()
+        print(message, file=sys.stderr)
@@ -0,0 +1,141 @@
+import re
+import sys
+from sys import intern
+from typing import Callable, Iterator, Optional, Union
+
+from ..utils import TokenizerBaseError, UnexpectedCharacterError, UnterminatedStringError
+from .line_index import LineIndex
+from .source import Source, StringSource
+from .tokens import Token, Identifier, StringLiteral, NumberLiteral, EOFSymbol
+
+
+# One alternative per lexeme class, tried left to right at every position. Each
+# alternative is greedy, so the longest lexeme wins (maximal munch) and the
+# trailing `.` catches any character no other alternative accepts.
+_MASTER_PATTERN = re.compile(
+    r"""
+    (?P<space>\s+)
+    |(?P<comment>//[^\n]*\n?)
+    |(?P<string>"[^"]*"?)
+    |(?P<number>\d+(?:\.\d*)?)
+    |(?P<word>\w+)
+    |(?P<symbol>!=|==|<=|>=|[(){}*.,+\-;=!<>/])
+    |(?P<error>.)
+    """,
+    re.VERBOSE | re.DOTALL,
+)
+
+
+_SYMBOLS: dict[str, Token] = {lexeme: cls() for lexeme, cls in Token._type2symbol_class.items()}
+_RESERVED: dict[str, Token] = {lexeme: cls() for lexeme, cls in Token._type2reserved_class.items()}
+
+
+# Drop-in replacement for `Tokenizer`: same tokens and errors, one regex match
+# per lexeme and one dict lookup to tell keywords from identifiers.
+class Scanner:
+    # span of the most recently yielded token
+    token_start: int
+
+    def __init__(self, source: Union[str, Source], first_line: int = 1) -> None:
+        self.source = StringSource(source) if isinstance(source, str) else source
+        self.error = False
+        # lets buffered output catch up before an error is printed
+        self.before_report: Optional[Callable[[], None]] = None
+        self.first_line = first_line
+        self.lines = LineIndex("", 0, first_line)
+        self.token_start = 0
+        self._offset = 0
+        # keywords plus one shared Identifier per distinct (interned) name
+        self.words: dict[str, Token] = dict(_RESERVED)
+
+    @property
+    def line(self) -> int:
+        return self.lines.line_of(self._offset)
+
+    @property
+    def offset(self) -> int:
+        return self._offset
+
+    def report(self, e: TokenizerBaseError) -> None:
+        self.error = True
+        if self.before_report:
+            self.before_report()
+        print(e, file=sys.stderr)
+
+    def spans(self) -> Iterator[tuple[Token, int, int]]:
+        for token in self:
+            yield token, self.token_start, self._offset
+
+    def __iter__(self) -> Iterator[Token]:
+        symbols = _SYMBOLS
+        words = self.words
+
+        chunks = self.source.chunks()
+        buffer = next(chunks, "")
+        next_chunk = next(chunks, None)
+        base = 0
+        base_line = self.first_line
+        pos = 0
+
+        token: Token
+        while True:
+            final = next_chunk is None
+            end = len(buffer)
+            self.lines = LineIndex(buffer, base, base_line)
+
+            for match in _MASTER_PATTERN.finditer(buffer, pos):
+                # a lexeme that touches the end of the buffer may continue in the next chunk
+                if not final and match.end() == end:
+                    break
+                pos = match.end()
+
+                kind = match.lastgroup
+                if kind == "space" or kind == "comment":
+                    continue
+
+                text = match.group()
+                if kind == "word":
+                    token = words.get(text)  # type: ignore[assignment]
+                    if token is None:
+                        text = intern(text)
+                        token = words[text] = Identifier(text)
+                elif kind == "symbol":
+                    token = symbols[text]
+                elif kind == "number":
+                    token = NumberLiteral(text, float(text) if "." in text else int(text))
+                elif kind == "string" and len(text) > 1 and text[-1] == "\"":
+                    token = StringLiteral(text[1:-1])
+                else:
+                    line_num = self.lines.line_of(base + match.start())
+                    if kind == "string":
+                        self.report(UnterminatedStringError(line_num))
+                    else:
+                        self.report(UnexpectedCharacterError(line_num, text))
+                    continue
+
+                self.token_start = base + match.start()
+                self._offset = base + pos
+                yield token
+
+            if final:
+                break
+
+            # drop what is consumed, but keep the end of the last token so `line` still resolves
+            keep = min(pos, self._offset - base)
+            base_line += buffer.count("\n", 0, keep)
+            base += keep
+            pos -= keep
+
+            # read at least as much as the unfinished lexeme is long, so that one very
+            # long string or comment is rescanned a logarithmic number of times
+            pending = [buffer[keep:], next_chunk]
+            needed = end - keep - pos - len(next_chunk)
+            next_chunk = next(chunks, None)
+            while next_chunk is not None and needed > 0:
+                pending.append(next_chunk)
+                needed -= len(next_chunk)
+                next_chunk = next(chunks, None)
+            buffer = "".join(pending)
+
+        self.token_start = self._offset = base + len(buffer)
+        yield EOFSymbol()
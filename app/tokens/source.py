@@ -0,0 +1,103 @@
+import codecs
+import io
+import locale
+import mmap
+import os
+import stat
+import sys
+from abc import ABC, abstractmethod
+from typing import Iterator, Optional, TextIO
+
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+class Source(ABC):
+    @abstractmethod
+    def chunks(self) -> Iterator[str]:
+        ...
+
+    def read(self) -> str:
+        return "".join(self.chunks())
+
+    def close(self) -> None:
+        pass
+
+    def __enter__(self) -> 'Source':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+class StringSource(Source):
+    def __init__(self, s: str) -> None:
+        self.s = s
+
+    def chunks(self) -> Iterator[str]:
+        yield self.s
+
+    def read(self) -> str:
+        return self.s
+
+
+class StreamSource(Source):
+    def __init__(self, stream: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE, owned: bool = True) -> None:
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.owned = owned
+
+    def chunks(self) -> Iterator[str]:
+        read = self.stream.read
+        chunk = read(self.chunk_size)
+        while chunk:
+            yield chunk
+            chunk = read(self.chunk_size)
+
+    def close(self) -> None:
+        if self.owned:
+            self.stream.close()
+
+
+class MmapSource(Source):
+    _map: Optional[mmap.mmap]
+
+    def __init__(self, path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, encoding: Optional[str] = None) -> None:
+        self.chunk_size = chunk_size
+        self.encoding = encoding or locale.getpreferredencoding(False)
+        with open(path, "rb") as fd:
+            size = os.fstat(fd.fileno()).st_size
+            self._map = mmap.mmap(fd.fileno(), 0, access=mmap.ACCESS_READ) if size else None
+
+    def chunks(self) -> Iterator[str]:
+        if self._map is None:
+            return
+
+        # same decoding and newline translation as a file opened in text mode
+        decoder = io.IncrementalNewlineDecoder(
+            codecs.getincrementaldecoder(self.encoding)(),
+            translate=True,
+        )
+        for start in range(0, len(self._map), self.chunk_size):
+            chunk = decoder.decode(self._map[start: start + self.chunk_size])
+            if chunk:
+                yield chunk
+
+        tail = decoder.decode(b"", final=True)
+        if tail:
+            yield tail
+
+    def close(self) -> None:
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+def open_source(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, use_mmap: bool = False) -> Source:
+    if path == "-":
+        return StreamSource(sys.stdin, chunk_size, owned=False)
+
+    if use_mmap and stat.S_ISREG(os.stat(path).st_mode):
+        return MmapSource(path, chunk_size)
+
+    return StreamSource(open(path), chunk_size)
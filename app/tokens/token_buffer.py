@@ -0,0 +1,89 @@
+from array import array
+from sys import intern
+from typing import Iterable, Iterator, Optional
+
+from .tokens import Token, Identifier, StringLiteral, NumberLiteral, Symbol, ReservedWord
+
+
+# Struct-of-arrays token stream: one byte of kind and three unsigned ints (start offset,
+# length and an operand) per token. The operand indexes `names` for identifiers and
+# `literals` for strings and numbers, both deduplicated; symbols and reserved words
+# need no operand because their token objects are singletons.
+class TokenBuffer:
+    def __init__(self) -> None:
+        self.kinds = array("B")
+        self.starts = array("I")
+        self.lengths = array("I")
+        self.operands = array("I")
+        self.names: list[str] = []
+        self.literals: list[str] = []
+        self._name_slots: dict[str, int] = {}
+        self._literal_slots: dict[str, int] = {}
+        self._identifiers: list[Optional[Identifier]] = []
+
+    @classmethod
+    def from_tokens(cls, spans: Iterable[tuple[Token, int, int]]) -> 'TokenBuffer':
+        buffer = cls()
+        for token, start, end in spans:
+            buffer.append(token, start, end)
+        return buffer
+
+    # only the columns and tables travel between processes, the lookup caches are rebuilt
+    def __getstate__(self) -> tuple:
+        return self.kinds, self.starts, self.lengths, self.operands, self.names, self.literals
+
+    def __setstate__(self, state: tuple) -> None:
+        self.kinds, self.starts, self.lengths, self.operands, self.names, self.literals = state
+        self._name_slots = {name: slot for slot, name in enumerate(self.names)}
+        self._literal_slots = {literal: slot for slot, literal in enumerate(self.literals)}
+        self._identifiers = [None] * len(self.names)
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def __iter__(self) -> Iterator[Token]:
+        for index in range(len(self.kinds)):
+            yield self.token(index)
+
+    def append(self, token: Token, start: int, end: int) -> None:
+        kind = token.kind
+        operand = 0
+        if kind == Identifier.kind:
+            operand = self.__slot(self.names, self._name_slots, token.lexeme)
+        elif kind == StringLiteral.kind:
+            operand = self.__slot(self.literals, self._literal_slots, token.literal)
+        elif kind == NumberLiteral.kind:
+            operand = self.__slot(self.literals, self._literal_slots, token.lexeme)
+
+        self.kinds.append(kind)
+        self.starts.append(start)
+        self.lengths.append(end - start)
+        self.operands.append(operand)
+
+    def token(self, index: int) -> Token:
+        kind = self.kinds[index]
+        operand = self.operands[index]
+        if kind == Identifier.kind:
+            identifier = self._identifiers[operand]
+            if identifier is None:
+                identifier = self._identifiers[operand] = Identifier(self.names[operand])
+            return identifier
+        if kind == StringLiteral.kind:
+            return StringLiteral(self.literals[operand])
+        if kind == NumberLiteral.kind:
+            lexeme = self.literals[operand]
+            return NumberLiteral(lexeme, float(lexeme) if "." in lexeme else int(lexeme))
+
+        token_cls = Token._kind2class[kind]
+        assert issubclass(token_cls, (Symbol, ReservedWord))
+        return token_cls._instance
+
+    def __slot(self, table: list[str], slots: dict[str, int], text: str) -> int:
+        slot = slots.get(text)
+        if slot is None:
+            text = intern(text)
+            slot = slots[text] = len(table)
+            table.append(text)
+            if table is self.names:
+                self._identifiers.append(None)
+        return slot
@@ -1,14 +1,16 @@
 import sys
-from typing import Iterator
+from typing import Iterator, Union
 
 from .character_provider import CharacterProvider
+from .line_index import LineIndex
+from .source import Source
 
 from ..utils import TokenizerBaseError
 from .tokens import Token, EOFSymbol
 
 
 class Tokenizer:
-    def __init__(self, s: str) -> None:
+    def __init__(self, s: Union[str, Source]) -> None:
         self.cp = CharacterProvider(s)
         self.error = False
     
@@ -16,6 +18,14 @@ class Tokenizer:
     def line(self) -> int:
         return self.cp.line
     
+    @property
+    def lines(self) -> LineIndex:
+        return self.cp.lines
+    
+    @property
+    def offset(self) -> int:
+        return self.cp.index
+    
     def __iter__(self) -> Iterator[Token]:
         while not self.cp.EOF:
             # print("DEBUG: " self.cp.s[self.cp.index:])
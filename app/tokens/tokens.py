@@ -5,45 +5,22 @@ from typing import Type, Union, cast
 from ..utils import UnexpectedCharacterError, UnterminatedStringError
 from .character_provider import CharacterProvider
 
-from ..expressions import (
-    GroupExpression, 
-    
-    StringLiteralExpression,    
-    NumberLiteralExpression,
-    BooleanLiteralExpression,
-    NilLiteralExpression,
-    
-    MinusNegativeExpressionRouter,
-    
-    PrintExpression,
-    BangExpression,
-    PlusExpression,
-    DivideExpression,
-    MultiplyExpression,
-    AndExpression,
-    OrExpression,
-    EqualEqualExpression,
-    BangEqualExpression,
-    LessExpression,
-    LessEqualExpression,
-    GreaterExpression,
-    GreaterEqualExpression,
-    
-    VarExpression,
-    IdentifierExpression,
-    AssignExpression,
-)
-    
 
 class Token(ABC):
     __slots__ = ["literal", "token_type", "lexeme"]
     _type2symbol_class: dict[str, Type['Symbol']] = {}
     _type2reserved_class: dict[str, Type['ReservedWord']] = {}
+    _kind2class: list[Type['Token']] = []
 
+    kind: int
     token_type: str
     lexeme: str
     literal: str
     
+    def __init_subclass__(cls) -> None:
+        cls.kind = len(Token._kind2class)
+        Token._kind2class.append(cls)
+    
     @staticmethod
     def is_symbol(cp: CharacterProvider) -> bool:
         for l in range(2, 0, -1):
@@ -89,12 +66,13 @@ class Token(ABC):
         return f"{self.token_type} {self.lexeme} {self.literal}"
 
     def __eq__(self, value: object) -> bool:
+        if value is self:
+            return True
         if not isinstance(value, Token):
             return False
         return self.lexeme == cast(Token, value).lexeme
 
 
-@IdentifierExpression.yield_from
 class Identifier(Token):
     token_type = "IDENTIFIER"
     literal = "null"
@@ -118,12 +96,14 @@ class Identifier(Token):
         return Identifier(s)
  
     
-@StringLiteralExpression.yield_from
 class StringLiteral(Token):
     token_type = "STRING"
     def __init__(self, value: str) -> None:
         self.literal = value
-        self.lexeme = '"' + value + '"'
+    
+    @property  # type: ignore[override]
+    def lexeme(self) -> str:
+        return '"' + self.literal + '"'
     
     @classmethod
     def from_iter(cls, cp: CharacterProvider) -> "StringLiteral":
@@ -140,12 +120,17 @@ class StringLiteral(Token):
             return StringLiteral(s[:-1])
 
 
-@NumberLiteralExpression.yield_from
 class NumberLiteral(Token):
     token_type = "NUMBER"
+    value: Union[int, float]
+    
     def __init__(self, str_expression: str, value: Union[int, float]) -> None:
         self.lexeme = str_expression
-        self.literal = str(float(value))
+        self.value = value
+    
+    @property  # type: ignore[override]
+    def literal(self) -> str:
+        return str(float(self.value))
     
     @classmethod
     def from_iter(cls, cp: CharacterProvider) -> "NumberLiteral":
@@ -167,12 +152,20 @@ class NumberLiteral(Token):
         return NumberLiteral(num, float(num))
         
 
+# Symbols and reserved words carry no per-occurrence data, so each class has a single
+# instance that every occurrence shares.
 class Symbol(Token, ABC):
     literal = "null"
+    _instance: 'Symbol'
     
     @classmethod
     def __init_subclass__(cls: Type["Symbol"]) -> None:
+        super().__init_subclass__()
         Token._type2symbol_class[cls.lexeme] = cls
+        cls._instance = object.__new__(cls)
+    
+    def __new__(cls) -> 'Symbol':
+        return cls._instance
 
     @classmethod
     def from_iter(cls, cp: CharacterProvider) -> "Symbol":
@@ -186,10 +179,16 @@ class Symbol(Token, ABC):
 
 class ReservedWord(Token, ABC):
     literal = "null"
+    _instance: 'ReservedWord'
     
     @classmethod
     def __init_subclass__(cls: Type["ReservedWord"]) -> None:
+        super().__init_subclass__()
         Token._type2reserved_class[cls.lexeme] = cls
+        cls._instance = object.__new__(cls)
+    
+    def __new__(cls) -> 'ReservedWord':
+        return cls._instance
     
     @classmethod
     def from_iter(cls, cp: CharacterProvider) -> "ReservedWord":
@@ -209,7 +208,6 @@ class RightBraceSymbol(Symbol):
     token_type = "RIGHT_BRACE"
     lexeme = "}"
 
-@GroupExpression.yield_from
 class LeftParenthesisSymbol(Symbol):
     token_type = "LEFT_PAREN"
     lexeme = "("
@@ -218,7 +216,6 @@ class RightParenthesisSymbol(Symbol):
     token_type = "RIGHT_PAREN"
     lexeme = ")"
 
-@MultiplyExpression.yield_from
 class StarSymbol(Symbol):
     token_type = "STAR"
     lexeme = "*" 
@@ -231,12 +228,10 @@ class CommaSymbol(Symbol):
     token_type = "COMMA"
     lexeme = "," 
 
-@PlusExpression.yield_from
 class PlusSymbol(Symbol):
     token_type = "PLUS"
     lexeme = "+" 
 
-@MinusNegativeExpressionRouter.yield_from
 class MinusSymbol(Symbol):
     token_type = "MINUS"
     lexeme = "-" 
@@ -245,47 +240,38 @@ class SemicolonSymbol(Symbol):
     token_type = "SEMICOLON"
     lexeme = ";" 
 
-@BangExpression.yield_from
 class BangSymbol(Symbol):
     token_type = "BANG"
     lexeme = "!"
 
-@AssignExpression.yield_from
 class EqualSymbol(Symbol):
     token_type = "EQUAL"
     lexeme = "=" 
 
-@EqualEqualExpression.yield_from
 class EqualEqualSymbol(Symbol):
     token_type = "EQUAL_EQUAL"
     lexeme = "==" 
 
-@BangEqualExpression.yield_from
 class BangEqualSymbol(Symbol):
     token_type = "BANG_EQUAL"
     lexeme = "!="
 
-@LessExpression.yield_from
 class LessSymbol(Symbol):
     token_type = "LESS"
     lexeme = "<"
 
-@LessEqualExpression.yield_from
 class LessEqualSymbol(Symbol):
     token_type = "LESS_EQUAL"
     lexeme = "<="
 
-@GreaterExpression.yield_from
 class GreaterSymbol(Symbol):
     token_type = "GREATER"
     lexeme = ">"
 
-@GreaterEqualExpression.yield_from
 class GreaterEqualSymbol(Symbol):
     token_type = "GREATER_EQUAL"
     lexeme = ">="
 
-@DivideExpression.yield_from
 class SlashSymbol(Symbol):
     token_type = "SLASH"
     lexeme = "/"
@@ -294,12 +280,10 @@ class EOFSymbol(Symbol):
     token_type = "EOF"
     lexeme = ""
 
-@AndExpression.yield_from
 class AndReservedWord(ReservedWord):
     token_type = "AND"
     lexeme = "and"
 
-@OrExpression.yield_from
 class OrReservedWord(ReservedWord):
     token_type = "OR"
     lexeme = "or"
@@ -312,17 +296,14 @@ class ElseReservedWord(ReservedWord):
     token_type = "ELSE"
     lexeme = "else"
 
-@BooleanLiteralExpression.yield_from
 class FalseReservedWord(ReservedWord):
     token_type = "FALSE"
     lexeme = "false"
 
-@BooleanLiteralExpression.yield_from
 class TrueReservedWord(ReservedWord):
     token_type = "TRUE"
     lexeme = "true"
 
-@NilLiteralExpression.yield_from
 class NilReservedWord(ReservedWord):
     token_type = "NIL"
     lexeme = "nil"
@@ -339,7 +320,6 @@ class IfReservedWord(ReservedWord):
     token_type = "IF"
     lexeme = "if"
 
-@PrintExpression.yield_from
 class PrintReservedWord(ReservedWord):
     token_type = "PRINT"
     lexeme = "print"
@@ -356,7 +336,6 @@ class ThisReservedWord(ReservedWord):
     token_type = "THIS"
     lexeme = "this"
 
-@VarExpression.yield_from
 class VarReservedWord(ReservedWord):
     token_type = "VAR"
     lexeme = "var"
@@ -1,4 +1,5 @@
 from .errors import *
+from .exit_status import exit_status
 
 __all__=[
     BaseError.__name__,
@@ -7,4 +8,5 @@ __all__=[
     MissingExpressionError.__name__,
     UndefinedVariableError.__name__,
     MissingScopeExpressionError.__name__,
+    exit_status.__name__,
 ]
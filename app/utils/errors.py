@@ -1,9 +1,9 @@
 from abc import ABC, abstractmethod
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Optional
 
 if TYPE_CHECKING:
     from ..expressions import Expression
-    from ..tokens import Token
+    from ..tokens import Token, LineIndex
 
 
 class BaseError(ABC, BaseException):
@@ -35,8 +35,25 @@ class UnterminatedStringError(TokenizerBaseError):
 
     
 class ParserBaseError(BaseError, ABC):
+    offset: int = -1
+    lines: Optional['LineIndex'] = None
+    
     def __init__(self, line_num: int) -> None:
         super().__init__(line_num)
+    
+    @property  # type: ignore[override]
+    def line_num(self) -> int:
+        if self.lines is None:
+            return self._line_num
+        return self.lines.line_of(self.offset)
+    
+    @line_num.setter
+    def line_num(self, line_num: int) -> None:
+        self._line_num = line_num
+    
+    def locate(self, lines: 'LineIndex', offset: int) -> None:
+        self.lines = lines
+        self.offset = offset
         
     def __str__(self) -> str:
         return super().__str__() + f""
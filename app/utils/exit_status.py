@@ -0,0 +1,11 @@
+import sys
+
+
+def exit_status(e: SystemExit) -> int:
+    # what the interpreter makes of the same SystemExit
+    if e.code is None:
+        return 0
+    if isinstance(e.code, int):
+        return e.code
+    print(e.code, file=sys.stderr)
+    return 1
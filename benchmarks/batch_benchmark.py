@@ -0,0 +1,47 @@
+from argparse import ArgumentParser
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .generator import SHAPES, generate
+from .suite import iter_shapes
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Wall time to run a directory of scripts one process each and with run --batch")
+    arg_parser.add_argument("shapes", nargs="*", help=f"subset of {SHAPES}")
+    arg_parser.add_argument("--scripts", type=int, default=40, help="scripts to generate")
+    arg_parser.add_argument("--size", type=int, default=20)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--jobs", type=int, nargs="+", default=[1, 2, 4])
+    args = arg_parser.parse_args()
+
+    shapes = list(iter_shapes(args.shapes or SHAPES))
+    with tempfile.TemporaryDirectory() as directory:
+        scripts = []
+        for index in range(args.scripts):
+            script = os.path.join(directory, f"{index:04}.lox")
+            with open(script, "w") as fd:
+                fd.write(generate(shapes[index % len(shapes)], args.size, args.seed + index))
+            scripts.append(script)
+
+        start = time.perf_counter()
+        for script in scripts:
+            subprocess.run([sys.executable, "-m", "app.main", "run", script], stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        separate = time.perf_counter() - start
+        print(f"{'one process each':<20} {separate * 1e3:10.1f} ms")
+
+        for jobs in args.jobs:
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, "-m", "app.main", "run", "--batch", "--jobs", str(jobs), directory],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+            )
+            batch = time.perf_counter() - start
+            print(f"{f'--batch --jobs {jobs}':<20} {batch * 1e3:10.1f} ms  x{separate / batch:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+from argparse import ArgumentParser
+import os
+import tempfile
+import time
+
+from app.cache import ProgramCache
+from app.engines import Engine
+from app.optimize import Optimizer
+from app.tokens import open_source
+from app.parse import Parser
+
+from .generator import SHAPES, generate
+from .suite import iter_shapes
+
+
+# What `run --cache` does before executing: a miss parses, optimizes, compiles and stores,
+# a hit only reads the cache file back.
+def prepare(path: str, name: str, optimize: int, directory: str) -> float:
+    start = time.perf_counter()
+    engine = Engine.create(name)
+    cache = ProgramCache(path, f"{name}-O{optimize}", directory)
+    if cache.load(engine) is None:
+        with open_source(path) as source:
+            program = list(Parser(source))
+        program = Optimizer(optimize).optimize(program)
+        cache.store(engine, program, engine.compile(program))
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Time to a runnable program with an empty and a warm program cache")
+    arg_parser.add_argument("shapes", nargs="*", help=f"subset of {SHAPES}")
+    arg_parser.add_argument("--engines", nargs="+", choices=Engine.names(), default=Engine.names())
+    arg_parser.add_argument("--size", type=int, default=2000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("-O", dest="optimize", type=int, choices=[0, 1], default=1)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for shape in iter_shapes(args.shapes or SHAPES):
+            path = os.path.join(directory, f"{shape}.lox")
+            with open(path, "w") as fd:
+                fd.write(generate(shape, args.size, args.seed))
+            for engine in args.engines:
+                cold = warm = float("inf")
+                for _ in range(args.repeat):
+                    cache_directory = tempfile.mkdtemp(dir=directory)
+                    cold = min(cold, prepare(path, engine, args.optimize, cache_directory))
+                    warm = min(warm, prepare(path, engine, args.optimize, cache_directory))
+                print(
+                    f"{shape:<13} {engine:<8} cold {cold * 1e3:8.2f} ms  warm {warm * 1e3:8.2f} ms  "
+                    f"x{cold / warm:.2f}"
+                )
+
+
+if __name__ == "__main__":
+    main()
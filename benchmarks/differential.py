@@ -0,0 +1,67 @@
+from argparse import ArgumentParser
+import contextlib
+import io
+import random
+
+from app.engines import Engine
+from app.optimize import Optimizer
+from app.parse import Parser
+from app.utils import RuntimeError
+
+from .generator import SHAPES, generate
+
+
+# Statements that fail at run time, spliced into the corpus so that the engines also have
+# to agree on where a program stops and why.
+FAILURES = ['print "a" + 1;', "print -nil;", "print missing;", "print 1 < true;", 'print "a" * 2;']
+
+
+def outcome(source: str, engine: str, optimize: int) -> tuple[str, str]:
+    program = Optimizer(optimize).optimize(list(Parser(source)))
+    output = io.StringIO()
+    error = ""
+    with contextlib.redirect_stdout(output):
+        try:
+            Engine.create(engine).run(program)
+        except RuntimeError as e:
+            error = str(e)
+    return output.getvalue(), error
+
+
+def corpus(seeds: int, size: int) -> list[tuple[str, str]]:
+    sources = []
+    for shape in SHAPES:
+        for seed in range(seeds):
+            source = generate(shape, size, seed)
+            sources.append((f"{shape}/{seed}", source))
+
+            lines = source.splitlines()
+            chooser = random.Random(seed)
+            lines.insert(chooser.randrange(len(lines) + 1), chooser.choice(FAILURES))
+            sources.append((f"{shape}/{seed}+failure", "\n".join(lines)))
+    return sources
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Check that every engine matches the tree-walker on the benchmark corpus")
+    arg_parser.add_argument("--engines", nargs="+", choices=Engine.names(), default=Engine.names()[1:])
+    arg_parser.add_argument("--seeds", type=int, default=5)
+    arg_parser.add_argument("--size", type=int, default=200)
+    args = arg_parser.parse_args()
+
+    mismatches = 0
+    for name, source in corpus(args.seeds, args.size):
+        for optimize in (0, 1):
+            expected = outcome(source, "tree", optimize)
+            for engine in args.engines:
+                if outcome(source, engine, optimize) != expected:
+                    mismatches += 1
+                    print(f"{name:<28} -O{optimize} {engine:<8} differs from tree")
+
+    print(f"{mismatches} mismatches")
+    if mismatches:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,50 @@
+from argparse import ArgumentParser
+import contextlib
+import time
+
+from app.engines import Engine
+from app.optimize import Optimizer
+
+from .generator import SHAPES, generate
+from .suite import NullWriter, best_time, iter_shapes, parse
+
+
+def phase_times(source: str, name: str, optimize: int, repeat: int) -> tuple[float, float]:
+    compile_s = execute_s = float("inf")
+    # every run needs fresh scopes, so each one gets its own parse
+    for _ in range(repeat):
+        engine = Engine.create(name)
+        program = Optimizer(optimize).optimize(parse(source))
+        start = time.perf_counter()
+        compiled = engine.compile(program)
+        compile_s = min(compile_s, time.perf_counter() - start)
+        with contextlib.redirect_stdout(NullWriter()):  # type: ignore[type-var]
+            execute_s = min(execute_s, best_time(lambda: engine.execute(compiled), 1))
+    return compile_s, execute_s
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Execution time of every engine on generated Lox programs")
+    arg_parser.add_argument("shapes", nargs="*", help=f"subset of {SHAPES}")
+    arg_parser.add_argument("--engines", nargs="+", choices=Engine.names(), default=Engine.names())
+    arg_parser.add_argument("--size", type=int, default=2000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("-O", dest="optimize", type=int, choices=[0, 1], default=1)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    for shape in iter_shapes(args.shapes or SHAPES):
+        source = generate(shape, args.size, args.seed)
+        # the first engine is the reference the others are compared against
+        reference = None
+        for engine in args.engines:
+            compile_s, execute_s = phase_times(source, engine, args.optimize, args.repeat)
+            reference = reference or (compile_s, execute_s)
+            print(
+                f"{shape:<13} {engine:<8} compile {compile_s * 1e3:8.2f} ms  execute {execute_s * 1e3:8.2f} ms "
+                f"x{reference[1] / execute_s:.2f}  total x{sum(reference) / (compile_s + execute_s):.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+from argparse import ArgumentParser
+import random
+
+
+# Every shape produces a valid program that runs to completion: variables are declared
+# before use, arithmetic only sees numbers, `+` on strings only sees strings and no
+# division has a zero divisor.
+SHAPES = ["arithmetic", "nesting", "declarations", "strings", "prints", "mixed"]
+
+
+class LoxGenerator:
+    def __init__(self, seed: int = 0) -> None:
+        self.random = random.Random(seed)
+        self.numbers: list[str] = []
+        self.strings: list[str] = []
+        self.counter = 0
+
+    def generate(self, shape: str, size: int) -> str:
+        if shape not in SHAPES:
+            raise ValueError(f"unknown shape {shape!r}, expected one of {SHAPES}")
+
+        lines = self.__prelude()
+        for _ in range(size):
+            if shape == "mixed":
+                lines.extend(getattr(self, f"_{self.random.choice(SHAPES[:-1])}")())
+            else:
+                lines.extend(getattr(self, f"_{shape}")())
+        return "\n".join(lines) + "\n"
+
+    def __prelude(self) -> list[str]:
+        self.numbers = ["n0", "n1"]
+        self.strings = ["s0"]
+        return ["var n0 = 1;", "var n1 = 2.5;", 'var s0 = "seed";']
+
+    def __name(self, prefix: str) -> str:
+        self.counter += 1
+        return f"{prefix}{self.counter}"
+
+    def __operand(self) -> str:
+        if self.random.random() < 0.5:
+            return self.random.choice(self.numbers)
+        return str(self.random.randint(1, 999)) if self.random.random() < 0.7 else f"{self.random.randint(1, 99)}.{self.random.randint(1, 99)}"
+
+    def __chain(self, length: int, operators: str = "++--*/") -> str:
+        parts = [self.__operand()]
+        for _ in range(length):
+            operator = self.random.choice(operators)
+            # literal divisors are never zero
+            operand = str(self.random.randint(1, 9)) if operator == "/" else self.__operand()
+            parts.append(f"{operator} {operand}")
+        return " ".join(parts)
+
+    def _arithmetic(self) -> list[str]:
+        return [f"print {self.__chain(self.random.randint(20, 60))};"]
+
+    def _nesting(self) -> list[str]:
+        depth = self.random.randint(10, 40)
+        expression = self.__operand()
+        for _ in range(depth):
+            expression = f"({expression} {self.random.choice('+-*')} {self.__operand()})"
+
+        name = self.__name("d")
+        inner = [f"var {name} = {expression};", f"print {name} > 0 and !false;"]
+        blocks = self.random.randint(2, 12)
+        return ["{" * blocks] + inner + ["}" * blocks]
+
+    def _declarations(self) -> list[str]:
+        lines = []
+        for _ in range(10):
+            name = self.__name("v")
+            # stored values only add and subtract, so they stay small however long the program
+            lines.append(f"var {name} = {self.__chain(self.random.randint(1, 4), '+-')};")
+            self.numbers.append(name)
+        lines.append(f"{self.random.choice(self.numbers)} = {self.__chain(2, '+-')};")
+        return lines
+
+    def _strings(self) -> list[str]:
+        name = self.__name("s")
+        words = " ".join(self.random.choice(["lox", "string", "heavy", "concat", "text"]) for _ in range(8))
+        line = f'var {name} = "{words}" + {self.random.choice(self.strings)} + "!";'
+        self.strings.append(name)
+        return [line, f"print {name} == {self.random.choice(self.strings)};"]
+
+    def _prints(self) -> list[str]:
+        values = [self.__operand(), self.random.choice(self.strings), "true", "nil", f"{self.__operand()} < {self.__operand()}"]
+        return [f"print {value};" for value in values]
+
+
+def generate(shape: str, size: int, seed: int = 0) -> str:
+    return LoxGenerator(seed).generate(shape, size)
+
+
+def main() -> None:
+    arg_parser = ArgumentParser()
+    arg_parser.add_argument("shape", choices=SHAPES)
+    arg_parser.add_argument("--size", type=int, default=1000, help="number of generated statement groups")
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--out", default="-")
+    args = arg_parser.parse_args()
+
+    source = generate(args.shape, args.size, args.seed)
+    if args.out == "-":
+        print(source, end="")
+    else:
+        with open(args.out, "w") as fd:
+            fd.write(source)
+
+
+if __name__ == "__main__":
+    main()
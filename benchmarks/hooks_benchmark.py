@@ -0,0 +1,119 @@
+from argparse import ArgumentParser, Namespace
+import contextlib
+import os
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable
+
+from app.main import build_arg_parser, execute_file, install_hooks, open_input
+from app.hooks import hooks
+from app.hooks.hooks import EVENTS
+from app.tokens import Scanner, ParallelScanner
+from app.parse import Parser
+from app.optimize import Optimizer
+from app.engines import Engine
+from app.expressions import IdentifierExpression
+from app.output import BufferedOutputSink
+
+from .generator import SHAPES, generate
+from .suite import NullWriter, iter_shapes
+
+
+# every method the hooks can replace
+HOOKED = [
+    (Scanner, "__iter__"),
+    (ParallelScanner, "__iter__"),
+    (Parser, "__iter__"),
+    (IdentifierExpression, "declare"),
+    (IdentifierExpression, "store"),
+]
+
+
+def hooked_methods() -> list[Any]:
+    return [cls.__dict__.get(name) for cls, name in HOOKED]
+
+
+# the hooked methods that are not the functions written in their class, so without
+# handlers the interpreter would run instrumented code
+def replaced_methods() -> list[str]:
+    return [
+        f"{cls.__name__}.{name}" for (cls, name), method in zip(HOOKED, hooked_methods())
+        if getattr(method, "__qualname__", None) != f"{cls.__name__}.{name}" or method.__module__ != cls.__module__
+    ]
+
+
+# execute_file as it was before hooks: parse, optimize and execute on the tree walker
+def run_without_hooks(ns: Namespace) -> None:
+    output = BufferedOutputSink()
+    engine = Engine.create(ns.engine, output)
+    with open_input(ns) as source:
+        program = list(Parser(source, ns.jobs, output))
+    engine.execute(engine.compile(Optimizer(ns.optimize).optimize(program)))
+    output.flush()
+
+
+# median times of the actions, run in turns so that a slow spell of the machine hits them
+# all, starting each turn from the next action so that none always runs in the wake of another
+def median_times(actions: list[Callable[[], Any]], repeat: int) -> list[float]:
+    times: list[list[float]] = [[] for _ in actions]
+    for turn in range(repeat):
+        for index in [(turn + offset) % len(actions) for offset in range(len(actions))]:
+            start = time.perf_counter()
+            actions[index]()
+            times[index].append(time.perf_counter() - start)
+    return [statistics.median(samples) for samples in times]
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Run time of run with no hooks registered, against the same pipeline without the hook checks and with a handler on every event; fails if without handlers the hooked methods are not the ones their classes define")
+    arg_parser.add_argument("shapes", nargs="*", help=f"subset of {SHAPES}")
+    arg_parser.add_argument("--size", type=int, default=2000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--repeat", type=int, default=7)
+    arg_parser.add_argument("--tolerance", type=float, help="slowdown of the median with hooks off that counts as a failure, e.g. 0.05 on a quiet machine")
+    args = arg_parser.parse_args()
+
+    failures = []
+    # with no handlers, installing is a no-op: the interpreter runs the very same functions.
+    # This, rather than timing, is what shows hooks cost nothing when off; a shared machine
+    # moves timings by more than any tolerance that would still catch a slowdown
+    install_hooks(build_arg_parser().parse_args(["run", "-"]))
+    for method in replaced_methods():
+        failures.append(f"installing without handlers replaced {method}")
+
+    with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(NullWriter()):  # type: ignore[type-var]
+        for shape in iter_shapes(args.shapes or SHAPES):
+            script = os.path.join(directory, f"{shape}.lox")
+            with open(script, "w") as fd:
+                fd.write(generate(shape, args.size, args.seed))
+            ns = build_arg_parser().parse_args(["run", script])
+
+            baseline, off = median_times([lambda: run_without_hooks(ns), lambda: execute_file(ns)], args.repeat)
+            for event in EVENTS:
+                hooks.add(event, lambda *_: None)
+            hooks.install()
+            try:
+                on, = median_times([lambda: execute_file(ns)], args.repeat)
+            finally:
+                hooks.clear()
+            for method in replaced_methods():
+                failures.append(f"{shape}: clearing the hooks left {method} replaced")
+
+            print(
+                f"{shape:<13} without hooks {baseline * 1e3:9.1f} ms  hooks off {off * 1e3:9.1f} ms x{off / baseline:.2f}"
+                f"  every hook on {on * 1e3:9.1f} ms x{on / baseline:.2f}",
+                file=sys.stderr,
+            )
+            if args.tolerance is not None and off > baseline * (1 + args.tolerance):
+                failures.append(f"{shape}: hooks off is {off / baseline:.2f}x the run without hooks")
+
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
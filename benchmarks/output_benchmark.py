@@ -0,0 +1,64 @@
+from argparse import ArgumentParser
+import os
+from typing import Any, TextIO
+
+from app.engines import Engine
+from app.optimize import Optimizer
+from app.output import OutputSink, BufferedOutputSink
+from app.parse import Parser
+
+from .generator import generate
+from .suite import best_time
+
+
+# what every engine did before the sinks: the builtin print() per value
+class PrintPerValueSink(OutputSink):
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+
+    def write(self, text: str) -> None:
+        print(text, end="", file=self.stream)
+
+    def write_value(self, value: Any) -> None:
+        if value.__class__ is bool:
+            print("true" if value else "false", file=self.stream)
+        elif value is None:
+            print("nil", file=self.stream)
+        else:
+            print(value, file=self.stream)
+
+    def write_line(self, value: Any) -> None:
+        print(value, file=self.stream)
+
+
+def execution_time(source: str, engine_name: str, sink: OutputSink, repeat: int) -> float:
+    # parsed and compiled once; declarations run again harmlessly, so only execution is timed
+    program = Optimizer(1).optimize(list(Parser(source, output=sink)))
+    engine = Engine.create(engine_name, sink)
+    compiled = engine.compile(program)
+
+    def action() -> None:
+        engine.execute(compiled)
+        sink.flush()
+
+    return best_time(action, repeat)
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Run time of a print-heavy script with a print per value and with the buffered sink")
+    arg_parser.add_argument("--size", type=int, default=4000)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--engines", nargs="+", choices=Engine.names(), default=Engine.names())
+    args = arg_parser.parse_args()
+
+    source = generate("prints", args.size, args.seed)
+    with open(os.devnull, "w") as devnull:
+        for name in args.engines:
+            printed = execution_time(source, name, PrintPerValueSink(devnull), args.repeat)
+            buffered = execution_time(source, name, BufferedOutputSink(devnull), args.repeat)
+            print(f"{name:<8} print() per value {printed * 1e3:9.1f} ms  buffered sink {buffered * 1e3:9.1f} ms  x{printed / buffered:.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+from argparse import ArgumentParser
+
+from app.parse import Parser
+
+from .suite import best_time
+
+
+# Single statements whose expression grows with `n`. `assign` keeps the whole chain on the
+# right spine and `ladder` climbs every precedence level, which are the worst cases for a
+# parser that re-walks the spine per operator; `nested` is as deep as it is long.
+def statement(shape: str, n: int) -> str:
+    if shape == "sum":
+        return "print " + " + ".join(str(i) for i in range(n)) + ";"
+    if shape == "assign":
+        return "var a = " + " = ".join("a" for _ in range(n)) + " = 1;"
+    if shape == "ladder":
+        return "print " + " ".join(f"{i} == {i} < {i} + {i} *" for i in range(n)) + " 1;"
+    if shape == "nested":
+        return "print " + "(-" * n + "1" + ")" * n + ";"
+    raise ValueError(f"unknown shape {shape!r}")
+
+
+SHAPES = ["sum", "assign", "ladder", "nested"]
+
+
+def parse(source: str) -> None:
+    for _ in Parser(source):
+        pass
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Parser time per source byte as a single expression grows")
+    arg_parser.add_argument("--size", type=int, default=2000, help="smallest expression length")
+    arg_parser.add_argument("--steps", type=int, default=4, help="number of doublings")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--tolerance", type=float, default=2.0, help="allowed growth of time per source byte")
+    args = arg_parser.parse_args()
+
+    failed = False
+    for shape in SHAPES:
+        per_byte = []
+        for step in range(args.steps):
+            n = args.size << step
+            source = statement(shape, n)
+            elapsed = best_time(lambda: parse(source), args.repeat)
+            per_byte.append(elapsed / len(source))
+            print(f"{shape:<7} n={n:<8} {elapsed * 1e3:9.2f} ms {per_byte[-1] * 1e9:8.0f} ns/byte")
+
+        growth = per_byte[-1] / per_byte[0]
+        verdict = "linear" if growth <= args.tolerance else "SUPERLINEAR"
+        failed |= growth > args.tolerance
+        print(f"{shape:<7} growth x{growth:.2f} over {1 << (args.steps - 1)}x input: {verdict}")
+
+    if failed:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
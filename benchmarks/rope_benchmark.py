@@ -0,0 +1,82 @@
+from argparse import ArgumentParser
+import contextlib
+import os
+import sys
+from typing import Iterator
+
+import app.expressions.expressions
+import app.engines.closure
+import app.engines.vm
+import app.engines.transpiler
+from app.engines import Engine
+from app.optimize import Optimizer
+from app.output import BufferedOutputSink
+from app.parse import Parser
+
+from .suite import best_time
+
+
+# every module that reads the threshold; raising it past any length makes `+` copy again
+THRESHOLD_USERS = [app.expressions.expressions, app.engines.closure, app.engines.vm, app.engines.transpiler]
+
+
+def appends(count: int, width: int) -> str:
+    # a string built by repeated `s = s + ...`, printed once at the end
+    lines = ['var s = "";']
+    lines.extend(f's = s + "{index:0{width}d}";' for index in range(count))
+    lines.append("print s;")
+    return "\n".join(lines) + "\n"
+
+
+@contextlib.contextmanager
+def copying() -> Iterator[None]:
+    saved = [module.ROPE_THRESHOLD for module in THRESHOLD_USERS]
+    for module in THRESHOLD_USERS:
+        module.ROPE_THRESHOLD = sys.maxsize
+    try:
+        yield
+    finally:
+        for module, threshold in zip(THRESHOLD_USERS, saved):
+            module.ROPE_THRESHOLD = threshold
+
+
+def execution_time(source: str, engine_name: str, repeat: int) -> float:
+    # parsed and compiled once; the declaration resets `s`, so every execution is the same
+    with open(os.devnull, "w") as devnull:
+        sink = BufferedOutputSink(devnull)
+        program = Optimizer(1).optimize(list(Parser(source, output=sink)))
+        engine = Engine.create(engine_name, sink)
+        compiled = engine.compile(program)
+
+        def action() -> None:
+            engine.execute(compiled)
+            sink.flush()
+
+        return best_time(action, repeat)
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Run time of a script building a string by repeated concatenation, copying and with ropes")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 2000, 4000, 8000], help="concatenations per script")
+    arg_parser.add_argument("--width", type=int, default=100, help="characters added by each concatenation")
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--engines", nargs="+", choices=Engine.names(), default=Engine.names())
+    args = arg_parser.parse_args()
+
+    for name in args.engines:
+        previous = None
+        for size in args.sizes:
+            source = appends(size, args.width)
+            with copying():
+                copied = execution_time(source, name, args.repeat)
+            roped = execution_time(source, name, args.repeat)
+            # how much slower each concatenation got since the last size: 1 is linear
+            growth = "" if previous is None else (
+                f"  per + x{copied / size / (previous[0] / previous[2]):.2f} copying, x{roped / size / (previous[1] / previous[2]):.2f} ropes"
+            )
+            print(f"{name:<8} {size:>7}  copying {copied * 1e3:9.1f} ms  ropes {roped * 1e3:9.1f} ms  x{copied / roped:6.2f}{growth}")
+            previous = (copied, roped, size)
+
+
+if __name__ == "__main__":
+    main()
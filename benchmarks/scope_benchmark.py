@@ -0,0 +1,52 @@
+from argparse import ArgumentParser
+
+from app.optimize import VariableResolution
+
+from .suite import best_time, evaluate, parse
+
+
+# Variables declared on the way into `depth` nested blocks and used `uses` times at the
+# innermost level, so every dynamic lookup walks up to `depth` scope dictionaries.
+def nested_blocks(depth: int, uses: int) -> str:
+    lines = []
+    for level in range(depth):
+        lines.append(f"var v{level} = {level};")
+        lines.append("{")
+    for i in range(uses):
+        outer, inner = f"v{i % depth}", f"v{(i * 7) % depth}"
+        lines.append(f"{outer} = {outer} + {inner};")
+        lines.append(f"print {inner};")
+    lines.extend("}" for _ in range(depth))
+    return "\n".join(lines)
+
+
+def evaluate_time(source: str, resolve: bool, repeat: int) -> float:
+    best = float("inf")
+    # every run needs fresh scopes, so each evaluation gets its own parse
+    for _ in range(repeat):
+        program = parse(source)
+        if resolve:
+            VariableResolution().run(program)
+        best = min(best, best_time(lambda: evaluate(program), 1))
+    return best
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Variable lookup cost with and without resolution as blocks nest")
+    arg_parser.add_argument("--depths", type=int, nargs="+", default=[1, 4, 16, 64])
+    arg_parser.add_argument("--uses", type=int, default=5000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    args = arg_parser.parse_args()
+
+    for depth in args.depths:
+        source = nested_blocks(depth, args.uses)
+        dynamic = evaluate_time(source, False, args.repeat)
+        resolved = evaluate_time(source, True, args.repeat)
+        print(
+            f"depth={depth:<5} dynamic {dynamic * 1e3:9.2f} ms  resolved {resolved * 1e3:9.2f} ms  "
+            f"speedup x{dynamic / resolved:.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+from argparse import ArgumentParser
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .generator import SHAPES, generate
+from .suite import iter_shapes
+
+
+def wall_time(command: list[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def wait_for(path: str, timeout: float = 10.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not os.path.exists(path):
+        if time.monotonic() > deadline:
+            raise SystemExit(f"the server did not create {path}")
+        time.sleep(0.01)
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Wall time per script run by the CLI and through a serve daemon")
+    arg_parser.add_argument("shapes", nargs="*", help=f"subset of {SHAPES}")
+    arg_parser.add_argument("--size", type=int, default=20)
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--workers", type=int, default=2)
+    arg_parser.add_argument("--repeat", type=int, default=10)
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "lox.sock")
+        server = subprocess.Popen([sys.executable, "-m", "app.main", "serve", "--workers", str(args.workers), path])
+        try:
+            wait_for(path)
+            for shape in iter_shapes(args.shapes or SHAPES):
+                script = os.path.join(directory, f"{shape}.lox")
+                with open(script, "w") as fd:
+                    fd.write(generate(shape, args.size, args.seed))
+                cli = wall_time([sys.executable, "-m", "app.main", "run", script], args.repeat)
+                client = wall_time([sys.executable, "-m", "app.client", "--socket", path, "run", script], args.repeat)
+                print(f"{shape:<13} cli {cli * 1e3:8.2f} ms  client {client * 1e3:8.2f} ms  x{cli / client:.2f}")
+        finally:
+            server.terminate()
+            server.wait()
+
+
+if __name__ == "__main__":
+    main()
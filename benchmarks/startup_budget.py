@@ -0,0 +1,81 @@
+from argparse import ArgumentParser
+import os
+import subprocess
+import sys
+import tempfile
+
+
+# modules a command must not import, by command
+FORBIDDEN = {
+    "tokenize": ["app.expressions", "app.parse", "app.optimize", "app.engines", "app.cache", "app.server", "concurrent.futures"],
+    "parse": ["app.optimize", "app.engines", "app.cache", "app.server", "concurrent.futures"],
+    "run": ["app.cache", "app.server", "concurrent.futures"],
+}
+
+# milliseconds every module a command imports may take together, best of the runs
+BUDGETS_MS = {
+    "tokenize": 60.0,
+    "parse": 80.0,
+    "run": 95.0,
+}
+
+
+def import_times(command: str, script: str) -> dict[str, int]:
+    # microseconds spent in every module itself, as `python -X importtime` reports them
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-m", "app.main", command, script],
+        stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True,
+    )
+    times: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_time, _, name = line[len("import time:"):].split("|")
+        if self_time.strip().isdigit():
+            times[name.strip()] = int(self_time)
+    return times
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Fail when a command imports a module it does not need or starts up over budget")
+    arg_parser.add_argument("commands", nargs="*", help=f"subset of {list(FORBIDDEN)}")
+    arg_parser.add_argument("--repeat", type=int, default=5)
+    arg_parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget by this")
+    args = arg_parser.parse_args()
+
+    failures = []
+    check = subprocess.run([sys.executable, "-m", "app.dispatch", "--check"])
+    if check.returncode:
+        failures.append("app/dispatch_table.py is out of date")
+
+    with tempfile.TemporaryDirectory() as directory:
+        script = os.path.join(directory, "startup.lox")
+        with open(script, "w") as f:
+            f.write("print 1;\n")
+
+        print(f"{'command':<10} {'modules':>8} {'import ms':>10} {'budget ms':>10}")
+        for command in args.commands or FORBIDDEN:
+            best = None
+            for _ in range(args.repeat):
+                times = import_times(command, script)
+                if best is None or sum(times.values()) < sum(best.values()):
+                    best = times
+            assert best is not None
+
+            total = sum(best.values()) / 1e3
+            budget = BUDGETS_MS[command] * args.scale
+            print(f"{command:<10} {len(best):>8} {total:>10.1f} {budget:>10.1f}")
+            for module in FORBIDDEN[command]:
+                if module in best:
+                    failures.append(f"{command} imports {module}")
+            if total > budget:
+                failures.append(f"{command} spends {total:.1f} ms importing, over its {budget:.1f} ms budget")
+
+    for failure in failures:
+        print(failure, file=sys.stderr)
+    if failures:
+        exit(1)
+
+
+if __name__ == "__main__":
+    main()
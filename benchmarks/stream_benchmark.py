@@ -0,0 +1,60 @@
+from argparse import ArgumentParser
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+from .generator import SHAPES, generate
+from .suite import iter_shapes
+
+
+# runs the command line and reports the peak resident memory of the child's own address
+# space; unlike ru_maxrss, VmHWM starts over at exec, so the parent's size does not count
+PROBE = """
+import atexit, runpy, sys
+def report():
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmHWM:"):
+                sys.__stderr__.write("\\npeak " + line.split()[1] + "\\n")
+atexit.register(report)
+sys.argv[0] = "app.main"
+runpy.run_module("app.main", run_name="__main__", alter_sys=True)
+"""
+
+
+def measure(arguments: list[str]) -> tuple[float, int]:
+    # wall time and peak resident memory in KiB of one run of the command line
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, "-c", PROBE, *arguments], stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    seconds = time.perf_counter() - start
+    peak = result.stderr.rsplit("peak ", 1)[-1]
+    return seconds, int(peak)
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="Peak memory and wall time of run with and without --stream as scripts grow")
+    arg_parser.add_argument("shapes", nargs="*", help=f"subset of {SHAPES}")
+    arg_parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 4000, 16000])
+    arg_parser.add_argument("--seed", type=int, default=0)
+    arg_parser.add_argument("--engine", default="tree")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        for shape in iter_shapes(args.shapes or SHAPES):
+            for size in args.sizes:
+                script = os.path.join(directory, f"{shape}-{size}.lox")
+                with open(script, "w") as fd:
+                    fd.write(generate(shape, size, args.seed))
+                command = ["run", "--engine", args.engine]
+                whole_time, whole_rss = measure(command + [script])
+                stream_time, stream_rss = measure(command + ["--stream", script])
+                print(
+                    f"{shape:<13} {size:>7}  run {whole_rss / 1024:8.1f} MiB {whole_time * 1e3:9.1f} ms"
+                    f"  --stream {stream_rss / 1024:8.1f} MiB {stream_time * 1e3:9.1f} ms"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,190 @@
+from argparse import ArgumentParser, Namespace
+import contextlib
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Iterator
+
+from app.tokens import Scanner
+from app.parse import Parser
+from app.expressions import Expression
+from app.execution import ExecutionScope
+
+from .generator import SHAPES, generate
+
+
+Program = list[tuple[ExecutionScope, Expression]]
+
+# rates that are compared between two result files; higher is better for all of them
+RATES = ["tokens_per_sec", "nodes_per_sec", "statements_per_sec"]
+
+
+class NullWriter:
+    def write(self, s: str) -> int:
+        return len(s)
+
+    def flush(self) -> None:
+        pass
+
+
+def count_nodes(expression: Expression) -> int:
+    count = 0
+    pending = [expression]
+    while pending:
+        node = pending.pop()
+        count += 1
+        for attr in ("left", "right", "expr"):
+            child = getattr(node, attr, None)
+            if isinstance(child, Expression):
+                pending.append(child)
+    return count
+
+
+def tokenize(source: str) -> int:
+    return sum(1 for _ in Scanner(source))
+
+
+def parse(source: str) -> Program:
+    return list(Parser(source))
+
+
+def evaluate(program: Program) -> None:
+    with contextlib.redirect_stdout(NullWriter()):  # type: ignore[type-var]
+        for scope, expression in program:
+            expression.evaluate(scope)
+
+
+def best_time(action: Callable[[], Any], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        action()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(action: Callable[[], Any]) -> int:
+    tracemalloc.start()
+    try:
+        action()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_shape(shape: str, size: int, seed: int, repeat: int) -> dict[str, Any]:
+    source = generate(shape, size, seed)
+    tokens = tokenize(source)
+    program = parse(source)
+    nodes = sum(count_nodes(expression) for _, expression in program)
+
+    tokenize_s = best_time(lambda: tokenize(source), repeat)
+    # the parser pulls tokens lazily, so scanning time is taken out of the parse phase
+    parse_s = max(best_time(lambda: parse(source), repeat) - tokenize_s, 1e-9)
+    # every run needs fresh scopes, so each evaluation gets its own parse
+    evaluate_s = float("inf")
+    for _ in range(repeat):
+        fresh = parse(source)
+        evaluate_s = min(evaluate_s, best_time(lambda: evaluate(fresh), 1))
+
+    return {
+        "source_bytes": len(source),
+        "tokens": tokens,
+        "nodes": nodes,
+        "statements": len(program),
+        "tokenize_s": tokenize_s,
+        "parse_s": parse_s,
+        "evaluate_s": evaluate_s,
+        "tokens_per_sec": tokens / tokenize_s,
+        "nodes_per_sec": nodes / parse_s,
+        "statements_per_sec": len(program) / evaluate_s,
+        "peak_memory": {
+            "tokenize": peak_memory(lambda: tokenize(source)),
+            "parse": peak_memory(lambda: parse(source)),
+            "evaluate": peak_memory(lambda: evaluate(parse(source))),
+        },
+    }
+
+
+def iter_shapes(names: list[str]) -> Iterator[str]:
+    for name in names:
+        if name not in SHAPES:
+            raise SystemExit(f"unknown shape {name!r}, expected one of {SHAPES}")
+        yield name
+
+
+def run(ns: Namespace) -> None:
+    results = {
+        "meta": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "size": ns.size,
+            "seed": ns.seed,
+            "repeat": ns.repeat,
+        },
+        "results": {},
+    }
+    for shape in iter_shapes(ns.shapes or SHAPES):
+        result = bench_shape(shape, ns.size, ns.seed, ns.repeat)
+        results["results"][shape] = result
+        print(
+            f"{shape:<13} {result['tokens_per_sec']:>12,.0f} tok/s {result['nodes_per_sec']:>12,.0f} nodes/s "
+            f"{result['statements_per_sec']:>10,.0f} stmt/s  peak {max(result['peak_memory'].values()) / 1e6:.1f} MB",
+            file=sys.stderr,
+        )
+
+    if ns.out == "-":
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        with open(ns.out, "w") as fd:
+            json.dump(results, fd, indent=2)
+
+
+def compare(ns: Namespace) -> None:
+    with open(ns.baseline) as fd:
+        baseline = json.load(fd)["results"]
+    with open(ns.candidate) as fd:
+        candidate = json.load(fd)["results"]
+
+    regressions = 0
+    for shape in sorted(baseline.keys() & candidate.keys()):
+        for rate in RATES:
+            before, after = baseline[shape][rate], candidate[shape][rate]
+            change = after / before - 1
+            flag = ""
+            if change < -ns.threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{shape:<13} {rate:<19} {before:>14,.0f} -> {after:>14,.0f} {change:+8.1%}{flag}")
+
+    if regressions:
+        exit(1)
+
+
+def main() -> None:
+    arg_parser = ArgumentParser(description="End-to-end interpreter benchmarks on generated Lox programs")
+    sub_parser = arg_parser.add_subparsers(required=True)
+
+    run_parser = sub_parser.add_parser("run")
+    run_parser.add_argument("shapes", nargs="*", help=f"subset of {SHAPES}")
+    run_parser.add_argument("--size", type=int, default=500)
+    run_parser.add_argument("--seed", type=int, default=0)
+    run_parser.add_argument("--repeat", type=int, default=3)
+    run_parser.add_argument("--out", default="-", help="JSON result file")
+    run_parser.set_defaults(entry=run)
+
+    compare_parser = sub_parser.add_parser("compare")
+    compare_parser.add_argument("baseline")
+    compare_parser.add_argument("candidate")
+    compare_parser.add_argument("--threshold", type=float, default=0.10, help="allowed slowdown before failing")
+    compare_parser.set_defaults(entry=compare)
+
+    args = arg_parser.parse_args()
+    args.entry(args)
+
+
+if __name__ == "__main__":
+    main()
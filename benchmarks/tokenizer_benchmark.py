@@ -0,0 +1,95 @@
+from argparse import ArgumentParser
+import contextlib
+import io
+import re
+import sys
+import time
+from typing import Callable, Iterable, Optional, Union
+
+from app.tokens import Tokenizer, Scanner, Token
+
+from .generator import SHAPES, generate
+
+
+SAMPLE = """\
+var count = 10;
+var name = "scanner benchmark";
+{
+    var ratio = count * 2.5 / (count - 3);
+    // comments are skipped by both engines
+    print ratio >= 1 and !false;
+    print name + " done";
+}
+"""
+
+
+# a word that starts with a keyword is one identifier to Scanner, which reads words with
+# maximal munch, and a keyword followed by an identifier to Tokenizer, so lines holding
+# one are not compared
+KEYWORD_PREFIXED = re.compile(rf"\b(?:{'|'.join(Token._type2reserved_class)})\w")
+
+
+# kind, lexeme and line of every token, and the errors reported
+def scan(engine: Callable[[str], Union[Tokenizer, Scanner]], source: str) -> tuple[list[tuple[int, str, int]], str]:
+    errors = io.StringIO()
+    with contextlib.redirect_stderr(errors):
+        tokenized = engine(source)
+        tokens = [(token.kind, token.lexeme, tokenized.line) for token in tokenized]
+    return tokens, errors.getvalue()
+
+
+# where Scanner first tokenizes `source` differently from Tokenizer, if anywhere
+def difference(source: str) -> Optional[str]:
+    skipped = {number for number, line in enumerate(source.splitlines(), 1) if KEYWORD_PREFIXED.search(line)}
+    expected, expected_errors = scan(Tokenizer, source)
+    actual, actual_errors = scan(Scanner, source)
+    expected = [token for token in expected if token[2] not in skipped]
+    actual = [token for token in actual if token[2] not in skipped]
+    for want, got in zip(expected, actual):
+        if want != got:
+            return f"(kind, lexeme, line) {got} where Tokenizer has {want}"
+    if len(expected) != len(actual):
+        return f"{len(actual)} tokens where Tokenizer has {len(expected)}"
+    if expected_errors != actual_errors:
+        return f"errors {actual_errors!r} where Tokenizer reports {expected_errors!r}"
+    return None
+
+
+def measure(engine: Callable[[str], Iterable[Token]], source: str, repeat: int) -> tuple[int, float]:
+    best = float("inf")
+    count = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        count = sum(1 for _ in engine(source))
+        best = min(best, time.perf_counter() - start)
+    
+    return count, best
+
+
+def main() -> None:
+    arg_parser = ArgumentParser()
+    arg_parser.add_argument("--copies", type=int, default=2000)
+    arg_parser.add_argument("--repeat", type=int, default=3)
+    arg_parser.add_argument("--check-size", type=int, default=200, help="size of the generated scripts both engines must tokenize the same")
+    args = arg_parser.parse_args()
+    
+    source = SAMPLE * args.copies
+    # a faster scanner is only worth timing if it still yields the same tokens
+    inputs = {"sample": source, **{shape: generate(shape, args.check_size) for shape in SHAPES}}
+    failures = []
+    for name, text in inputs.items():
+        found = difference(text)
+        if found is not None:
+            failures.append(f"{name}: {found}")
+    for failure in failures:
+        print(f"FAIL {failure}", file=sys.stderr)
+    if failures:
+        sys.exit(1)
+
+    for engine in (Tokenizer, Scanner):
+        count, seconds = measure(engine, source, args.repeat)
+        print(f"{engine.__name__:<10} {count} tokens in {seconds:.3f}s ({count / seconds:,.0f} tokens/sec)")
+
+
+if __name__ == "__main__":
+    main()